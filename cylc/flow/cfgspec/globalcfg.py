@@ -731,6 +731,75 @@ with Conf('global.cylc', desc='''
 
                Moved into the ``[scheduler]`` section from the top level.
         ''')
+        Conf('process pool implementation', VDR.V_STRING, 'polling',
+             options=['polling', 'asyncio'], desc='''
+            How the scheduler manages the processes in its process pool.
+
+            ``polling``
+               Check running processes on every main loop iteration. The
+               main loop runs more frequently while the pool is busy.
+            ``asyncio``
+               Run processes on the scheduler's asyncio event loop, which
+               reads their output as it is written and wakes the scheduler
+               as soon as a process exits. This reduces the latency of job
+               submission, poll and kill commands, and the CPU used while
+               waiting for them.
+
+            .. versionadded:: 8.4.0
+        ''')
+        Conf('xtrigger executor', VDR.V_STRING, 'subprocess',
+             options=['subprocess', 'worker pool'], desc='''
+            How to run xtrigger functions (other than wall clock triggers).
+
+            ``subprocess``
+               Run each xtrigger call in a new ``cylc function-run``
+               process. Every call is fully isolated from every other.
+            ``worker pool``
+               Run xtrigger calls in a pool of long-lived Python worker
+               processes which keep xtrigger modules imported between calls.
+               This avoids the interpreter start-up cost of each call, which
+               can dominate for workflows with many frequently polled
+               xtriggers.
+
+               The pool is limited by
+               :cylc:conf:`[..]process pool size` and calls are killed after
+               :cylc:conf:`[..]process pool timeout` as for subprocesses.
+               Killing a timed out call restarts the whole worker pool, so any
+               other calls in progress at that time are reported as failed
+               and retried at their next interval.
+               The pool is restarted when the workflow is reloaded to pick
+               up changes to xtrigger functions (calls in progress are left
+               to finish).
+
+            Xtrigger functions defined with ``async def`` are not affected by
+            this setting, see :cylc:conf:`[..]async xtrigger limit`.
+
+            .. versionadded:: 8.4.0
+        ''')
+        Conf('async xtrigger limit', VDR.V_INTEGER, 100, desc='''
+            Maximum number of concurrent calls to async xtrigger functions
+            (at least 1).
+
+            Xtrigger functions defined with ``async def`` are awaited
+            directly by the scheduler, rather than being run in the process
+            pool. This suits xtriggers which spend their time waiting on
+            files or network services. Calls are cancelled after
+            :cylc:conf:`[..]process pool timeout`.
+
+            .. versionadded:: 8.4.0
+        ''')
+        Conf('publish interval', VDR.V_INTERVAL, DurationFloat(0),
+             desc='''
+            Minimum interval between publishing updates to the workflow's
+            data (deltas) to subscribers, e.g. the UI Server.
+
+            Updates made within this interval of the last publish are merged
+            and published together, as are updates made while earlier ones
+            are waiting to be published. This bounds the network traffic of
+            busy workflows, at the cost of the UI being updated less often.
+
+            .. versionadded:: 8.4.0
+        ''')
         Conf('auto restart delay', VDR.V_INTERVAL, desc=f'''
             Maximum number of seconds the auto-restart mechanism will delay
             before restarting workflows.
@@ -1066,6 +1135,204 @@ with Conf('global.cylc', desc='''
                 Conf('interval', VDR.V_INTERVAL, DurationFloat(1800),
                      desc=MAIN_LOOP_PLUGIN_INTERVAL_DESCR)
 
+            with Conf('log proc pool', meta=MainLoopPlugin, desc='''
+                Periodically log process pool queue statistics by class of
+                command.
+
+                For more information see:
+                :py:mod:`cylc.flow.main_loop.log_proc_pool`
+
+                .. versionadded:: 8.4.0
+            '''):
+                Conf('interval', VDR.V_INTERVAL, DurationFloat(600),
+                     desc=MAIN_LOOP_PLUGIN_INTERVAL_DESCR)
+
+            with Conf('log task messages', meta=MainLoopPlugin, desc='''
+                Periodically log task message ingestion statistics.
+
+                For more information see:
+                :py:mod:`cylc.flow.main_loop.log_task_messages`
+
+                .. versionadded:: 8.4.0
+            '''):
+                Conf('interval', VDR.V_INTERVAL, DurationFloat(600),
+                     desc=MAIN_LOOP_PLUGIN_INTERVAL_DESCR)
+
+            with Conf('log public db', meta=MainLoopPlugin, desc='''
+                Periodically log how far the public database is behind the
+                private database.
+
+                For more information see:
+                :py:mod:`cylc.flow.main_loop.log_public_db`
+
+                .. versionadded:: 8.4.0
+            '''):
+                Conf('interval', VDR.V_INTERVAL, DurationFloat(600),
+                     desc=MAIN_LOOP_PLUGIN_INTERVAL_DESCR)
+
+        with Conf('database', desc='''
+            Settings for the workflow run databases.
+
+            .. versionadded:: 8.4.0
+        '''):
+            Conf('incremental task pool', VDR.V_BOOLEAN, False, desc='''
+                Only write task pool table rows that have changed.
+
+                By default the scheduler deletes and rewrites the
+                ``task_pool``, ``task_prerequisites`` and
+                ``task_timeout_timers`` tables in full whenever the task pool
+                is updated. If this is set, only the rows for tasks added,
+                removed or changed since the previous update are written.
+
+                This reduces database I/O for workflows with large task
+                pools.
+
+                .. seealso::
+
+                   :cylc:conf:`[..]task pool checkpoint interval`
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('task pool checkpoint interval', VDR.V_INTERVAL,
+                 DurationFloat(600), desc='''
+                With :cylc:conf:`[..]incremental task pool`, rewrite the task
+                pool tables in full at this interval regardless, as a
+                safeguard.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('persistent connections', VDR.V_BOOLEAN, False, desc='''
+                Keep the database connections open for the life of the
+                scheduler.
+
+                By default the scheduler opens and closes the private and
+                public databases for every batch of writes. If this is set,
+                the connections are kept open, and the databases use
+                write-ahead logging (WAL) with relaxed ``synchronous``
+                settings and a larger page cache. The scheduler checks
+                periodically that the database files have not been removed.
+
+                This reduces database overheads, particularly where the run
+                directory is on a network filesystem where opening and closing
+                files is expensive.
+
+                .. warning::
+
+                   In WAL mode, programs reading the public database must run
+                   on the scheduler host.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('background public database writes', VDR.V_BOOLEAN, False,
+                 desc='''
+                Write to the public database on a background thread.
+
+                The public database (``log/db``), which is read by other
+                programs, does not need to be fully in sync with the private
+                database used by the scheduler. If this is set, writes to the
+                public database are made on a separate thread so they do not
+                hold up the scheduler.
+
+                .. seealso::
+
+                   :cylc:conf:`[..]public database maximum lag`
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('public database maximum lag', VDR.V_INTERVAL,
+                 DurationFloat(60), desc='''
+                With :cylc:conf:`[..]background public database writes`, the
+                scheduler waits for the public database to catch up if it
+                falls behind the private database by more than this.
+
+                .. seealso::
+
+                   :py:mod:`cylc.flow.main_loop.log_public_db`
+
+                .. versionadded:: 8.4.0
+            ''')
+
+        with Conf('process pool', desc='''
+            Scheduling of commands in the process pool.
+
+            Commands waiting to run in the process pool are queued by class
+            and the highest priority class with a command waiting is run
+            first, in this order:
+
+            1. remote init (including remote host selection)
+            2. file install
+            3. job submission
+            4. job poll and kill
+            5. xtrigger
+            6. event handler (including job log retrieval)
+
+            The number of commands of each class that may run at once can be
+            limited, so that a burst of one class of command cannot hold up
+            the others. Regardless of limits, a command that has been queued
+            for more than a minute runs ahead of higher priority classes.
+
+            .. seealso::
+
+               :cylc:conf:`[..]process pool size`
+
+            .. versionadded:: 8.4.0
+        '''):
+            Conf('maximum size', VDR.V_INTEGER, desc='''
+                Allow the process pool to grow up to this size.
+
+                If this is set above :cylc:conf:`[..][..]process pool size`,
+                the scheduler adjusts the size of the pool every few seconds
+                between the two: it grows the pool while commands are waiting
+                longer than :cylc:conf:`[..]target queue wait` to start and
+                the load on the scheduler host is below
+                :cylc:conf:`[..]maximum load`, and shrinks it again when the
+                queues are empty or the host is loaded.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('target queue wait', VDR.V_INTERVAL, DurationFloat(5),
+                 desc='''
+                With :cylc:conf:`[..]maximum size`, grow the process pool if
+                commands wait longer than this on average to start.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('maximum load', VDR.V_FLOAT, 1.0, desc='''
+                With :cylc:conf:`[..]maximum size`, do not grow the process
+                pool while the one minute load average per CPU of the
+                scheduler host exceeds this.
+
+                .. versionadded:: 8.4.0
+            ''')
+            with Conf('limits', desc='''
+                Maximum number of commands of each class that may run at
+                once in the process pool (at least 1).
+
+                By default, each class may use the whole pool.
+
+                .. versionadded:: 8.4.0
+            '''):
+                Conf('remote init', VDR.V_INTEGER, desc='''
+                    Limit for remote initialisation and remote host
+                    selection commands.
+                ''')
+                Conf('file install', VDR.V_INTEGER, desc='''
+                    Limit for remote file installation commands.
+                ''')
+                Conf('job submission', VDR.V_INTEGER, desc='''
+                    Limit for job submission commands.
+                ''')
+                Conf('job poll and kill', VDR.V_INTEGER, desc='''
+                    Limit for job poll and job kill commands.
+                ''')
+                Conf('xtrigger', VDR.V_INTEGER, desc='''
+                    Limit for xtrigger function calls.
+                ''')
+                Conf('event handler', VDR.V_INTEGER, desc='''
+                    Limit for event handlers, event mail and job log
+                    retrieval commands.
+                ''')
+
         with Conf('logging', desc=f'''
             Settings for the workflow event log.
 
@@ -1688,6 +1955,62 @@ with Conf('global.cylc', desc='''
 
                 .. versionadded:: 8.0.0
             ''')
+            Conf('max parallel submits', VDR.V_INTEGER, default=1, desc='''
+                The maximum number of job runner submit commands to run at
+                the same time, in each batch of job submissions.
+
+                By default, the jobs in a batch are submitted one after
+                another, so submitting a large batch takes one job runner
+                round trip (e.g. ``sbatch``) per job. Raising this runs that
+                many submit commands at once. On remote platforms, jobs are
+                also submitted as soon as their job files arrive, rather
+                than after the whole batch has been received.
+
+                Job runners may limit the rate at which you can submit jobs,
+                so check with your site before raising this.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('job agent', VDR.V_BOOLEAN, False, desc='''
+                Run job submit, poll and kill commands in a job agent.
+
+                By default, each batch of job submit, poll or kill commands
+                runs a new ``cylc`` process on the platform (over SSH for
+                remote platforms). If this is set, the scheduler instead
+                starts a long-lived ``cylc job-agent`` process on each
+                platform host it uses and sends the commands to it. This
+                saves an SSH connection and a Python start-up for every
+                command, which adds up on platforms with many jobs.
+
+                The agent runs commands one at a time. Commands sent to it
+                take up places in the process pool as usual, and are subject
+                to :cylc:conf:`global.cylc[scheduler]process pool timeout`
+                from when the agent starts running them.
+
+                If the job agent cannot be started, or exits, commands are
+                run in the usual way.
+
+                .. versionadded:: 8.4.0
+            ''')
+            Conf('poll cache max age', VDR.V_INTERVAL, DurationFloat(0),
+                 desc='''
+                With :cylc:conf:`[..]job agent`, share job runner polls
+                between job poll commands for up to this long.
+
+                If this is set, and the job runner supports it (currently
+                ``slurm`` and ``sge``), the job agent polls all of your jobs
+                in the job runner at once rather than just the jobs in each
+                poll command, and reuses the result for later poll commands
+                for up to this long. A result is not reused for jobs whose
+                status files have changed since it was obtained, e.g. newly
+                submitted jobs. This reduces the load on the job runner from
+                workflows with many jobs.
+
+                Job agents also only read what has been appended to job
+                status files since they last read them.
+
+                .. versionadded:: 8.4.0
+            ''')
             Conf('ssh forward environment variables', VDR.V_STRING_LIST, '',
                  desc='''
                 A list containing the names of the environment variables to
@@ -1977,6 +2300,8 @@ class GlobalConfig(ParsecConfig):
         try:
             self.loadcfg(fname, conf_type)
             self._validate_source_dirs()
+            self._validate_process_pool_limits()
+            self._validate_async_xtrigger_limit()
         except ParsecError:
             LOG.error(f'bad {conf_type} {fname}')
             raise
@@ -2025,6 +2350,35 @@ class GlobalConfig(ParsecConfig):
                     keys, value=item, msg="must be an absolute path"
                 )
 
+    def _validate_process_pool_limits(self) -> None:
+        """Check process pool class limits are at least 1.
+
+        (A limit of 0 would leave commands of that class queued forever.)
+        """
+        keys = ['scheduler', 'process pool', 'limits']
+        try:
+            limits = self.get(keys, sparse=True)
+        except ItemNotFoundError:
+            return
+        for key, value in limits.items():
+            if value is not None and value < 1:
+                raise ValidationError(
+                    [*keys, key], value=value, msg="must be at least 1"
+                )
+
+    def _validate_async_xtrigger_limit(self) -> None:
+        """Check the async xtrigger limit is at least 1.
+
+        (A limit of 0 would leave async xtrigger calls waiting forever.)
+        """
+        keys = ['scheduler', 'async xtrigger limit']
+        try:
+            value = self.get(keys, sparse=True)
+        except ItemNotFoundError:
+            return
+        if value is not None and value < 1:
+            raise ValidationError(keys, value=value, msg="must be at least 1")
+
     def _no_platform_group_name_overlap(self):
         if (
             'platforms' in self.sparse and
@@ -413,6 +413,8 @@ async def reload_workflow(schd: 'Scheduler'):
         # Reset the remote init map to trigger fresh file installation
         schd.task_job_mgr.task_remote_mgr.remote_init_map.clear()
         schd.task_job_mgr.task_remote_mgr.is_reload = True
+        # Restart xtrigger worker processes to pick up changed functions
+        schd.proc_pool.restart_func_pool()
         schd.pool.reload_taskdefs(config)
         # Load jobs from DB
         schd.workflow_db_mgr.pri_dao.select_jobs_for_restart(
@@ -57,6 +57,7 @@ Packaging methods are included for dissemination of protobuf messages.
 from contextlib import suppress
 from collections import Counter, deque
 from copy import deepcopy
+from itertools import count
 import json
 from time import time
 from typing import (
@@ -227,9 +228,41 @@ def setbuff(obj, key, value):
 
 
 def generate_checksum(in_strings):
-    """Generate cross platform & python checksum from strings."""
+    """Generate cross platform & python checksum from strings.
+
+    The checksum is the sum of a hash of each string, so it does not depend
+    on their order and can be updated as strings are added and removed (see
+    apply_delta).
+
+    Note:
+        Subscribers must compute checksums the same way, this changed in
+        API version 6 (see cylc.flow.network.API).
+
+    Examples:
+        >>> generate_checksum(['a', 'b']) == generate_checksum(['b', 'a'])
+        True
+        >>> generate_checksum([])
+        0
+
+    """
     # can't use hash(), it's not the same across 32-64bit or python invocations
-    return zlib.adler32(''.join(sorted(in_strings)).encode()) & 0xffffffff
+    return sum(map(_string_hash, in_strings)) & 0xffffffff
+
+
+def _string_hash(in_string):
+    """Return the hash of a string used by generate_checksum."""
+    return zlib.crc32(in_string.encode())
+
+
+def _elements_hash(key, elements, ids):
+    """Return the checksum contribution of the elements with the given IDs."""
+    # edge stamps are not updated, so edges are identified by ID
+    s_att = 'id' if key == EDGES else 'stamp'
+    return sum(
+        _string_hash(getattr(elements[e_id], s_att))
+        for e_id in ids
+        if e_id in elements
+    )
 
 
 def task_mean_elapsed_time(tdef):
@@ -293,8 +326,199 @@ def runtime_from_config(rtconfig):
     )
 
 
-def apply_delta(key, delta, data):
-    """Apply delta to specific data-store workflow and type."""
+def encode_varint(value: int) -> bytes:
+    """Return a non-negative integer encoded as a protobuf varint.
+
+    Examples:
+        >>> encode_varint(1)
+        b'\\x01'
+        >>> encode_varint(300)
+        b'\\xac\\x02'
+
+    """
+    ret = bytearray()
+    while value > 0x7f:
+        ret.append((value & 0x7f) | 0x80)
+        value >>= 7
+    ret.append(value)
+    return bytes(ret)
+
+
+def encode_message_field(number: int, msg: bytes) -> bytes:
+    """Return a serialized message encoded as a field of another message.
+
+    Concatenating the encoded fields gives the serialized parent message,
+    so messages need not be copied into their parent to serialize it.
+
+    Args:
+        number: The field number in the parent message.
+        msg: The serialized (sub)message.
+
+    Examples:
+        >>> encode_message_field(1, b'abc')
+        b'\\n\\x03abc'
+
+    """
+    # (wire type 2 = length-delimited)
+    return encode_varint(number << 3 | 2) + encode_varint(len(msg)) + msg
+
+
+def apply_delta(key, delta, data, checksums=None, index=None):
+    """Apply delta to specific data-store workflow and type.
+
+    Args:
+        key: The element type.
+        delta: The delta for that element type.
+        data: The data-store.
+        checksums:
+            If provided, the checksum (see generate_checksum) of each element
+            type in the data-store, which is updated with the changes made by
+            the delta. This costs time in proportion to the size of the
+            delta rather than the data-store.
+        index:
+            If provided, the NodeIndex of the data-store, which is updated
+            with the changes made by the delta.
+
+    """
+    ids = None
+    if (checksums is not None or index is not None) and key != WORKFLOW:
+        # (in the order of the delta, as added elements are indexed in order)
+        ids = dict.fromkeys([
+            *(e.id for e in delta.added),
+            *(e.id for e in delta.updated),
+            *delta.pruned,
+        ])
+    if checksums is not None and ids is not None:
+        # remove the elements this delta changes from the checksum
+        checksums[key] = (
+            checksums.get(key, 0) - _elements_hash(key, data[key], ids)
+        )
+    _apply_delta(key, delta, data)
+    if checksums is not None and ids is not None:
+        # then add the changed elements back
+        checksums[key] = (
+            checksums[key] + _elements_hash(key, data[key], ids)
+        ) & 0xffffffff
+    if index is not None and ids is not None:
+        index.update(key, data[key], ids)
+
+
+class NodeIndex:
+    """Index of the nodes in a workflow data-store.
+
+    Holds the parsed ID of each node, and the IDs of nodes by the values of
+    the fields in INDEXED_FIELDS. Queries which filter nodes by these fields
+    can look them up here rather than scan the data-store (see
+    cylc.flow.network.resolvers).
+
+    The index is kept up to date as deltas are applied, see apply_delta.
+
+    Attributes:
+        tokens:
+            Parsed node IDs, {node_type: {id: tokens}}.
+        ids:
+            Node IDs by field value, {node_type: {field: {value: {id}}}}.
+
+    """
+
+    INDEXED_FIELDS = {
+        FAMILY_PROXIES: (
+            'state', 'cycle_point', 'name', 'is_held', 'is_queued'
+        ),
+        JOBS: ('state', 'cycle_point', 'name'),
+        TASK_PROXIES: (
+            'state', 'cycle_point', 'name', 'is_held', 'is_queued'
+        ),
+    }
+
+    def __init__(self):
+        self.tokens: Dict[str, Dict[str, Tokens]] = {
+            key: {} for key in self.INDEXED_FIELDS
+        }
+        self.ids: Dict[str, Dict[str, Dict[Any, Set[str]]]] = {
+            key: {field: {} for field in fields}
+            for key, fields in self.INDEXED_FIELDS.items()
+        }
+        # indexed field values by node ID
+        self._values: Dict[str, Dict[str, tuple]] = {
+            key: {} for key in self.INDEXED_FIELDS
+        }
+        # the order nodes were added, to return them in data-store order
+        self._order: Dict[str, Dict[str, int]] = {
+            key: {} for key in self.INDEXED_FIELDS
+        }
+        self._counter = count()
+
+    def update(self, key, elements, ids):
+        """Update the index for changes to these nodes.
+
+        Args:
+            key (str):
+                Node type, e.g. "task_proxies".
+            elements (dict):
+                The data-store elements of this type.
+            ids (Iterable):
+                IDs of the nodes which have been added, updated or pruned.
+
+        """
+        if key not in self.INDEXED_FIELDS:
+            return
+        fields = self.INDEXED_FIELDS[key]
+        for e_id in ids:
+            values = self._values[key].pop(e_id, None)
+            if values is not None:
+                for field, value in zip(fields, values):
+                    field_ids = self.ids[key][field]
+                    field_ids[value].discard(e_id)
+                    if not field_ids[value]:
+                        del field_ids[value]
+            element = elements.get(e_id)
+            if element is None:
+                self.tokens[key].pop(e_id, None)
+                self._order[key].pop(e_id, None)
+                continue
+            if e_id not in self.tokens[key]:
+                self.tokens[key][e_id] = Tokens(e_id)
+                self._order[key][e_id] = next(self._counter)
+            values = tuple(getattr(element, field) for field in fields)
+            self._values[key][e_id] = values
+            for field, value in zip(fields, values):
+                self.ids[key][field].setdefault(value, set()).add(e_id)
+
+    def get_ids(self, key, field, values):
+        """Return the IDs of nodes with any of these values of a field."""
+        field_ids = self.ids[key][field]
+        return set().union(*(field_ids.get(value, ()) for value in values))
+
+    def sort(self, key, ids):
+        """Return node IDs in the order of the data-store."""
+        return sorted(ids, key=self._order[key].__getitem__)
+
+
+def merge_updated(key, element, updated):
+    """Merge the updated fields of a delta into a data element.
+
+    Args:
+        key (str):
+            Element type, e.g. "task_proxies".
+        element (object):
+            Data element to update.
+        updated (object):
+            Element of updated fields, of the same type.
+
+    """
+    # Clear fields that require overwrite with delta
+    for field, _ in updated.ListFields():
+        if field.name in CLEAR_FIELD_MAP[key]:
+            element.ClearField(field.name)
+    if key == WORKFLOW and updated.states_updated:
+        for field in CLEAR_FIELD_MAP[key]:
+            element.ClearField(field)
+    element.MergeFrom(updated)
+
+
+def _apply_delta(key, delta, data):
+    """Helper for apply_delta."""
     # Assimilate new data
     if getattr(delta, 'added', False):
         if key != WORKFLOW:
@@ -304,22 +528,11 @@ def apply_delta(key, delta, data):
     # Merge in updated fields
     if getattr(delta, 'updated', False):
         if key == WORKFLOW:
-            # Clear fields that require overwrite with delta
-            field_set = {f.name for f, _ in delta.updated.ListFields()}
-            for field in CLEAR_FIELD_MAP[key]:
-                if field in field_set or delta.updated.states_updated:
-                    data[key].ClearField(field)
-            data[key].MergeFrom(delta.updated)
+            merge_updated(key, data[key], delta.updated)
         else:
             for element in delta.updated:
                 try:
-                    data_element = data[key][element.id]
-                    # Clear fields that require overwrite with delta
-                    if CLEAR_FIELD_MAP[key]:
-                        for field, _ in element.ListFields():
-                            if field.name in CLEAR_FIELD_MAP[key]:
-                                data_element.ClearField(field.name)
-                    data_element.MergeFrom(element)
+                    merge_updated(key, data[key][element.id], element)
                 except KeyError as exc:
                     # Ensure data-sync doesn't fail with
                     # network issues, sync reconcile/validate will catch.
@@ -382,6 +595,143 @@ def apply_delta(key, delta, data):
             del data[key][del_id]
 
 
+def serialize_deltas(deltas):
+    """Return deltas serialized for publishing.
+
+    Each delta is serialized once, the "all" message is made by
+    concatenating the serialized deltas as its fields (see
+    encode_message_field). The results are bytes, so can be handed to
+    the publisher without copying.
+
+    Args:
+        deltas (dict):
+            Deltas by type, e.g. DataStoreMgr.deltas.
+
+    Returns:
+        list - [(topic, message, serializer), ...]
+
+    """
+    all_fields = DELTAS_MAP[ALL_DELTAS].DESCRIPTOR.fields_by_name
+    result = []
+    all_deltas = []
+    for key, delta in deltas.items():
+        if delta.ListFields():
+            msg = delta.SerializeToString()
+            result.append((key.encode('utf-8'), msg, None))
+            all_deltas.append((all_fields[key].number, msg))
+    result.append((
+        ALL_DELTAS.encode('utf-8'),
+        b''.join(
+            encode_message_field(number, msg)
+            for number, msg in sorted(all_deltas)
+        ),
+        None
+    ))
+    return result
+
+
+def merge_deltas(key, delta, new_delta):
+    """Merge two deltas of the same type.
+
+    The result has the same effect as the two deltas applied in turn, i.e.
+    the last update of a field wins and pruned IDs are combined.
+    Neither delta is modified.
+
+    Args:
+        key (str):
+            Delta type, e.g. "task_proxies".
+        delta (object):
+            The earlier delta.
+        new_delta (object):
+            The later delta.
+
+    Returns:
+        object - the merged delta
+
+    """
+    merged = type(delta)()
+    if new_delta.reloaded:
+        # (a reloaded delta replaces everything before it)
+        merged.CopyFrom(new_delta)
+        return merged
+    if key == WORKFLOW:
+        merged.CopyFrom(delta)
+        if new_delta.added.ListFields():
+            merged.added.CopyFrom(new_delta.added)
+            merged.ClearField('updated')
+            if new_delta.HasField('updated'):
+                merged.updated.CopyFrom(new_delta.updated)
+        elif new_delta.HasField('updated'):
+            merge_updated(key, merged.updated, new_delta.updated)
+        if new_delta.HasField('pruned'):
+            merged.pruned = new_delta.pruned
+    else:
+        added = {element.id: element for element in delta.added}
+        updated = {element.id: element for element in delta.updated}
+        new_added_ids = {element.id for element in new_delta.added}
+        new_pruned_ids = set(new_delta.pruned)
+        for element in new_delta.added:
+            added[element.id] = element
+            updated.pop(element.id, None)
+        for element in new_delta.updated:
+            # (updates to elements added in the earlier delta
+            # are merged into the added element)
+            elements = added if element.id in added else updated
+            if element.id in elements:
+                merged_element = type(element)()
+                merged_element.CopyFrom(elements[element.id])
+                merge_updated(key, merged_element, element)
+                elements[element.id] = merged_element
+            else:
+                elements[element.id] = element
+        for e_id in new_pruned_ids:
+            added.pop(e_id, None)
+            updated.pop(e_id, None)
+        merged.added.extend(added.values())
+        merged.updated.extend(updated.values())
+        merged.pruned.extend(
+            e_id for e_id in delta.pruned
+            if e_id not in new_added_ids and e_id not in new_pruned_ids
+        )
+        merged.pruned.extend(new_delta.pruned)
+        if delta.HasField('reloaded'):
+            merged.reloaded = delta.reloaded
+    merged.time = new_delta.time
+    if hasattr(merged, 'checksum'):
+        merged.checksum = new_delta.checksum
+    return merged
+
+
+def merge_publish_deltas(publish_deltas_list):
+    """Merge sets of deltas for publishing into one.
+
+    Args:
+        publish_deltas_list (list):
+            Sets of deltas for publishing (see serialize_deltas), in the
+            order they were made.
+
+    Returns:
+        list - [(topic, message, serializer), ...]
+
+    """
+    deltas = {}
+    others = []
+    for publish_deltas in publish_deltas_list:
+        for item in publish_deltas:
+            key = item[0].decode('utf-8')
+            if key == ALL_DELTAS:
+                # (this is remade from the merged deltas)
+                continue
+            if key not in DELTAS_MAP:
+                others.append(item)
+                continue
+            delta = DELTAS_MAP[key].FromString(item[1])
+            if key in deltas:
+                delta = merge_deltas(key, deltas[key], delta)
+            deltas[key] = delta
+    return serialize_deltas(deltas) + others
+
+
 def create_delta_store(delta=None, workflow_id=None):
     """Create a mini data-store out of the all deltas message.
 
@@ -426,6 +776,84 @@ def create_delta_store(delta=None, workflow_id=None):
     return delta_store
 
 
+def merge_delta_stores(delta_store, new_delta_store):
+    """Merge two delta stores (see create_delta_store).
+
+    The result has the same effect as the two delta stores applied in turn.
+    Neither delta store is modified, but elements which are not changed by
+    the merge are shared with them.
+
+    Args:
+        delta_store (dict):
+            The earlier delta store.
+        new_delta_store (dict):
+            The later delta store.
+
+    Returns:
+        dict
+
+    """
+    added = dict(delta_store[DELTA_ADDED])
+    updated = dict(delta_store[DELTA_UPDATED])
+    pruned = dict(delta_store[DELTA_PRUNED])
+    new_added = new_delta_store[DELTA_ADDED]
+    new_updated = new_delta_store[DELTA_UPDATED]
+    new_pruned = new_delta_store[DELTA_PRUNED]
+
+    if new_added[WORKFLOW].ListFields():
+        added[WORKFLOW] = new_added[WORKFLOW]
+        updated[WORKFLOW] = new_updated[WORKFLOW]
+    elif new_updated[WORKFLOW].ListFields():
+        workflow = PbWorkflow()
+        workflow.CopyFrom(updated[WORKFLOW])
+        merge_updated(WORKFLOW, workflow, new_updated[WORKFLOW])
+        updated[WORKFLOW] = workflow
+    if new_pruned.get(WORKFLOW):
+        pruned[WORKFLOW] = new_pruned[WORKFLOW]
+
+    for key in DATA_TEMPLATE:
+        if key == WORKFLOW:
+            continue
+        if not (new_added[key] or new_updated[key] or new_pruned[key]):
+            continue
+        added[key] = dict(added[key])
+        updated[key] = dict(updated[key])
+        pruned_ids = set(new_pruned[key])
+        pruned[key] = [
+            e_id for e_id in pruned[key]
+            if e_id not in new_added[key] and e_id not in pruned_ids
+        ]
+        pruned[key].extend(new_pruned[key])
+        for e_id, element in new_added[key].items():
+            added[key][e_id] = element
+            updated[key].pop(e_id, None)
+        for e_id, element in new_updated[key].items():
+            # (updates to elements added in the earlier delta store
+            # are merged into the added element)
+            elements = added[key] if e_id in added[key] else updated[key]
+            if e_id in elements:
+                merged = type(element)()
+                merged.CopyFrom(elements[e_id])
+                merge_updated(key, merged, element)
+                elements[e_id] = merged
+            else:
+                elements[e_id] = element
+        for e_id in pruned_ids:
+            added[key].pop(e_id, None)
+            updated[key].pop(e_id, None)
+
+    merged_store = {
+        **delta_store,
+        **new_delta_store,
+        DELTA_ADDED: added,
+        DELTA_UPDATED: updated,
+        DELTA_PRUNED: pruned,
+    }
+    if delta_store.get('shutdown'):
+        merged_store['shutdown'] = True
+    return merged_store
+
+
 class DataStoreMgr:
     """Manage the workflow data store.
 
@@ -506,7 +934,15 @@ class DataStoreMgr:
         }
         # internal delta
         self.delta_queues = {self.workflow_id: {}}
+        # indexes of the data-store nodes, by workflow ID
+        self.node_indexes = {self.workflow_id: NodeIndex()}
         self.publish_deltas = []
+        # data-store checksums by element type (see apply_delta)
+        self.checksums = {
+            key: 0
+            for key, delta in self.deltas.items()
+            if hasattr(delta, 'checksum')
+        }
         # internal n-window
         self.all_task_pool = set()
         self.all_n_window_nodes = set()
@@ -2690,24 +3126,25 @@ class DataStoreMgr:
         data = self.data[self.workflow_id]
         for key, delta in self.deltas.items():
             if delta.ListFields():
-                apply_delta(key, delta, data)
+                apply_delta(
+                    key,
+                    delta,
+                    data,
+                    self.checksums,
+                    self.node_indexes[self.workflow_id],
+                )
 
     def apply_delta_checksum(self):
-        """Construct checksum on deltas for export."""
-        data = self.data[self.workflow_id]
+        """Construct checksum on deltas for export.
+
+        The checksums are maintained as deltas are applied, see apply_delta.
+        """
         update_time = time()
         for key, delta in self.deltas.items():
             if delta.ListFields():
                 delta.time = update_time
                 if hasattr(delta, 'checksum'):
-                    if key == EDGES:
-                        s_att = 'id'
-                    else:
-                        s_att = 'stamp'
-                    delta.checksum = generate_checksum(
-                        [getattr(e, s_att)
-                         for e in data[key].values()]
-                    )
+                    delta.checksum = self.checksums[key]
 
     def clear_delta_batch(self):
         """Clear current deltas."""
@@ -2751,19 +3188,9 @@ class DataStoreMgr:
         return workflow_msg
 
     def get_publish_deltas(self):
-        """Return deltas for publishing."""
-        all_deltas = DELTAS_MAP[ALL_DELTAS]()
-        result = []
-        for key, delta in self.deltas.items():
-            if delta.ListFields():
-                result.append(
-                    (key.encode('utf-8'), delta, 'SerializeToString'))
-                getattr(all_deltas, key).CopyFrom(delta)
-        result.append(
-            (ALL_DELTAS.encode('utf-8'), all_deltas, 'SerializeToString')
-        )
+        """Return deltas for publishing (see serialize_deltas)."""
         self.publish_pending = True
-        return deepcopy(result)
+        return serialize_deltas(self.deltas)
 
     def get_data_elements(self, element_type):
         """Get elements of a given type in the form of a delta.
@@ -67,7 +67,6 @@ from functools import lru_cache
 from io import BytesIO
 import json
 import random
-from time import sleep
 import token
 from tokenize import tokenize
 
@@ -553,26 +552,23 @@ def _get_metrics(hosts, metrics, data=None):
             proc_map[host] = run_cmd(['cylc'] + cmd, **kwargs)
 
     # Collect results from commands
-    while proc_map:
-        for host, proc in list(proc_map.copy().items()):
-            if proc.poll() is None:
-                continue
-            del proc_map[host]
-            out, err = (stream.strip() for stream in proc.communicate())
-            if proc.wait():
-                # Command failed
-                LOG.warning(
-                    'Error evaluating ranking expression on'
-                    f' {host}: \n{err}'
-                )
-            else:
-                host_stats[host] = dict(zip(
-                    metrics,
-                    # convert JSON dicts -> namedtuples
-                    _deserialise(metrics, parse_dirty_json(out))
-                ))
-            data[host]['returncode'] = proc.returncode
-        sleep(0.01)
+    # (the commands run in parallel, so waiting for each in turn takes as
+    # long as the slowest, without polling)
+    for host, proc in proc_map.items():
+        out, err = (stream.strip() for stream in proc.communicate())
+        if proc.wait():
+            # Command failed
+            LOG.warning(
+                'Error evaluating ranking expression on'
+                f' {host}: \n{err}'
+            )
+        else:
+            host_stats[host] = dict(zip(
+                metrics,
+                # convert JSON dicts -> namedtuples
+                _deserialise(metrics, parse_dirty_json(out))
+            ))
+        data[host]['returncode'] = proc.returncode
     return host_stats, data
 
 
@@ -0,0 +1,250 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Long-lived agents which run job commands on job platforms.
+
+A job agent is a "cylc job-agent" process, started once per platform host
+(over SSH for remote platforms) and kept running for the life of the
+scheduler. It runs "cylc jobs-submit", "cylc jobs-poll" and "cylc jobs-kill"
+commands sent to it as requests, which saves an SSH connection and a Python
+start-up for every command.
+
+Requests and responses are JSON objects, one per line, on the agent's STDIN
+and STDOUT. Several requests may be sent without waiting for their responses,
+responses are matched to requests by their "id". The agent runs requests one
+at a time, in the order they were sent, so a slow command (e.g. a job
+submission to a busy batch system) holds up the requests queued behind it;
+the scheduler limits how many requests it queues on each agent and runs
+other commands as commands of their own (see SubProcPool):
+
+* The agent writes ``{"ready": true}`` when it starts.
+* Request: ``{"id": 1, "argv": ["jobs-poll", ...], "stdin": ""}``
+* The agent writes ``{"id": 1, "started": true}`` when it starts running a
+  request.
+* Response: ``{"id": 1, "ret_code": 0, "out": "...", "err": "..."}``
+
+The output of each command is the same as when it runs as a command of its
+own.
+"""
+
+from collections import deque
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from importlib import import_module
+from io import StringIO
+import json
+import os
+from queue import Empty, Queue
+from signal import SIGKILL
+from subprocess import PIPE  # nosec
+import sys
+from threading import Thread
+import traceback
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from cylc.flow.cylc_subproc import procopen
+
+# Commands a job agent will run.
+JOB_AGENT_COMMANDS = ('jobs-submit', 'jobs-poll', 'jobs-kill')
+
+
+def run_job_command(argv: List[str], stdin: str = '') -> Tuple[int, str, str]:
+    """Run a job command in this process, return (ret_code, out, err).
+
+    Args:
+        argv: The command and its arguments, e.g. ["jobs-poll", ...].
+        stdin: Content for the command's STDIN.
+
+    """
+    cmd_key, *args = argv
+    if cmd_key not in JOB_AGENT_COMMANDS:
+        return 1, '', f'job agent: unsupported command: {cmd_key}\n'
+    main = import_module(
+        f'cylc.flow.scripts.{cmd_key.replace("-", "_")}'
+    ).main
+    ret_code = 0
+    out, err = StringIO(), StringIO()
+    # (commands may modify the environment of this long-lived process)
+    orig_environ = dict(os.environ)
+    orig_stdin = sys.stdin
+    sys.stdin = StringIO(stdin)
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                main(*args)
+            except SystemExit as exc:
+                if isinstance(exc.code, int):
+                    ret_code = exc.code
+                elif exc.code is not None:
+                    ret_code = 1
+                    print(exc.code, file=sys.stderr)
+            except Exception:
+                ret_code = 1
+                traceback.print_exc()
+    finally:
+        sys.stdin = orig_stdin
+        if os.environ != orig_environ:
+            os.environ.clear()
+            os.environ.update(orig_environ)
+    return ret_code, out.getvalue(), err.getvalue()
+
+
+def run_agent(
+    stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None
+) -> None:
+    """Run job commands requested on STDIN until STDIN is closed."""
+    in_: TextIO = stdin or sys.stdin
+    out: TextIO = stdout or sys.stdout
+
+    def respond(data: Dict[str, Any]) -> None:
+        out.write(json.dumps(data) + '\n')
+        out.flush()
+
+    respond({'ready': True})
+    while True:  # Note: "for line in stdin:" may hang
+        line = in_.readline()
+        if not line:
+            break
+        try:
+            request = json.loads(line)
+            req_id = request['id']
+        except (KeyError, TypeError, ValueError):
+            continue  # not a request
+        respond({'id': req_id, 'started': True})
+        ret_code, cmd_out, cmd_err = run_job_command(
+            request.get('argv') or [''], request.get('stdin') or ''
+        )
+        respond({
+            'id': req_id, 'ret_code': ret_code, 'out': cmd_out, 'err': cmd_err
+        })
+
+
+class JobAgent:
+    """A job agent process, as seen by the scheduler.
+
+    Args:
+        cmd: The command to start the agent.
+
+    Attributes:
+        pending:
+            Items for requests awaiting a response, by request ID.
+        ready:
+            True once the agent has started, i.e. commands sent to it may
+            have been run.
+        running:
+            The ID of the request the agent is running, if any.
+        stderr:
+            The last lines written to STDERR by the agent (or by SSH).
+
+    """
+
+    def __init__(self, cmd: List[str]):
+        self.cmd = cmd
+        self.pending: Dict[int, Any] = {}
+        self.ready = False
+        self.running: Optional[int] = None
+        self.stderr: deque = deque(maxlen=20)
+        self.next_id = 0
+        # (STDOUT and STDERR are read by threads to avoid blocking)
+        self.responses: Queue = Queue()
+        self.proc = procopen(
+            cmd, stdin=PIPE, stdoutpipe=True, stderrpipe=True,
+            # Execute command as a process group leader,
+            # so we can use "os.killpg" to kill the whole group.
+            preexec_fn=os.setpgrp,
+        )
+        self.threads = [
+            Thread(target=self._read_stdout, daemon=True),
+            Thread(target=self._read_stderr, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _read_stdout(self) -> None:
+        for line in self.proc.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue  # e.g. login shell noise
+            if isinstance(response, dict):
+                self.responses.put(response)
+
+    def _read_stderr(self) -> None:
+        for line in self.proc.stderr:
+            self.stderr.append(line.decode(errors='replace'))
+
+    def is_alive(self) -> bool:
+        """Return True if the agent process is running."""
+        return self.proc.poll() is None
+
+    def send(self, argv: List[str], stdin: str, item: Any) -> None:
+        """Send a request to the agent.
+
+        The item is returned with the response by get_responses.
+
+        Raises:
+            OSError: If the request could not be sent.
+
+        """
+        self.next_id += 1
+        request = {'id': self.next_id, 'argv': argv, 'stdin': stdin}
+        self.proc.stdin.write((json.dumps(request) + '\n').encode())
+        self.proc.stdin.flush()
+        self.pending[self.next_id] = item
+
+    def get_responses(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Return (item, response) for requests which have been answered.
+
+        Requests which the agent has started running are also returned, with
+        the response ``{"id": ..., "started": true}``.
+        """
+        ret = []
+        while True:
+            try:
+                response = self.responses.get_nowait()
+            except Empty:
+                break
+            req_id = response.get('id')
+            if response.get('ready'):
+                self.ready = True
+            elif req_id not in self.pending:
+                continue
+            elif response.get('started'):
+                self.running = req_id
+                ret.append((self.pending[req_id], response))
+            else:
+                if req_id == self.running:
+                    self.running = None
+                ret.append((self.pending.pop(req_id), response))
+        return ret
+
+    def is_done(self) -> bool:
+        """Return True if the agent has exited and its output is all read."""
+        return (
+            not self.is_alive()
+            and not any(thread.is_alive() for thread in self.threads)
+            and self.responses.empty()
+        )
+
+    def stop(self) -> None:
+        """Ask the agent to exit, by closing its STDIN."""
+        with suppress(OSError):
+            self.proc.stdin.close()
+
+    def kill(self) -> None:
+        """Kill the agent."""
+        self.stop()
+        with suppress(ProcessLookupError, PermissionError):
+            os.killpg(self.proc.pid, SIGKILL)
+        self.proc.wait()
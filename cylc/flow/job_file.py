@@ -15,7 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Write job files."""
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from io import StringIO
 import os
 import re
 import stat
@@ -29,21 +31,144 @@ from cylc.flow.log_level import verbosity_to_env
 from cylc.flow.config import interpolate_template, ParamExpandError
 
 
+REINVOCATION = dedent('''
+    if [[ $1 == 'noreinvoke' ]]; then
+        shift
+    else
+        exec bash -l "$0" noreinvoke "$@"
+    fi
+''')
+
+
 class JobFileWriter:
 
-    """Write job files."""
+    """Write job files.
+
+    Sections of job files which are the same for many jobs (e.g. the members
+    of a large ensemble) are rendered once and cached:
+
+    * The workflow environment, by workflow UUID.
+    * The runtime environment and scripts, by their (post-broadcast) values.
+
+    The syntax of the job file is only checked once for each combination of
+    sections containing user defined code, as the remaining sections only
+    differ in Cylc generated IDs.
+    """
+
+    # Maximum number of entries in each cache.
+    CACHE_MAX = 1000
+    # Maximum number of threads used by "write_many".
+    WRITE_THREADS = 8
 
     def __init__(self):
         self.workflow_env = {}
         self.job_runner_mgr = JobRunnerManager()
+        self._workflow_env_sections = {}
+        self._user_sections = {}
+        self._syntax_ok = {}
 
     def set_workflow_env(self, workflow_env):
         """Configure workflow environment for all job files."""
         self.workflow_env.clear()
         self.workflow_env.update(workflow_env)
+        self._workflow_env_sections.clear()
 
     def write(self, local_job_file_path, job_conf, check_syntax=True):
         """Write each job script section in turn."""
+        content, syntax_key = self._render(job_conf)
+        self._write_tmp(local_job_file_path, content)
+        if check_syntax and syntax_key not in self._syntax_ok:
+            self._check_syntax(local_job_file_path)
+            self._cache_set(self._syntax_ok, syntax_key, True)
+        self._install(local_job_file_path)
+
+    def write_many(self, jobs, check_syntax=True):
+        """Write many job files, using threads for the file operations.
+
+        The syntax is checked for one job file of each distinct combination
+        of user defined code which has not been checked before.
+
+        Args:
+            jobs:
+                List of (local_job_file_path, job_conf).
+            check_syntax:
+                Check the syntax of job files.
+
+        Returns:
+            list: The exception raised for each job file, or None if it was
+            written OK, in the same order as jobs.
+
+        """
+        errors = [None] * len(jobs)
+        rendered = {}
+        for i, (_, job_conf) in enumerate(jobs):
+            try:
+                rendered[i] = self._render(job_conf)
+            except Exception as exc:
+                errors[i] = exc
+        for i, error in self._run_threaded(
+            lambda i: self._write_tmp(jobs[i][0], rendered[i][0]),
+            list(rendered),
+        ).items():
+            errors[i] = error
+            del rendered[i]
+        if check_syntax:
+            groups = {}
+            for i, (_, syntax_key) in rendered.items():
+                if syntax_key not in self._syntax_ok:
+                    groups.setdefault(syntax_key, []).append(i)
+            for syntax_key, error in self._run_threaded(
+                lambda key: self._check_syntax(jobs[groups[key][0]][0]),
+                list(groups),
+            ).items():
+                # the other job files have the same user defined code
+                for i in groups.pop(syntax_key):
+                    errors[i] = error
+                    del rendered[i]
+            for syntax_key in groups:
+                self._cache_set(self._syntax_ok, syntax_key, True)
+        for i, error in self._run_threaded(
+            lambda i: self._install(jobs[i][0]),
+            list(rendered),
+        ).items():
+            errors[i] = error
+        return errors
+
+    @classmethod
+    def _run_threaded(cls, func, items):
+        """Call func(item) for each item, using threads for many items.
+
+        Returns:
+            dict: {item: exception} for each call which raised an exception.
+
+        """
+        errors = {}
+
+        def _call(item):
+            try:
+                func(item)
+            except Exception as exc:
+                errors[item] = exc
+
+        if len(items) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(cls.WRITE_THREADS, len(items))
+            ) as executor:
+                list(executor.map(_call, items))
+        else:
+            for item in items:
+                _call(item)
+        return errors
+
+    @classmethod
+    def _cache_set(cls, cache, key, value):
+        """Add an item to a cache, evicting the oldest item if full."""
+        if len(cache) >= cls.CACHE_MAX:
+            del cache[next(iter(cache))]
+        cache[key] = value
+
+    def _render(self, job_conf):
+        """Return the job file content and its syntax check key."""
 
         # ########### !!!!!!!! WARNING !!!!!!!!!!! #####################
         # BE EXTREMELY WARY OF CHANGING THE ORDER OF JOB SCRIPT SECTIONS
@@ -55,52 +180,121 @@ class JobFileWriter:
         # Access to cylc must be configured before user environment so
         # that cylc commands can be used in defining user environment
         # variables: NEXT_CYCLE=$( cylc cycle-point --offset-hours=6 )
+        handle = StringIO()
+        self._write_header(handle, job_conf)
+        self._write_directives(handle, job_conf)
+        prelude = StringIO()
+        self._write_reinvocation(prelude)
+        self._write_prelude(prelude, job_conf)
+        prelude = prelude.getvalue()
+        handle.write(prelude)
+        workflow_env_section = self._get_workflow_env_section(job_conf)
+        handle.write(workflow_env_section)
+        self._write_task_environment(handle, job_conf)
+        # workflow bin access must be before runtime environment
+        # because workflow bin commands may be used in variable
+        # assignment expressions: FOO=$(command args).
+        user_sections = self._get_user_sections(job_conf)
+        handle.write(user_sections)
+        self._write_epilogue(handle, job_conf)
+        # The header, directives (comments) and Cylc generated IDs cannot
+        # affect the syntax of the job file, everything else can.
+        syntax_key = (
+            prelude,
+            workflow_env_section,
+            user_sections,
+            job_conf['work_d'],
+            tuple(job_conf['param_var'].items()),
+        )
+        return handle.getvalue(), syntax_key
+
+    def _get_workflow_env_section(self, job_conf):
+        """Return the (cached) workflow environment section."""
+        try:
+            return self._workflow_env_sections[job_conf['uuid_str']]
+        except KeyError:
+            handle = StringIO()
+            self._write_workflow_environment(handle, job_conf)
+            section = handle.getvalue()
+            self._cache_set(
+                self._workflow_env_sections, job_conf['uuid_str'], section)
+            return section
+
+    def _get_user_sections(self, job_conf):
+        """Return the (cached) runtime environment and script sections.
+
+        These only depend on the task's runtime configuration (including
+        broadcasts), its parameters and its platform, so are the same for
+        the jobs of many tasks.
+        """
+        key = (
+            tuple(
+                (var, str(val))
+                for var, val in (job_conf['environment'] or {}).items()
+            ),
+            tuple(job_conf.get('param_var', {}).items()),
+            tuple(
+                job_conf[prefix + 'script']
+                for prefix in ['init-', 'env-', 'err-', 'pre-', '', 'post-',
+                               'exit-']
+            ),
+            job_conf['platform']['global init-script'],
+        )
+        try:
+            return self._user_sections[key]
+        except KeyError:
+            handle = StringIO()
+            self._write_runtime_environment(handle, job_conf)
+            self._write_script(handle, job_conf)
+            self._write_global_init_script(handle, job_conf)
+            section = handle.getvalue()
+            self._cache_set(self._user_sections, key, section)
+            return section
+
+    @staticmethod
+    def _write_tmp(local_job_file_path, content):
+        """Write the content of a job file to its temporary file."""
         tmp_name = os.path.expandvars(local_job_file_path + '.tmp')
         try:
             with open(tmp_name, 'w') as handle:
-                self._write_header(handle, job_conf)
-                self._write_directives(handle, job_conf)
-                self._write_reinvocation(handle)
-                self._write_prelude(handle, job_conf)
-                self._write_workflow_environment(handle, job_conf)
-                self._write_task_environment(handle, job_conf)
-                # workflow bin access must be before runtime environment
-                # because workflow bin commands may be used in variable
-                # assignment expressions: FOO=$(command args).
-                self._write_runtime_environment(handle, job_conf)
-                self._write_script(handle, job_conf)
-                self._write_global_init_script(handle, job_conf)
-                self._write_epilogue(handle, job_conf)
+                handle.write(content)
         except IOError as exc:
             # Remove temporary file
             with suppress(OSError):
                 os.unlink(tmp_name)
             raise exc
-        # check syntax
-        if check_syntax:
-            try:
-                with Popen(  # nosec
-                    ['/usr/bin/env', 'bash', '-n', tmp_name],
-                    stderr=PIPE,
-                    stdin=DEVNULL,
-                    text=True
-                    # * the purpose of this is to evaluate user defined code
-                    #   prior to it being executed
-                ) as proc:
-                    if proc.wait():
-                        # This will leave behind the temporary file,
-                        # which is useful for debugging syntax errors, etc.
-                        raise RuntimeError(proc.communicate()[1])
-            except OSError as exc:
-                # Popen has a bad habit of not telling you anything if it fails
-                # to run the executable.
-                if exc.filename is None:
-                    exc.filename = 'bash'
-                # Remove temporary file
-                with suppress(OSError):
-                    os.unlink(tmp_name)
-                raise exc
-        # Make job file executable
+
+    @staticmethod
+    def _check_syntax(local_job_file_path):
+        """Check the syntax of the temporary file of a job file."""
+        tmp_name = os.path.expandvars(local_job_file_path + '.tmp')
+        try:
+            with Popen(  # nosec
+                ['/usr/bin/env', 'bash', '-n', tmp_name],
+                stderr=PIPE,
+                stdin=DEVNULL,
+                text=True
+                # * the purpose of this is to evaluate user defined code
+                #   prior to it being executed
+            ) as proc:
+                if proc.wait():
+                    # This will leave behind the temporary file,
+                    # which is useful for debugging syntax errors, etc.
+                    raise RuntimeError(proc.communicate()[1])
+        except OSError as exc:
+            # Popen has a bad habit of not telling you anything if it fails
+            # to run the executable.
+            if exc.filename is None:
+                exc.filename = 'bash'
+            # Remove temporary file
+            with suppress(OSError):
+                os.unlink(tmp_name)
+            raise exc
+
+    @staticmethod
+    def _install(local_job_file_path):
+        """Make the temporary file of a job file executable and rename it."""
+        tmp_name = os.path.expandvars(local_job_file_path + '.tmp')
         mode = (
             os.stat(tmp_name).st_mode |
             stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
@@ -151,13 +345,7 @@ class JobFileWriter:
         # option and GNU env doesn't support additional arguments (recent
         # versions permit this with the -S option similar to BSD env but we
         # cannot make the jump to this until is it more widely adopted)
-        handle.write(dedent('''
-            if [[ $1 == 'noreinvoke' ]]; then
-                shift
-            else
-                exec bash -l "$0" noreinvoke "$@"
-            fi
-        '''))
+        handle.write(REINVOCATION)
 
     def _write_prelude(self, handle, job_conf):
         """Job script prelude."""
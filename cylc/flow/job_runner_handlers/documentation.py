@@ -361,6 +361,21 @@ class ExampleHandler():
         """
         raise NotImplementedError()
 
+    def get_poll_all_cmd(self) -> List[str]:
+        """Return a command to poll all of the user's jobs.
+
+        If specified, and the platform's
+        :cylc:conf:`global.cylc[platforms][<platform name>]poll cache max age`
+        is set, one poll of all of the user's jobs can be shared between
+        polls made by a job agent. The output is read in the same way as
+        the output of :py:meth:`ExampleHandler.get_poll_many_cmd`.
+
+        Returns:
+            command e.g. ['foo', '--user', 'me']
+
+        """
+        raise NotImplementedError()
+
     def get_submit_stdin(self, job_file_path: str, submit_opts: dict) -> Tuple:
         """
 
@@ -115,5 +115,10 @@ class SGEHandler:
         # job_runner_mgr._jobs_poll_runner checks requested id in list.
         return [cls.POLL_CMD]
 
+    @classmethod
+    def get_poll_all_cmd(cls):
+        """Return the poll command for all of the user's jobs."""
+        return [cls.POLL_CMD]
+
 
 JOB_RUNNER_HANDLER = SGEHandler()
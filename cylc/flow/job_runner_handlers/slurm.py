@@ -105,6 +105,7 @@ The resulting formatted directives are:
 import re
 import shlex
 
+from cylc.flow.hostuserutil import get_user
 from cylc.flow.id import Tokens
 
 
@@ -192,5 +193,10 @@ class SLURMHandler():
         """Return the poll command for a list of job IDs."""
         return shlex.split(cls.POLL_CMD) + ["-j", ",".join(job_ids)]
 
+    @classmethod
+    def get_poll_all_cmd(cls):
+        """Return the poll command for all of the user's jobs."""
+        return shlex.split(cls.POLL_CMD) + ["-u", get_user()]
+
 
 JOB_RUNNER_HANDLER = SLURMHandler()
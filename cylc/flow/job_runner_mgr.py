@@ -23,6 +23,7 @@ Please update this file as the interface changes.
 
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 import json
 import os
@@ -34,6 +35,9 @@ import traceback
 from shutil import rmtree
 from signal import SIGKILL
 from subprocess import DEVNULL  # nosec
+from threading import Lock
+from time import time
+from typing import Dict, Optional, Tuple
 
 from cylc.flow.task_message import (
     CYLC_JOB_PID, CYLC_JOB_INIT_TIME, CYLC_JOB_EXIT_TIME, CYLC_JOB_EXIT,
@@ -63,7 +67,8 @@ class JobPollContext():
 
     __slots__ = CONTEXT_ATTRIBUTES + (
         'pid',
-        'messages'
+        'messages',
+        'status_mtime',  # modification time of the job status file
     )
 
     def __init__(self, job_log_dir, **attrs):
@@ -79,6 +84,7 @@ class JobPollContext():
         self.time_run_exit = None
         self.job_runner_call_no_lines = None
         self.messages = []
+        self.status_mtime = None
 
         if attrs:
             for key, value in attrs.items():
@@ -91,6 +97,13 @@ class JobPollContext():
         for i in self.__slots__:
             setattr(self, i, getattr(other, i))
 
+    def copy(self):
+        """Return a copy of this context."""
+        ret = JobPollContext(self.job_log_dir)
+        ret.update(self)
+        ret.messages = list(self.messages)
+        return ret
+
     def get_summary_str(self):
         """Return the poll context as a summary string delimited by "|"."""
         ret = OrderedDict()
@@ -124,6 +137,16 @@ class JobRunnerManager():
     OUT_PREFIX_SUMMARY = "[TASK JOB SUMMARY]"
     OUT_PREFIX_CMD_ERR = "[TASK JOB ERROR]"
     _INSTANCES: dict = {}
+    # Job status files read so far, for reading only what is appended to
+    # them since (in a long-lived process, i.e. a job agent):
+    # {path: (inode, head of file, offset read to, context read so far)}
+    _STATUS_FILES: Dict[str, Tuple[int, bytes, int, JobPollContext]] = {}
+    STATUS_FILES_MAX = 10000
+    STATUS_FILE_HEAD_SIZE = 64
+    # Results of job runner queries for all of the user's jobs, for sharing
+    # between polls (in a long-lived process):
+    # {job_runner_name: (time, (ret_code, out, err))}
+    _POLL_ALL_RESULTS: Dict[str, Tuple[float, Tuple[int, str, str]]] = {}
 
     @classmethod
     def configure_workflow_run_dir(cls, workflow_run_dir):
@@ -217,11 +240,14 @@ class JobRunnerManager():
                     sys.stdout.write("%s%s|%s|%s" % (
                         self.OUT_PREFIX_CMD_ERR, now, job_log_dir, line))
 
-    def jobs_poll(self, job_log_root, job_log_dirs):
+    def jobs_poll(self, job_log_root, job_log_dirs, max_age=0):
         """Poll multiple jobs.
 
         job_log_root -- The log/job/ sub-directory of the workflow.
         job_log_dirs -- A list containing point/name/submit_num for jobs.
+        max_age -- If the job runner can list all of the user's jobs, reuse
+            such a list made up to this many seconds ago, if no job status
+            file has changed since.
 
         """
         if "$" in job_log_root:
@@ -258,7 +284,7 @@ class JobRunnerManager():
 
         for job_runner_name, my_ctx_list in ctx_list_by_job_runner.items():
             self._jobs_poll_runner(
-                job_log_root, job_runner_name, my_ctx_list)
+                job_log_root, job_runner_name, my_ctx_list, max_age)
 
         cur_time_str = get_current_time_string()
         for ctx in ctx_list:
@@ -274,13 +300,17 @@ class JobRunnerManager():
                 ctx.get_summary_str()))
 
     def jobs_submit(self, job_log_root, job_log_dirs, remote_mode=False,
-                    utc_mode=False):
+                    utc_mode=False, max_workers=1):
         """Submit multiple jobs.
 
         job_log_root -- The log/job/ sub-directory of the workflow.
         job_log_dirs -- A list containing point/name/submit_num for jobs.
         remote_mode -- am I running on the remote job host?
         utc_mode -- is the workflow running in UTC mode?
+        max_workers -- the maximum number of jobs to submit at the same time.
+
+        In remote mode, each job is submitted as soon as its job file has been
+        read from STDIN.
 
         """
         if "$" in job_log_root:
@@ -291,25 +321,53 @@ class JobRunnerManager():
         else:
             items = self._jobs_submit_prep_by_args(job_log_root, job_log_dirs)
         now = get_current_time_string(override_use_utc=utc_mode)
-        for job_log_dir, job_runner_name, submit_opts in items:
-            job_file_path = os.path.join(
-                job_log_root, job_log_dir, JOB_LOG_JOB)
-            if not job_runner_name:
-                sys.stdout.write("%s%s|%s|1|\n" % (
-                    self.OUT_PREFIX_SUMMARY, now, job_log_dir))
-                continue
+        if max_workers > 1:
+            lock = Lock()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._jobs_submit_item, job_log_root, now, item, lock)
+                    for item in items
+                ]
+            for future in futures:
+                # raise any exception
+                future.result()
+        else:
+            for item in items:
+                self._jobs_submit_item(job_log_root, now, item)
+
+    def _jobs_submit_item(self, job_log_root, now, item, lock=None):
+        """Submit a job for self.jobs_submit() and write its output.
+
+        item -- (job_log_dir, job_runner_name, submit_opts)
+        lock -- if submitting in parallel, a lock for writing the output.
+
+        """
+        job_log_dir, job_runner_name, submit_opts = item
+        job_file_path = os.path.join(job_log_root, job_log_dir, JOB_LOG_JOB)
+        if not job_runner_name:
+            lines = ["%s%s|%s|1|\n" % (
+                self.OUT_PREFIX_SUMMARY, now, job_log_dir)]
+        else:
             ret_code, out, err, job_id = self._job_submit_impl(
                 job_file_path, job_runner_name, submit_opts)
-            sys.stdout.write("%s%s|%s|%d|%s\n" % (
-                self.OUT_PREFIX_SUMMARY, now, job_log_dir, ret_code, job_id))
+            lines = ["%s%s|%s|%d|%s\n" % (
+                self.OUT_PREFIX_SUMMARY, now, job_log_dir, ret_code, job_id)]
             for key, value in [("STDERR", err), ("STDOUT", out)]:
                 if value is None or not value.strip():
                     continue
                 for line in value.splitlines(True):
                     if not value.endswith("\n"):
                         value += "\n"
-                    sys.stdout.write("%s%s|%s|[%s] %s" % (
+                    lines.append("%s%s|%s|[%s] %s" % (
                         self.OUT_PREFIX_COMMAND, now, job_log_dir, key, line))
+        if lock is None:
+            sys.stdout.write(''.join(lines))
+        else:
+            # keep the output of each job together
+            with lock:
+                sys.stdout.write(''.join(lines))
+                sys.stdout.flush()
 
     def job_kill(self, st_file_path):
         """Ask job runner to terminate the job specified in "st_file_path".
@@ -432,45 +490,124 @@ class JobRunnerManager():
         return out, err, job_id
 
     def _jobs_poll_status_files(self, job_log_root, job_log_dir):
-        """Helper 1 for self.jobs_poll(job_log_root, job_log_dirs)."""
-        ctx = JobPollContext(job_log_dir)
+        """Helper 1 for self.jobs_poll(job_log_root, job_log_dirs).
+
+        Only the part of the file appended since it was last read by this
+        process is parsed.
+        """
+        path = os.path.join(job_log_root, job_log_dir, JOB_LOG_STATUS)
+        cached = self._STATUS_FILES.pop(path, None)
         try:
-            with open(
-                os.path.join(job_log_root, ctx.job_log_dir, JOB_LOG_STATUS)
-            ) as handle:
-                for line in handle:
-                    if "=" not in line:
-                        continue
-                    key, value = line.strip().split("=", 1)
-                    if key == self.CYLC_JOB_RUNNER_NAME:
-                        ctx.job_runner_name = value
-                    elif key == self.CYLC_JOB_ID:
-                        ctx.job_id = value
-                    elif key == self.CYLC_JOB_RUNNER_EXIT_POLLED:
-                        ctx.job_runner_exit_polled = 1
-                    elif key == CYLC_JOB_PID:
-                        ctx.pid = value
-                    elif key == self.CYLC_JOB_RUNNER_SUBMIT_TIME:
-                        ctx.time_submit_exit = value
-                    elif key == CYLC_JOB_INIT_TIME:
-                        ctx.time_run = value
-                    elif key == CYLC_JOB_EXIT_TIME:
-                        ctx.time_run_exit = value
-                    elif key == CYLC_JOB_EXIT:
-                        if value == TASK_OUTPUT_SUCCEEDED.upper():
-                            ctx.run_status = 0
-                        else:
-                            ctx.run_status = 1
-                            ctx.run_signal = value
-                    elif key == CYLC_MESSAGE:
-                        ctx.messages.append(value)
+            with open(path, "rb") as handle:
+                stat_ = os.fstat(handle.fileno())
+                head = handle.read(self.STATUS_FILE_HEAD_SIZE)
+                if (
+                    cached is not None
+                    and cached[0] == stat_.st_ino
+                    and cached[2] <= stat_.st_size
+                    and head.startswith(cached[1])
+                ):
+                    _, head, offset, cached_ctx = cached
+                    ctx = cached_ctx.copy()
+                else:
+                    offset = 0
+                    ctx = JobPollContext(job_log_dir)
+                handle.seek(offset)
+                data = handle.read()
         except IOError as exc:
             sys.stderr.write(f"{exc}\n")
             return
 
+        # Cache the context for the complete lines only.
+        end = data.rfind(b"\n") + 1
+        self._parse_status_lines(ctx, data[:end])
+        self._STATUS_FILES[path] = (
+            stat_.st_ino, head[:offset + end], offset + end, ctx.copy()
+        )
+        while len(self._STATUS_FILES) > self.STATUS_FILES_MAX:
+            # (least recently read first)
+            del self._STATUS_FILES[next(iter(self._STATUS_FILES))]
+        self._parse_status_lines(ctx, data[end:])
+        ctx.status_mtime = stat_.st_mtime
         return ctx
 
-    def _jobs_poll_runner(self, job_log_root, job_runner_name, my_ctx_list):
+    def _parse_status_lines(self, ctx: JobPollContext, data: bytes) -> None:
+        """Update a job poll context from lines of its job status file."""
+        for line in data.decode(errors="replace").splitlines():
+            if "=" not in line:
+                continue
+            key, value = line.strip().split("=", 1)
+            if key == self.CYLC_JOB_RUNNER_NAME:
+                ctx.job_runner_name = value
+            elif key == self.CYLC_JOB_ID:
+                ctx.job_id = value
+            elif key == self.CYLC_JOB_RUNNER_EXIT_POLLED:
+                ctx.job_runner_exit_polled = 1
+            elif key == CYLC_JOB_PID:
+                ctx.pid = value
+            elif key == self.CYLC_JOB_RUNNER_SUBMIT_TIME:
+                ctx.time_submit_exit = value
+            elif key == CYLC_JOB_INIT_TIME:
+                ctx.time_run = value
+            elif key == CYLC_JOB_EXIT_TIME:
+                ctx.time_run_exit = value
+            elif key == CYLC_JOB_EXIT:
+                if value == TASK_OUTPUT_SUCCEEDED.upper():
+                    ctx.run_status = 0
+                else:
+                    ctx.run_status = 1
+                    ctx.run_signal = value
+            elif key == CYLC_MESSAGE:
+                ctx.messages.append(value)
+
+    def _run_poll_cmd(self, cmd) -> Optional[Tuple[int, str, str]]:
+        """Run a job runner poll command, return (ret_code, out, err).
+
+        Return None if the command could not be run.
+        """
+        try:
+            proc = procopen(cmd, stdindevnull=True,
+                            stderrpipe=True, stdoutpipe=True)
+        except OSError as exc:
+            # subprocess.Popen has a bad habit of not setting the
+            # filename of the executable when it raises an OSError.
+            if not exc.filename:
+                exc.filename = cmd[0]
+            sys.stderr.write(f"{exc}\n")
+            return None
+        ret_code = proc.wait()
+        out, err = (f.decode() for f in proc.communicate())
+        return ret_code, out, err
+
+    def _poll_all(
+        self, job_runner_name, my_ctx_list, max_age
+    ) -> Optional[Tuple[int, str, str]]:
+        """Poll all of the user's jobs in a job runner, or reuse a recent poll.
+
+        A poll is reused if it was made less than max_age seconds ago, and
+        after the status files of all of the jobs were last modified (so
+        that it was made after they were submitted).
+
+        Return None if the command could not be run.
+        """
+        job_runner = self._get_sys(job_runner_name)
+        now = time()
+        cached = self._POLL_ALL_RESULTS.get(job_runner_name)
+        if cached is not None:
+            poll_time, ret = cached
+            if now - poll_time < max_age and all(
+                ctx.status_mtime is not None and ctx.status_mtime < poll_time
+                for ctx in my_ctx_list
+            ):
+                return ret
+        result = self._run_poll_cmd(job_runner.get_poll_all_cmd())
+        if result is not None and not result[0]:
+            self._POLL_ALL_RESULTS[job_runner_name] = (now, result)
+        return result
+
+    def _jobs_poll_runner(
+        self, job_log_root, job_runner_name, my_ctx_list, max_age=0
+    ):
         """Helper 2 for self.jobs_poll(job_log_root, job_log_dirs)."""
         exp_job_ids = [ctx.job_id for ctx in my_ctx_list]
         bad_job_ids = list(exp_job_ids)
@@ -483,24 +620,22 @@ class JobRunnerManager():
             items.append([self._get_sys("background"), exp_pids, bad_pids])
         debug_messages = []
         for job_runner, exp_ids, bad_ids in items:
-            if hasattr(job_runner, "get_poll_many_cmd"):
-                # Some poll commands may not be as simple
-                cmd = job_runner.get_poll_many_cmd(exp_ids)
-            else:  # if hasattr(job_runner, "POLL_CMD"):
-                # Simple poll command that takes a list of job IDs
-                cmd = [job_runner.POLL_CMD, *exp_ids]
-            try:
-                proc = procopen(cmd, stdindevnull=True,
-                                stderrpipe=True, stdoutpipe=True)
-            except OSError as exc:
-                # subprocess.Popen has a bad habit of not setting the
-                # filename of the executable when it raises an OSError.
-                if not exc.filename:
-                    exc.filename = cmd[0]
-                sys.stderr.write(f"{exc}\n")
+            if max_age and job_runner is items[0][0] and hasattr(
+                job_runner, "get_poll_all_cmd"
+            ):
+                # Poll all of the user's jobs, the result can be shared
+                result = self._poll_all(job_runner_name, my_ctx_list, max_age)
+            else:
+                if hasattr(job_runner, "get_poll_many_cmd"):
+                    # Some poll commands may not be as simple
+                    cmd = job_runner.get_poll_many_cmd(exp_ids)
+                else:  # if hasattr(job_runner, "POLL_CMD"):
+                    # Simple poll command that takes a list of job IDs
+                    cmd = [job_runner.POLL_CMD, *exp_ids]
+                result = self._run_poll_cmd(cmd)
+            if result is None:
                 return
-            ret_code = proc.wait()
-            out, err = (f.decode() for f in proc.communicate())
+            ret_code, out, err = result
             debug_messages.append('{0} - {1}'.format(
                 job_runner, len(out.split('\n')))
             )
@@ -574,6 +709,7 @@ class JobRunnerManager():
                 os.unlink(os.path.join(job_file_path, name))
 
         # Start new status file
+        self._STATUS_FILES.pop(f"{job_file_path}.status", None)
         with open(f"{job_file_path}.status", "w") as job_status_file:
             job_status_file.write(
                 "{0}={1}\n".format(
@@ -587,7 +723,7 @@ class JobRunnerManager():
         if not self.clean_env:
             # Pass the whole environment to the job submit subprocess.
             # (Note this runs on the job host).
-            env = os.environ
+            env = dict(os.environ)
         else:
             # $HOME is required by job.sh on the job host.
             env = {'HOME': os.environ.get('HOME', '')}
@@ -602,9 +738,10 @@ class JobRunnerManager():
             # job_runner.submit should handle OSError, if relevant.
             ret_code, out, err = job_runner.submit(job_file_path, submit_opts)
         else:
-            proc_stdin_arg = None
             # Set command STDIN to DEVNULL by default to prevent leakage of
-            # STDIN from current environment.
+            # STDIN from current environment (in remote mode, the rest of the
+            # job files may still be on STDIN).
+            proc_stdin_arg = DEVNULL  # nosec
             proc_stdin_value = DEVNULL  # nosec
             if hasattr(job_runner, "get_submit_stdin"):
                 proc_stdin_arg, proc_stdin_value = job_runner.get_submit_stdin(
@@ -704,14 +841,13 @@ class JobRunnerManager():
         Job files are uploaded via STDIN in remote mode. Extract job submission
         methods and job submission command templates from each job file.
 
-        Return a list, where each element contains something like:
+        Yield an item as soon as each job file has been written, then an item
+        for each job file which was not found in STDIN. Each item contains
+        something like:
         (job_log_dir, job_runner_name, submit_opts)
 
         """
-        items = [[job_log_dir, None, {}] for job_log_dir in job_log_dirs]
-        items_map = {}
-        for item in items:
-            items_map[item[0]] = item
+        remaining = dict.fromkeys(job_log_dirs)
         handle = None
         job_runner_name = None
         submit_opts = {}
@@ -761,13 +897,12 @@ class JobRunnerManager():
                         stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
                     # Rename from "*/job.tmp" to "*/job"
                     os.rename(handle.name, handle.name[:-4])
-                    try:
-                        items_map[job_log_dir][1] = job_runner_name
-                        items_map[job_log_dir][2] = submit_opts
-                    except KeyError:
-                        pass
+                    if job_log_dir in remaining:
+                        del remaining[job_log_dir]
+                        yield (job_log_dir, job_runner_name, submit_opts)
                     handle = None
                     job_log_dir = None
                     job_runner_name = None
                     submit_opts = {}
-        return items
+        for job_log_dir in remaining:
+            yield (job_log_dir, None, {})
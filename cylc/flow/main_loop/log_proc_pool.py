@@ -0,0 +1,69 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Log process pool queue statistics.
+
+Periodically logs, for each class of command in the process pool (job
+submission, xtriggers, event handlers, ...), the number of commands queued
+and running, the number launched so far, and the mean and maximum time they
+have waited in the queue to start.
+
+Use this to spot classes of command that are held up waiting for the pool,
+e.g. to tune :cylc:conf:`global.cylc[scheduler]process pool size` or the
+process pool class limits.
+
+Suggested interval - ten minutes.
+"""
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import periodic
+
+
+@periodic
+async def log_proc_pool(scheduler, _):
+    """Log process pool statistics by priority class."""
+    for line in _format_stats(scheduler.proc_pool.get_stats()):
+        LOG.info(line)
+
+
+def _format_stats(stats):
+    """Return a log line for each priority class that has been used.
+
+    Examples:
+        >>> list(_format_stats({
+        ...     'xtrigger': {
+        ...         'queued': 1, 'running': 2, 'launched': 10,
+        ...         'mean wait': 0.5, 'max wait': 1.5,
+        ...     },
+        ...     'event handler': {
+        ...         'queued': 0, 'running': 0, 'launched': 0,
+        ...         'mean wait': 0.0, 'max wait': 0.0,
+        ...     },
+        ... }))
+        ['process pool xtrigger: queued=1 running=2 launched=10
+        mean wait=0.5s max wait=1.5s']
+
+    """
+    for key, item in stats.items():
+        if not any((item['queued'], item['running'], item['launched'])):
+            continue
+        yield (
+            f'process pool {key}:'
+            f' queued={item["queued"]}'
+            f' running={item["running"]}'
+            f' launched={item["launched"]}'
+            f' mean wait={item["mean wait"]:.1f}s'
+            f' max wait={item["max wait"]:.1f}s'
+        )
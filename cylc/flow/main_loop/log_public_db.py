@@ -0,0 +1,41 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Log how far the public database is behind the private database.
+
+With :cylc:conf:`global.cylc[scheduler][database]background public database
+writes`, the public database (``log/db``), which is read by other programs,
+is written on a background thread and may lag behind the private database.
+This periodically logs the lag, so that a writer which is struggling to keep
+up can be spotted before it reaches
+:cylc:conf:`global.cylc[scheduler][database]public database maximum lag`
+and holds up the scheduler.
+
+Suggested interval - ten minutes.
+"""
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import periodic
+
+
+@periodic
+async def log_public_db(scheduler, _):
+    """Log the public database lag, if it is written in the background."""
+    lag = scheduler.workflow_db_mgr.get_pub_lag()
+    if lag is not None:
+        LOG.info(
+            f'public database lag: {lag:.1f}s'
+            f' (maximum {scheduler.workflow_db_mgr.pub_max_lag:.1f}s)'
+        )
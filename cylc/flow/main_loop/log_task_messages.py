@@ -0,0 +1,66 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Log task message ingestion statistics.
+
+Periodically logs the number of task messages received from jobs so far,
+how many were processed, dropped as duplicates or undeliverable (no task in
+the pool), and the time spent processing them, i.e. the throughput of the
+scheduler's task message handling.
+
+Use this to check whether the scheduler keeps up with messages from large
+numbers of jobs.
+
+Suggested interval - ten minutes.
+"""
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import periodic
+
+
+@periodic
+async def log_task_messages(scheduler, _):
+    """Log cumulative task message statistics."""
+    LOG.info(_format_stats(scheduler.task_message_stats))
+
+
+def _format_stats(stats):
+    """Return a log line for the task message statistics.
+
+    Examples:
+        >>> _format_stats({
+        ...     'received': 100, 'processed': 90, 'duplicate': 8,
+        ...     'undeliverable': 2, 'time': 0.5,
+        ... })
+        'task messages: received=100 processed=90 duplicate=8
+        undeliverable=2 time=0.5s rate=200.0/s'
+        >>> _format_stats({
+        ...     'received': 0, 'processed': 0, 'duplicate': 0,
+        ...     'undeliverable': 0, 'time': 0,
+        ... })
+        'task messages: received=0 processed=0 duplicate=0
+        undeliverable=0 time=0.0s rate=0.0/s'
+
+    """
+    rate = stats['received'] / stats['time'] if stats['time'] else 0.0
+    return (
+        'task messages:'
+        f' received={stats["received"]}'
+        f' processed={stats["processed"]}'
+        f' duplicate={stats["duplicate"]}'
+        f' undeliverable={stats["undeliverable"]}'
+        f' time={stats["time"]:.1f}s'
+        f' rate={rate:.1f}/s'
+    )
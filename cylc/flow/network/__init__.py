@@ -42,7 +42,10 @@ from cylc.flow.workflow_files import (
     get_workflow_srv_dir
 )
 
-API = 5  # cylc API version
+# cylc API version
+# (6: data store delta checksums are computed by a new algorithm, see
+# cylc.flow.data_store_mgr.generate_checksum)
+API = 6
 MSG_TIMEOUT = "TIMEOUT"
 
 
@@ -22,6 +22,7 @@ from contextlib import suppress
 from fnmatch import fnmatchcase
 import logging
 import queue
+from threading import Lock
 from time import time
 from typing import (
     Any,
@@ -43,7 +44,7 @@ from cylc.flow import LOG
 from cylc.flow.commands import COMMANDS
 from cylc.flow.data_store_mgr import (
     EDGES, FAMILY_PROXIES, TASK_PROXIES, WORKFLOW,
-    DELTA_ADDED, create_delta_store
+    DELTA_ADDED, create_delta_store, merge_delta_stores
 )
 import cylc.flow.flags
 from cylc.flow.id import Tokens
@@ -62,8 +63,6 @@ if TYPE_CHECKING:
     from cylc.flow.data_store_mgr import DataStoreMgr
     from cylc.flow.scheduler import Scheduler
 
-    DeltaQueue = queue.Queue[Tuple[str, str, dict]]
-
 
 class TaskMsg(NamedTuple):
     """Tuple for Scheduler.message_queue"""
@@ -75,10 +74,83 @@ class TaskMsg(NamedTuple):
 
 logger = logging.getLogger(__name__)
 
+# Interval (seconds) to check for new workflows,
+# for subscriptions to all workflows.
 DELTA_SLEEP_INTERVAL = 0.5
-# Delay before carrying on with the next delta,
-# roughly DELTA_PROC_WAIT*DELTA_SLEEP_INTERVAL seconds (if queue is empty).
-DELTA_PROC_WAIT = 10
+# Maximum time (seconds) to wait for a delta to be processed before
+# carrying on with the next delta of the same workflow.
+DELTA_PROC_WAIT = 5.0
+
+
+class DeltaQueue:
+    """Queue of deltas for a subscription.
+
+    Deltas, ``(workflow_id, topic, delta_store)``, may be put from any
+    thread. A subscription waiting for deltas is woken when one is put, so
+    does not need to poll the queue.
+
+    The queue holds at most one delta per workflow, deltas for a workflow
+    which arrive before the last one was taken (i.e. if the subscriber is
+    slow) are merged with it.
+
+    Args:
+        loop: The event loop of the subscription.
+
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop or asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.lock = Lock()
+        self.deltas: Dict[str, Tuple[str, dict]] = {}
+
+    def put(self, item: Tuple[str, str, dict]) -> None:
+        """Add a delta to the queue."""
+        w_id, topic, delta_store = item
+        with self.lock:
+            if w_id in self.deltas:
+                old_topic, old_delta_store = self.deltas[w_id]
+                delta_store = merge_delta_stores(old_delta_store, delta_store)
+                if old_topic == 'shutdown':
+                    topic = old_topic
+            self.deltas[w_id] = (topic, delta_store)
+        self.wake()
+
+    def get(self, exclude=()) -> Optional[Tuple[str, str, dict]]:
+        """Remove and return the first delta, or None if there isn't one.
+
+        Args:
+            exclude: Workflow IDs to ignore deltas of.
+
+        """
+        with self.lock:
+            for w_id in self.deltas:
+                if w_id not in exclude:
+                    return (w_id, *self.deltas.pop(w_id))
+        return None
+
+    def has_deltas(self, w_ids) -> bool:
+        """Return True if there are deltas for any of these workflows."""
+        with self.lock:
+            return any(w_id in self.deltas for w_id in w_ids)
+
+    def wake(self) -> None:
+        """Wake the subscription."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is self.loop:
+            self.event.set()
+        else:
+            with suppress(RuntimeError):  # the loop has closed
+                self.loop.call_soon_threadsafe(self.event.set)
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until woken (or the timeout in seconds has passed)."""
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.event.wait(), timeout)
+        self.event.clear()
 
 
 def filter_none(dictionary):
@@ -240,7 +312,7 @@ def node_ids_filter(tokens, state, items) -> bool:
     )
 
 
-def node_filter(node, node_type, args, state):
+def node_filter(node, node_type, args, state, tokens=None):
     """Filter nodes based on attribute arguments.
 
     Args:
@@ -250,10 +322,10 @@ def node_filter(node, node_type, args, state):
         state: The state of the node that is being filtered.
             Note: can be None for non-tasks e.g. task definitions where
             state filtering does not apply.
+        tokens: The parsed node ID, if known.
 
     """
-    tokens: Tokens
-    if node_type in DEF_TYPES:
+    if tokens is None and node_type in DEF_TYPES:
         # namespace nodes don't fit into the universal ID scheme so must
         # be tokenised manually
         tokens = Tokens(
@@ -261,7 +333,7 @@ def node_filter(node, node_type, args, state):
             task=node.name,
             job=None,
         )
-    else:
+    elif tokens is None:
         # live objects can be represented by a universal ID
         tokens = Tokens(node.id)
     return (
@@ -308,6 +380,44 @@ def node_filter(node, node_type, args, state):
     )
 
 
+def get_indexed_node_ids(index, node_type, args):
+    """Return the IDs of the nodes which may match the args, from an index.
+
+    The nodes returned must still be filtered (see node_filter).
+
+    Args:
+        index (cylc.flow.data_store_mgr.NodeIndex):
+            Index of the data-store.
+        node_type (str):
+            The type of the nodes.
+        args (dict):
+            The query arguments.
+
+    Returns:
+        set - or None if the args can't be matched using the index.
+
+    """
+    fields = index.INDEXED_FIELDS.get(node_type, ())
+    candidates = []
+    if args.get('states') and 'state' in fields:
+        candidates.append(index.get_ids(node_type, 'state', args['states']))
+    for field in ('is_held', 'is_queued'):
+        if args.get(field) is not None and field in fields:
+            candidates.append(index.get_ids(node_type, field, [args[field]]))
+    items = args.get('ids')
+    if items and not any(item.is_null for item in items):
+        for field, token in (('cycle_point', 'cycle'), ('name', 'task')):
+            values = [item[token] for item in items]
+            if all(
+                value and not any(char in value for char in '*?[')
+                for value in values
+            ):
+                candidates.append(index.get_ids(node_type, field, values))
+    if not candidates:
+        return None
+    return set.intersection(*candidates)
+
+
 def get_flow_data_from_ids(data_store, native_ids):
     """Return workflow data by id."""
     w_ids = []
@@ -343,6 +453,8 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
         # Used to serialised deltas from a single workflow, needed for
         # the management of a common data object.
         self.delta_processing_flows: Dict['UUID', set] = {}
+        # Used to wake subscriptions, [sub_id] = queue
+        self.delta_subscriptions: Dict['UUID', DeltaQueue] = {}
 
     # Query resolvers
     async def get_workflow_by_id(self, args):
@@ -396,21 +508,46 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
             )
 
     async def get_nodes_all(self, node_type, args):
-        """Return nodes from all workflows, filter by args."""
-        return sort_elements(
-            [
+        """Return nodes from all workflows, filter by args.
+
+        Nodes in an indexed data-store (see NodeIndex) are looked up
+        in the index rather than scanned where the args allow.
+
+        """
+        if 'sub_id' in args and args['delta_store']:
+            indexes = {}
+        else:
+            # (other data-stores, e.g. the UI Server's, may not be indexed)
+            indexes = getattr(self.data_store_mgr, 'node_indexes', {})
+        nodes = []
+        for flow in await self.get_workflows_data(args):
+            elements = flow[node_type]
+            index = indexes.get(flow[WORKFLOW].id)
+            tokens = {}
+            ids = None
+            if index is not None and node_type in index.tokens:
+                tokens = index.tokens[node_type]
+                ids = get_indexed_node_ids(index, node_type, args)
+            if ids is None:
+                candidates = elements.values()
+            else:
+                candidates = (
+                    elements[n_id]
+                    for n_id in index.sort(node_type, ids)
+                    if n_id in elements
+                )
+            nodes.extend(
                 node
-                for flow in await self.get_workflows_data(args)
-                for node in flow[node_type].values()
+                for node in candidates
                 if node_filter(
                     node,
                     node_type,
                     args,
-                    self.get_node_state(node, node_type)
+                    self.get_node_state(node, node_type),
+                    tokens.get(node.id),
                 )
-            ],
-            args,
-        )
+            )
+        return sort_elements(nodes, args)
 
     async def get_nodes_by_ids(self, node_type, args):
         """Return protobuf node objects for given id."""
@@ -569,11 +706,10 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
         delta_processing_flows = self.delta_processing_flows[sub_id]
 
         delta_queues = self.data_store_mgr.delta_queues
-        deltas_queue: DeltaQueue = queue.Queue()
-
-        counters: Dict[str, int] = {}
-        delta_yield_queue: DeltaQueue = queue.Queue()
-        flow_delta_queues: Dict[str, queue.Queue[Tuple[str, dict]]] = {}
+        deltas_queue = DeltaQueue()
+        self.delta_subscriptions[sub_id] = deltas_queue
+        # Time the processing of the last delta of each workflow started.
+        processing_times: Dict[str, float] = {}
         try:
             # Iterate over the queue yielding deltas
             w_ids = workflow_ids
@@ -606,54 +742,53 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
                                     (w_id, 'initial_burst', delta_store))
                     elif w_id in self.delta_store[sub_id]:
                         del self.delta_store[sub_id][w_id]
-                try:
-                    with suppress(queue.Empty):
-                        w_id, topic, delta_store = deltas_queue.get(False)
-
-                        if w_id not in flow_delta_queues:
-                            counters[w_id] = 0
-                            flow_delta_queues[w_id] = queue.Queue()
-                        flow_delta_queues[w_id].put((topic, delta_store))
-
-                    # Only yield deltas from the same workflow if previous
-                    # delta has finished processing.
-                    for flow_id, flow_queue in flow_delta_queues.items():
-                        if flow_queue.empty():
-                            continue
-                        elif flow_id in delta_processing_flows:
-                            if counters[flow_id] < DELTA_PROC_WAIT:
-                                continue
-                            delta_processing_flows.remove(flow_id)
-                        counters[flow_id] = 0
-                        topic, delta_store = flow_queue.get()
-                        delta_yield_queue.put((flow_id, topic, delta_store))
-
-                    w_id, topic, delta_store = delta_yield_queue.get(False)
-
-                    # Handle shutdown delta, don't ignore.
-                    if topic == 'shutdown':
-                        delta_store['shutdown'] = True
-                    else:
-                        # ignore deltas that are more frequent than interval.
-                        new_time = time()
-                        elapsed = new_time - old_time
-                        if elapsed <= interval:
-                            continue
-                        old_time = new_time
-
-                    delta_processing_flows.add(w_id)
-                    op_queue.put((sub_id, w_id))
-                    self.delta_store[sub_id][w_id] = delta_store
-                    if sub_resolver is None:
-                        yield delta_store
-                    else:
-                        result = await sub_resolver(root, info, **args)
-                        if result:
-                            yield result
-                except queue.Empty:
-                    await asyncio.sleep(DELTA_SLEEP_INTERVAL)
-                    for flow_id in delta_processing_flows:
-                        counters[flow_id] += 1
+
+                # Only yield deltas from the same workflow if previous
+                # delta has finished processing (or we have waited long
+                # enough).
+                now = time()
+                for flow_id in list(delta_processing_flows):
+                    if now - processing_times[flow_id] >= DELTA_PROC_WAIT:
+                        delta_processing_flows.discard(flow_id)
+                item = deltas_queue.get(exclude=delta_processing_flows)
+                if item is None:
+                    timeout = None
+                    if deltas_queue.has_deltas(delta_processing_flows):
+                        timeout = DELTA_PROC_WAIT - now + min(
+                            processing_times[flow_id]
+                            for flow_id in delta_processing_flows
+                        )
+                    if not workflow_ids:
+                        timeout = min(
+                            DELTA_SLEEP_INTERVAL if timeout is None
+                            else timeout,
+                            DELTA_SLEEP_INTERVAL
+                        )
+                    await deltas_queue.wait(timeout)
+                    continue
+                w_id, topic, delta_store = item
+
+                # Handle shutdown delta, don't ignore.
+                if topic == 'shutdown':
+                    delta_store['shutdown'] = True
+                else:
+                    # ignore deltas that are more frequent than interval.
+                    new_time = time()
+                    elapsed = new_time - old_time
+                    if elapsed <= interval:
+                        continue
+                    old_time = new_time
+
+                delta_processing_flows.add(w_id)
+                processing_times[w_id] = time()
+                op_queue.put((sub_id, w_id))
+                self.delta_store[sub_id][w_id] = delta_store
+                if sub_resolver is None:
+                    yield delta_store
+                else:
+                    result = await sub_resolver(root, info, **args)
+                    if result:
+                        yield result
         except (GeneratorExit, asyncio.CancelledError):
             raise
         except Exception:
@@ -665,6 +800,7 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
                     del delta_queues[w_id][sub_id]
             if sub_id in self.delta_store:
                 del self.delta_store[sub_id]
+            self.delta_subscriptions.pop(sub_id, None)
             yield None
 
     async def flow_delta_processed(self, context, op_id):
@@ -672,6 +808,8 @@ class BaseResolvers(metaclass=ABCMeta):  # noqa: SIM119
             with suppress(queue.Empty, KeyError):
                 sub_id, w_id = context['ops_queue'][op_id].get(False)
                 self.delta_processing_flows[sub_id].remove(w_id)
+                # the next delta of the workflow can now be yielded
+                self.delta_subscriptions[sub_id].wake()
 
     @abstractmethod
     async def mutator(
@@ -18,7 +18,7 @@
 import asyncio
 from queue import Queue
 from textwrap import dedent
-from time import sleep
+from time import sleep, time
 from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 
 from graphql.execution.executors.asyncio import AsyncioExecutor
@@ -35,7 +35,7 @@ from cylc.flow.network.publisher import WorkflowPublisher
 from cylc.flow.network.replier import WorkflowReplier
 from cylc.flow.network.resolvers import Resolvers
 from cylc.flow.network.schema import schema
-from cylc.flow.data_store_mgr import DELTAS_MAP
+from cylc.flow.data_store_mgr import DELTAS_MAP, merge_publish_deltas
 from cylc.flow.data_messages_pb2 import PbEntireWorkflow
 
 if TYPE_CHECKING:
@@ -149,6 +149,10 @@ class WorkflowRuntimeServer:
         ]
 
         self.publish_queue: 'Queue[Iterable[tuple]]' = Queue()
+        self.publish_interval: float = glbl_cfg().get(
+            ['scheduler', 'publish interval']
+        )
+        self.last_publish_time = 0.0
         self.waiting_to_stop = False
         self.stopped = True
 
@@ -226,7 +230,7 @@ class WorkflowRuntimeServer:
         if self.replier:
             self.replier.stop(stop_loop=False)
         if self.publisher:
-            await self.publish_queued_items()
+            await self.publish_queued_items(force=True)
             await self.publisher.publish(
                 (b'shutdown', str(reason).encode('utf-8'))
             )
@@ -261,11 +265,28 @@ class WorkflowRuntimeServer:
             # Yield control to other threads
             sleep(self.OPERATE_SLEEP_INTERVAL)
 
-    async def publish_queued_items(self) -> None:
-        """Publish all queued items."""
+    async def publish_queued_items(self, force: bool = False) -> None:
+        """Publish all queued items.
+
+        If several sets of deltas are queued they are merged and published
+        as one. Nothing is published within the configured publish interval
+        of the last publish (unless forced), queued items are merged with
+        later ones in the meantime.
+
+        """
+        if not self.publish_queue.qsize() or (
+            not force
+            and time() < self.last_publish_time + self.publish_interval
+        ):
+            return
+        queued = []
         while self.publish_queue.qsize():
-            articles = self.publish_queue.get()
-            await self.publisher.publish(*articles)
+            queued.append(self.publish_queue.get())
+        articles = (
+            queued[0] if len(queued) == 1 else merge_publish_deltas(queued)
+        )
+        await self.publisher.publish(*articles)
+        self.last_publish_time = time()
 
     def receiver(self, message):
         """Process incoming messages and coordinate response.
@@ -18,11 +18,12 @@
 
 import random
 import re
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import (
     TYPE_CHECKING, Any, Dict, Iterable,
     List, Optional, Set, Union, overload
 )
+from weakref import WeakKeyDictionary
 
 from cylc.flow import LOG
 
@@ -33,6 +34,7 @@ from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.hostuserutil import is_remote_host
 
 if TYPE_CHECKING:
+    from cylc.flow.parsec.config import ParsecConfig
     from cylc.flow.parsec.OrderedDict import OrderedDictWithDefaults
 
 UNKNOWN_TASK = 'unknown task'
@@ -63,6 +65,13 @@ HOST_SELECTION_METHODS = {
     'random': random.choice
 }
 
+# Platforms looked up from the global config, by platform name:
+# {global config: {platform_name: platform}}
+# (a reload creates a new global config, dropping the entries for the old one)
+_PLATFORMS: 'WeakKeyDictionary[ParsecConfig, Dict[str, Dict[str, Any]]]' = (
+    WeakKeyDictionary()
+)
+
 
 def log_platform_event(
     event: str,
@@ -200,9 +209,14 @@ def platform_from_name(
     Raises:
         NoPlatformsError: Platform group has no platforms with usable hosts.
     """
+    cfg = glbl_cfg()
+    cache: Optional[Dict[str, Dict[str, Any]]] = None
     if platforms is None:
-        platforms = glbl_cfg().get(['platforms'])
-    platform_groups = glbl_cfg().get(['platform groups'])
+        platforms = cfg.get(['platforms'])
+        # Platforms are looked up for every job submission, so the platforms
+        # in the global config are cached.
+        cache = _PLATFORMS.setdefault(cfg, {})
+    platform_groups = cfg.get(['platform groups'])
 
     if platform_name is None:
         platform_name = 'localhost'
@@ -219,6 +233,50 @@ def platform_from_name(
             )
             break
 
+    if cache is not None and platform_name in cache:
+        # (a copy, so the caller cannot change the cached platform)
+        return copy(cache[platform_name])
+
+    platform_name_re = _get_platform_name_re(platform_name, platforms)
+    if platform_name_re is not None:
+        # Deepcopy prevents contaminating platforms with data
+        # from other platforms matching platform_name_re
+        platform_data = deepcopy(platforms[platform_name_re])
+
+        # If hosts are not filled in make remote
+        # hosts the platform name.
+        # Example: `[platforms][workplace_vm_123]<nothing>`
+        #   should create a platform where
+        #   `hosts = ['workplace_vm_123']`
+        # NOTE: Probably don't use .get() due to OrderedDictWithDefaults -
+        # see https://github.com/cylc/cylc-flow/pull/4975
+        if (
+            'hosts' not in platform_data or
+            not platform_data['hosts']
+        ):
+            platform_data['hosts'] = [platform_name]
+        # Fill in the "private" name field.
+        platform_data['name'] = platform_name
+        if cache is not None:
+            cache[platform_name] = platform_data
+            return copy(platform_data)
+        return platform_data
+
+    raise PlatformLookupError(
+        f"No matching platform \"{platform_name}\" found")
+
+
+def _get_platform_name_re(
+    platform_name: str,
+    platforms: Dict[str, Dict[str, Any]],
+) -> Optional[str]:
+    """Return the platform definition which a platform name matches.
+
+    Returns:
+        The key of the matching platform definition, or None if there is
+        no match.
+
+    """
     for platform_name_re in platforms:
         if (
             # If the platform_name_re contains special regex chars
@@ -245,28 +303,8 @@ def platform_from_name(
             ),
             platform_name
         ):
-            # Deepcopy prevents contaminating platforms with data
-            # from other platforms matching platform_name_re
-            platform_data = deepcopy(platforms[platform_name_re])
-
-            # If hosts are not filled in make remote
-            # hosts the platform name.
-            # Example: `[platforms][workplace_vm_123]<nothing>`
-            #   should create a platform where
-            #   `hosts = ['workplace_vm_123']`
-            # NOTE: Probably don't use .get() due to OrderedDictWithDefaults -
-            # see https://github.com/cylc/cylc-flow/pull/4975
-            if (
-                'hosts' not in platform_data or
-                not platform_data['hosts']
-            ):
-                platform_data['hosts'] = [platform_name]
-            # Fill in the "private" name field.
-            platform_data['name'] = platform_name
-            return platform_data
-
-    raise PlatformLookupError(
-        f"No matching platform \"{platform_name}\" found")
+            return platform_name_re
+    return None
 
 
 def get_platform_from_group(
@@ -16,11 +16,12 @@
 
 """Functionality for expressing and evaluating logical triggers."""
 
+from functools import lru_cache
 import re
+import sys
 from typing import (
     TYPE_CHECKING,
     Dict,
-    ItemsView,
     Iterable,
     Iterator,
     List,
@@ -43,6 +44,8 @@ from cylc.flow.id import quick_relative_detokenise
 
 
 if TYPE_CHECKING:
+    from types import CodeType
+
     from cylc.flow.cycling import PointBase
     from cylc.flow.id import Tokens
 
@@ -66,7 +69,47 @@ class PrereqMessage(NamedTuple):
         if isinstance(tuple_, PrereqMessage):
             return tuple_
         point, task, output = tuple_
-        return PrereqMessage(point=str(point), task=task, output=output)
+        return _get_message(str(point), task, output)
+
+
+@lru_cache(10000)
+def _get_message(point: str, task: str, output: str) -> PrereqMessage:
+    """Return a shared PrereqMessage.
+
+    The same messages are held by many prerequisites (e.g. where many tasks
+    depend on the same output), so share them (and their strings) to reduce
+    memory usage.
+
+    Examples:
+        >>> _get_message('1', 'a', 'succeeded') is PrereqMessage.coerce(
+        ...     (1, 'a', 'succeeded')
+        ... )
+        True
+
+    """
+    return PrereqMessage(
+        point=sys.intern(point),
+        task=sys.intern(task),
+        output=sys.intern(output),
+    )
+
+
+@lru_cache(10000)
+def _compile_condition(expr: str) -> 'CodeType':
+    """Compile a prerequisite condition expression.
+
+    Condition expressions are independent of the cycle point, so all
+    instances of a task share the same compiled code.
+
+    Examples:
+        >>> code = _compile_condition('_[0]|_[1]')
+        >>> eval(code, {'__builtins__': {}}, {'_': [False, True]})
+        True
+        >>> _compile_condition('_[0]|_[1]') is code
+        True
+
+    """
+    return compile(expr, '<prerequisite>', 'eval')
 
 
 SatisfiedState = Literal[
@@ -76,6 +119,45 @@ SatisfiedState = Literal[
     False
 ]
 
+# Prerequisites hold the satisfaction state of each message as a code (one
+# byte) indexing this list. Code 0 is unsatisfied. States loaded from the
+# database are not constrained to SatisfiedState, any others are added as
+# they are encountered, up to _MAX_STATES in all.
+_MAX_STATES = 256
+_STATES: List[SatisfiedState] = [
+    False,
+    'satisfied naturally',
+    'satisfied from database',
+    'force satisfied',
+]
+_STATE_CODES: Dict[SatisfiedState, int] = {
+    state: code for code, state in enumerate(_STATES)
+}
+_FORCE_SATISFIED = _STATE_CODES['force satisfied']
+
+
+def _get_state_code(state: SatisfiedState) -> int:
+    """Return the code for a satisfaction state.
+
+    Examples:
+        >>> _get_state_code('force satisfied')
+        3
+        >>> _get_state_code(False)
+        0
+
+    """
+    code = _STATE_CODES.get(state)
+    if code is not None:
+        return code
+    if not state:
+        return 0
+    if len(_STATES) >= _MAX_STATES:
+        # (unknown states can only have come from the database)
+        return _STATE_CODES['satisfied from database']
+    _STATES.append(state)
+    _STATE_CODES[state] = len(_STATES) - 1
+    return len(_STATES) - 1
+
 
 class Prerequisite:
     """The concrete result of an abstract logical trigger expression.
@@ -91,27 +173,44 @@ class Prerequisite:
 
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = (
-        "_satisfied",
+        "_messages",
+        "_states",
+        "_message_index",
         "_all_satisfied",
         "conditional_expression",
         "point",
     )
 
-    # Extracts T from "foo.T succeeded" etc.
-    SATISFIED_TEMPLATE = 'bool(self._satisfied[("%s", "%s", "%s")])'
+    # Refers to the Nth message in a conditional expression.
+    SATISFIED_TEMPLATE = '_[%d]'
     MESSAGE_TEMPLATE = r'%s/%s %s'
 
+    # Prerequisites with more messages than this keep an index of them,
+    # smaller ones are searched.
+    INDEX_THRESHOLD = 16
+
     def __init__(self, point: 'PointBase'):
         # The cycle point to which this prerequisite belongs.
         # cylc.flow.cycling.PointBase
         self.point = point
 
-        # Dictionary of messages pertaining to this prerequisite.
-        # {('point string', 'task name', 'output'): DEP_STATE_X, ...}
-        self._satisfied: Dict[PrereqMessage, SatisfiedState] = {}
+        # The messages pertaining to this prerequisite (shared with other
+        # prerequisites, see PrereqMessage.coerce) and their satisfaction
+        # states (as codes, see _STATES), in the same order.
+        # (('point string', 'task name', 'output'), ...)
+        # (a list while messages are registered, frozen by set_condition)
+        self._messages: Union[
+            List[PrereqMessage], Tuple[PrereqMessage, ...]
+        ] = []
+        self._states = bytearray()
+
+        # {message: index}, only for prerequisites with many messages.
+        self._message_index: Optional[Dict[PrereqMessage, int]] = None
 
         # Expression present only when conditions are used.
-        # '1/foo failed & 1/bar succeeded'
+        # '1/foo failed & 1/bar succeeded' is stored as '_[0] & _[1]' where
+        # the numbers index the messages in self._messages (these are
+        # point-independent so can be shared between task instances).
         self.conditional_expression: Optional[str] = None
 
         # The cached state of this prerequisite:
@@ -131,16 +230,34 @@ class Prerequisite:
         return hash((
             self.point,
             self.conditional_expression,
-            tuple(self._satisfied.keys()),
+            tuple(self._messages),
         ))
 
+    def _get_index(self, key: PrereqMessage) -> Optional[int]:
+        """Return the index of a message, or None if not present."""
+        if self._message_index is not None:
+            return self._message_index.get(key)
+        try:
+            return self._messages.index(key)
+        except ValueError:
+            return None
+
     def __getitem__(self, key: AnyPrereqMessage) -> SatisfiedState:
         """Return the satisfaction state of a dependency.
 
         Args:
             key: Tuple of (point, name, output) for a task.
         """
-        return self._satisfied[PrereqMessage.coerce(key)]
+        index = self._get_index(PrereqMessage.coerce(key))
+        if index is None:
+            raise KeyError(key)
+        return _STATES[self._states[index]]
+
+    def __contains__(self, key: AnyPrereqMessage) -> bool:
+        return self._get_index(PrereqMessage.coerce(key)) is not None
+
+    def __len__(self) -> int:
+        return len(self._messages)
 
     def __setitem__(
         self,
@@ -158,16 +275,34 @@ class Prerequisite:
         key = PrereqMessage.coerce(key)
         if value is True:
             value = 'satisfied naturally'
-        self._satisfied[key] = value
+        code = _get_state_code(value)
+        index = self._get_index(key)
+        if index is None:
+            # register a new message
+            index = len(self._messages)
+            if not isinstance(self._messages, list):
+                self._messages = list(self._messages)
+            self._messages.append(key)
+            self._states.append(code)
+            if self._message_index is not None:
+                self._message_index[key] = index
+            elif index >= self.INDEX_THRESHOLD:
+                self._message_index = {
+                    message: ind
+                    for ind, message in enumerate(self._messages)
+                }
+        else:
+            self._states[index] = code
         if not (self._all_satisfied and value):
             # Force later recalculation of cached satisfaction state:
             self._all_satisfied = None
 
     def __iter__(self) -> Iterator[PrereqMessage]:
-        return iter(self._satisfied)
+        return iter(self._messages)
 
-    def items(self) -> ItemsView[PrereqMessage, SatisfiedState]:
-        return self._satisfied.items()
+    def items(self) -> Iterator[Tuple[PrereqMessage, SatisfiedState]]:
+        """Return an iterator over (message, satisfaction state) pairs."""
+        return zip(self._messages, map(_STATES.__getitem__, self._states))
 
     def get_raw_conditional_expression(self):
         """Return a representation of this prereq as a string.
@@ -178,8 +313,8 @@ class Prerequisite:
         expr = self.conditional_expression
         if not expr:
             return None
-        for message in self._satisfied:
-            expr = expr.replace(self.SATISFIED_TEMPLATE % message,
+        for ind, message in enumerate(self._messages):
+            expr = expr.replace(self.SATISFIED_TEMPLATE % ind,
                                 self.MESSAGE_TEMPLATE % message)
         return expr
 
@@ -195,25 +330,36 @@ class Prerequisite:
             >>> preq[(1, 'foo', 'succeeded')] = False
             >>> preq[(1, 'xfoo', 'succeeded')] = False
             >>> preq.set_condition("1/foo succeeded|1/xfoo succeeded")
-            >>> expr = preq.conditional_expression
-            >>> expr.split('|')  # doctest: +NORMALIZE_WHITESPACE
-            ['bool(self._satisfied[("1", "foo", "succeeded")])',
-            'bool(self._satisfied[("1", "xfoo", "succeeded")])']
+            >>> preq.conditional_expression
+            '_[0]|_[1]'
+            >>> preq.get_raw_conditional_expression()
+            '1/foo succeeded|1/xfoo succeeded'
+
+            # The expression is shared between instances at other points.
+            >>> preq2 = Prerequisite(2)
+            >>> preq2[(2, 'foo', 'succeeded')] = False
+            >>> preq2[(2, 'xfoo', 'succeeded')] = False
+            >>> preq2.set_condition("2/foo succeeded|2/xfoo succeeded")
+            >>> preq2.conditional_expression is preq.conditional_expression
+            True
 
         """
         self._all_satisfied = None
+        # (messages are registered before the condition is set, a tuple is
+        # smaller than a list)
+        self._messages = tuple(self._messages)
         if '|' in expr:
             # Make a Python expression so we can eval() the logic.
-            for message in self._satisfied:
+            for ind, message in enumerate(self._messages):
                 # Use '\b' in case one task name is a substring of another
                 # and escape special chars ('.', timezone '+') in task IDs.
                 expr = re.sub(
                     fr"\b{re.escape(self.MESSAGE_TEMPLATE % message)}\b",
-                    self.SATISFIED_TEMPLATE % message,
+                    self.SATISFIED_TEMPLATE % ind,
                     expr
                 )
 
-            self.conditional_expression = expr
+            self.conditional_expression = sys.intern(expr)
 
     def is_satisfied(self):
         """Return True if prerequisite is satisfied.
@@ -224,7 +370,7 @@ class Prerequisite:
         if self._all_satisfied is not None:
             # Cached value.
             return self._all_satisfied
-        if self._satisfied == {}:
+        if not self._messages:
             # No prerequisites left after pre-initial simplification.
             return True
         self._all_satisfied = self._eval_satisfied()
@@ -237,12 +383,17 @@ class Prerequisite:
 
         """
         if not self.conditional_expression:
-            return all(self._satisfied.values())
+            # (code 0 is unsatisfied)
+            return all(self._states)
 
         try:
-            res = eval(self.conditional_expression)  # nosec
-            # * the expression is constructed internally
-            # * https://github.com/cylc/cylc-flow/issues/4403
+            res = eval(  # nosec
+                # * the expression is constructed internally
+                # * https://github.com/cylc/cylc-flow/issues/4403
+                _compile_condition(self.conditional_expression),
+                {'__builtins__': {}},
+                {'_': [bool(code) for code in self._states]},
+            )
         except (SyntaxError, ValueError) as exc:
             err_msg = str(exc)
             if str(exc).find("unexpected EOF") != -1:
@@ -265,16 +416,20 @@ class Prerequisite:
             prereq = PrereqMessage(
                 output['cycle'], output['task'], output['task_sel']
             )
-            if prereq not in self._satisfied:
+            index = self._get_index(prereq)
+            if index is None:
                 continue
             valid.add(output)
-            self[prereq] = 'satisfied naturally'
+            self._states[index] = _STATE_CODES['satisfied naturally']
+            if not self._all_satisfied:
+                self._all_satisfied = None
         return valid
 
     def api_dump(self) -> Optional[PbPrerequisite]:
         """Return list of populated Protobuf data objects."""
-        if not self._satisfied:
+        if not self._messages:
             return None
+        satisfied = dict(self.items())
         if self.conditional_expression:
             expr = (
                 self.get_raw_conditional_expression()
@@ -282,15 +437,15 @@ class Prerequisite:
         else:
             expr = ' & '.join(
                 self.MESSAGE_TEMPLATE % s_msg
-                for s_msg in self._satisfied
+                for s_msg in self._messages
             )
         conds = []
-        num_length = len(str(len(self._satisfied)))
-        for ind, message_tuple in enumerate(sorted(self._satisfied)):
+        num_length = len(str(len(self._messages)))
+        for ind, message_tuple in enumerate(sorted(self._messages)):
             t_id = message_tuple.get_id()
             char = str(ind).zfill(num_length)
             c_msg = self.MESSAGE_TEMPLATE % message_tuple
-            c_val = self._satisfied[message_tuple]
+            c_val = satisfied[message_tuple]
             conds.append(
                 PbCondition(
                     task_proxy=t_id,
@@ -314,9 +469,9 @@ class Prerequisite:
         State can be overridden by calling `self.satisfy_me`.
 
         """
-        for message in self._satisfied:
-            if not self._satisfied[message]:
-                self._satisfied[message] = 'force satisfied'
+        for index, code in enumerate(self._states):
+            if not code:
+                self._states[index] = _FORCE_SATISFIED
         if self.conditional_expression:
             self._all_satisfied = self._eval_satisfied()
         else:
@@ -324,7 +479,7 @@ class Prerequisite:
 
     def iter_target_point_strings(self):
         yield from {
-            message.point for message in self._satisfied
+            message.point for message in self._messages
         }
 
     def get_target_points(self):
@@ -342,6 +497,6 @@ class Prerequisite:
         """
         return [
             msg.get_id()
-            for msg, satisfied in self._satisfied.items()
-            if satisfied
+            for msg, code in zip(self._messages, self._states)
+            if code
         ]
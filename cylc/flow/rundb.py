@@ -17,9 +17,11 @@
 
 from contextlib import suppress
 from dataclasses import dataclass
+import os
 from os.path import expandvars
 from pprint import pformat
 import sqlite3
+from time import time
 import traceback
 from typing import (
     TYPE_CHECKING,
@@ -183,7 +185,17 @@ class CylcWorkflowDAO:
 
     CONN_TIMEOUT = 0.2
     DB_FILE_BASE_NAME = "db"
+    # Interval (seconds) between checks that the database file of a
+    # persistent connection still exists.
+    FILE_CHECK_INTERVAL = 10.0
     MAX_TRIES = 100
+    # SQLite pragmas for persistent connections.
+    PERSISTENT_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        # negative value => KiB
+        "PRAGMA cache_size=-16384",
+    )
     RESTART_INCOMPAT_VERSION = "8.0rc2"  # Can't restart if <= this version
     TABLE_BROADCAST_EVENTS = "broadcast_events"
     TABLE_BROADCAST_STATES = "broadcast_states"
@@ -346,7 +358,8 @@ class CylcWorkflowDAO:
         self,
         db_file_name: Union['Path', str],
         is_public: bool = False,
-        create_tables: bool = False
+        create_tables: bool = False,
+        persistent: bool = False,
     ):
         """Initialise database access object.
 
@@ -358,12 +371,19 @@ class CylcWorkflowDAO:
             is_public: If True, allow retries.
             create_tables: If True, create the tables if they
                 don't already exist.
+            persistent: If True, keep the connection open between
+                transactions, using WAL journaling. The database file is
+                checked periodically in case it has been removed.
 
         """
         self.db_file_name = expandvars(db_file_name)
         self.is_public = is_public
+        self.persistent = persistent
         self.conn: Optional[sqlite3.Connection] = None
         self.n_tries = 0
+        # Inode of the database file when the connection was opened.
+        self._inode: Optional[int] = None
+        self._next_file_check = 0.0
 
         self.tables = {
             name: CylcWorkflowDAOTable(name, attrs)
@@ -425,8 +445,52 @@ class CylcWorkflowDAO:
         """Connect to the database."""
         if self.conn is None:
             self.conn = sqlite3.connect(self.db_file_name, self.CONN_TIMEOUT)
+            if self.persistent:
+                for pragma in self.PERSISTENT_PRAGMAS:
+                    self.conn.execute(pragma)
+                self._inode = self._get_inode()
+                self._next_file_check = time() + self.FILE_CHECK_INTERVAL
         return self.conn
 
+    def _get_inode(self) -> Optional[int]:
+        """Return the inode of the database file, or None if not found."""
+        try:
+            return os.stat(self.db_file_name).st_ino
+        except OSError:
+            return None
+
+    def check_db_file(self, force: bool = False) -> None:
+        """Check the database file of a persistent connection.
+
+        If the file has been removed or replaced, close the connection so
+        that it is reopened on next use. For the private database this
+        ensures the workflow dies if the run directory has been removed.
+
+        Args:
+            force: Check now, rather than waiting for the check interval.
+
+        """
+        if not self.persistent or self.conn is None:
+            return
+        now = time()
+        if not force and now < self._next_file_check:
+            return
+        self._next_file_check = now + self.FILE_CHECK_INTERVAL
+        if self._get_inode() != self._inode:
+            LOG.warning(
+                f"{self.db_file_name}: database file removed or replaced,"
+                " reconnecting"
+            )
+            self.close()
+
+    def checkpoint(self) -> None:
+        """Write the WAL file of a persistent connection to the database.
+
+        Call before copying the database file.
+        """
+        if self.persistent and self.conn is not None:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def create_tables(self):
         """Create tables."""
         names = []
@@ -445,6 +509,7 @@ class CylcWorkflowDAO:
         """Execute queued items for each table."""
         # determine the sql statements to execute
         sql_queue = []  # (sql_statement, values)
+        self.check_db_file()
         for table in self.tables.values():
             # DELETE statements may have varying number of WHERE args so we
             # can only executemany for each identical template statement.
@@ -511,8 +576,10 @@ class CylcWorkflowDAO:
         finally:
             # Note: This is not strictly necessary. But if the workflow run
             # directory is removed, a forced reconnection to the private
-            # database will ensure that the workflow dies.
-            self.close()
+            # database will ensure that the workflow dies. (Persistent
+            # connections check for this periodically instead.)
+            if not self.persistent:
+                self.close()
 
     def _execute_stmt(self, stmt, stmt_args_list):
         """Helper for "self.execute_queued_items".
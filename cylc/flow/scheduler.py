@@ -108,7 +108,7 @@ from cylc.flow.platforms import (
 from cylc.flow.profiler import Profiler
 from cylc.flow.resources import get_resources
 from cylc.flow.simulation import sim_time_check
-from cylc.flow.subprocpool import SubProcPool
+from cylc.flow.subprocpool import SubProcPool, get_proc_pool
 from cylc.flow.task_events_mgr import TaskEventsManager
 from cylc.flow.task_job_mgr import TaskJobManager
 from cylc.flow.task_pool import TaskPool
@@ -160,6 +160,37 @@ class SchedulerError(CylcError):
     """Scheduler expected error stop."""
 
 
+def _parse_job_id(
+    job_id: 'Union[Tokens, str]'
+) -> Tuple[str, Optional[int]]:
+    """Return the relative task ID and submit number from a job ID.
+
+    Plain "cycle/task/job" and "cycle/task" IDs are split directly, anything
+    else is parsed by Tokens.
+
+    Examples:
+        >>> _parse_job_id('1/foo/01')
+        ('1/foo', 1)
+        >>> _parse_job_id('1/foo')
+        ('1/foo', None)
+        >>> _parse_job_id('1/foo:running')
+        ('1/foo', None)
+
+    """
+    if isinstance(job_id, str) and ':' not in job_id and '~' not in job_id:
+        parts = job_id.split('/')
+        if len(parts) == 3 and all(parts) and parts[2].isdigit():
+            return f'{parts[0]}/{parts[1]}', int(parts[2])
+        if len(parts) == 2 and all(parts):
+            return job_id, None
+    if not isinstance(job_id, Tokens):
+        job_id = Tokens(job_id, relative=True)
+    return (
+        job_id.duplicate(job=None).relative_id,
+        int(job_id['job']) if job_id['job'] else None,
+    )
+
+
 class Scheduler:
     """Cylc scheduler server."""
 
@@ -284,6 +315,12 @@ class Scheduler:
         self._profile_amounts = {}
         self._profile_update_times = {}
         self.bad_hosts: Set[str] = set()
+        # cumulative task message ingestion counts, and the time spent
+        # processing them (see the log_task_messages main loop plugin)
+        self.task_message_stats: Dict[str, float] = dict.fromkeys(
+            ('received', 'processed', 'duplicate', 'undeliverable', 'time'),
+            0,
+        )
 
         self.restored_stop_task_id: Optional[str] = None
 
@@ -296,9 +333,17 @@ class Scheduler:
             self.workflow
         )
 
+        db_cfg = glbl_cfg().get(['scheduler', 'database'])
         self.workflow_db_mgr = WorkflowDatabaseManager(
             pri_d=workflow_files.get_workflow_srv_dir(self.workflow),
-            pub_d=os.path.join(self.workflow_run_dir, 'log')
+            pub_d=os.path.join(self.workflow_run_dir, 'log'),
+            incremental_task_pool=db_cfg['incremental task pool'],
+            task_pool_checkpoint_interval=(
+                db_cfg['task pool checkpoint interval']
+            ),
+            persistent_connections=db_cfg['persistent connections'],
+            pub_writer_thread=db_cfg['background public database writes'],
+            pub_max_lag=db_cfg['public database maximum lag'],
         )
         self.is_restart = Path(self.workflow_db_mgr.pri_path).is_file()
         if (
@@ -368,7 +413,7 @@ class Scheduler:
 
         self.server = WorkflowRuntimeServer(self)
 
-        self.proc_pool = SubProcPool()
+        self.proc_pool = get_proc_pool()
         self.command_queue = Queue()
         self.message_queue = Queue()
         self.ext_trigger_queue = Queue()
@@ -875,8 +920,16 @@ class Scheduler:
     def process_queued_task_messages(self) -> None:
         """Process incoming task messages for each task proxy.
 
+        Queued messages are drained in one batch and grouped by task ID.
+        Repeated copies of the same message from the same job are dropped
+        before they reach the task events manager. Each group is then
+        dispatched to its task proxy by ID lookup.
+
         """
-        messages: 'Dict[str, List[Tuple[Optional[int], TaskMsg]]]' = {}
+        messages: 'Dict[str, Dict[Tuple, Tuple[Optional[int], TaskMsg]]]'
+        messages = {}
+        n_received = 0
+        start = time()
 
         # Retrieve queued messages
         while self.message_queue.qsize():
@@ -885,25 +938,37 @@ class Scheduler:
             except Empty:
                 break
             self.message_queue.task_done()
-            tokens = Tokens(task_msg.job_id, relative=True)
-            # task ID (job stripped)
-            task_id = tokens.duplicate(job=None).relative_id
-            messages.setdefault(task_id, [])
+            n_received += 1
+            task_id, job = _parse_job_id(task_msg.job_id)
             # job may be None (e.g. simulation mode)
-            job = int(tokens['job']) if tokens['job'] else None
-            messages[task_id].append(
-                (job, task_msg)
+            messages.setdefault(task_id, {}).setdefault(
+                (
+                    job,
+                    task_msg.severity,
+                    task_msg.message,
+                    task_msg.event_time,
+                ),
+                (job, task_msg),
             )
 
+        if not n_received:
+            return
+
         # Poll tasks for which messages caused a backward state change.
         to_poll_tasks = []
-        for itask in self.pool.get_tasks():
-            message_items = messages.get(itask.identity)
-            if message_items is None:
+        undeliverable: 'List[Tuple[Optional[int], TaskMsg]]' = []
+        n_processed = 0
+        for task_id, message_items in messages.items():
+            itask = self.pool.get_task_by_id(task_id)
+            if itask is None:
+                # No corresponding task proxy. For example, if I manually
+                # set a running task to succeeded, the proxy can be
+                # removed, but the orphaned job still sends messages.
+                undeliverable.extend(message_items.values())
                 continue
             should_poll = False
-            del messages[itask.identity]
-            for submit_num, tm in message_items:
+            for submit_num, tm in message_items.values():
+                n_processed += 1
                 if self.task_events_mgr.process_message(
                     itask, tm.severity, tm.message, tm.event_time,
                     self.task_events_mgr.FLAG_RECEIVED, submit_num
@@ -914,15 +979,24 @@ class Scheduler:
         if to_poll_tasks:
             self.task_job_mgr.poll_task_jobs(self.workflow, to_poll_tasks)
 
-        # Remaining unprocessed messages have no corresponding task proxy.
-        # For example, if I manually set a running task to succeeded, the
-        # proxy can be removed, but the orphaned job still sends messages.
-        for tms in messages.values():
+        if undeliverable:
             warn = "Undeliverable task messages received and ignored:"
-            for _, msg in tms:
+            for _, msg in undeliverable:
                 warn += f'\n  {msg.job_id}: {msg.severity} - "{msg.message}"'
             LOG.warning(warn)
 
+        elapsed = time() - start
+        stats = self.task_message_stats
+        stats['received'] += n_received
+        stats['processed'] += n_processed
+        stats['duplicate'] += n_received - n_processed - len(undeliverable)
+        stats['undeliverable'] += len(undeliverable)
+        stats['time'] += elapsed
+        LOG.debug(
+            f"Processed {n_processed} of {n_received} task message(s)"
+            f" for {len(messages)} task(s) in {elapsed:.3f}s"
+        )
+
     def get_command_method(self, command_name: str) -> Callable:
         """Return a command processing method or raise AttributeError."""
         return getattr(self, f'command_{command_name}')
@@ -1243,10 +1317,9 @@ class Scheduler:
             )
         ):
             # don't release queued tasks, finish processing preparing tasks
-            pre_prep_tasks = [
-                itask for itask in self.pool.get_tasks()
-                if itask.state(TASK_STATUS_PREPARING)
-            ]
+            pre_prep_tasks = self.pool.get_tasks_by_status(
+                TASK_STATUS_PREPARING
+            )
 
         # Return, if no tasks to submit.
         else:
@@ -1295,7 +1368,9 @@ class Scheduler:
     def late_tasks_check(self):
         """Report tasks that are never active and are late."""
         now = time()
-        for itask in self.pool.get_tasks():
+        for itask in self.pool.get_tasks_by_status(
+            *TASK_STATUSES_NEVER_ACTIVE
+        ):
             if (
                     not itask.is_late
                     and itask.get_late_time()
@@ -1347,7 +1422,9 @@ class Scheduler:
                     "Waiting for the command process pool to empty" +
                     " for shutdown")
                 while self.proc_pool.is_not_done():
-                    sleep(self.INTERVAL_STOP_PROCESS_POOL_EMPTY)
+                    await self.proc_pool.sleep(
+                        self.INTERVAL_STOP_PROCESS_POOL_EMPTY
+                    )
                     if stop_process_pool_empty_msg:
                         LOG.info(stop_process_pool_empty_msg)
                         stop_process_pool_empty_msg = None
@@ -1484,23 +1561,21 @@ class Scheduler:
 
         await self.process_command_queue()
         self.proc_pool.process()
+        self.xtrigger_mgr.process_async_xtriggers()
 
         # Unqueued tasks with satisfied prerequisites must be waiting on
         # xtriggers or ext_triggers. Check these and queue tasks if ready.
-        for itask in self.pool.get_tasks():
-            if (
-                not itask.state(TASK_STATUS_WAITING)
-                or itask.state.is_queued
-                or itask.state.is_runahead
-            ):
-                continue
-
-            if (
-                itask.state.xtriggers
-                and not itask.state.xtriggers_all_satisfied()
-            ):
-                self.xtrigger_mgr.call_xtriggers_async(itask)
+        self.xtrigger_mgr.call_xtriggers_due()
+        if not self.ext_trigger_queue.empty():
+            for itask in self.pool.get_ext_trigger_tasks():
+                if self.broadcast_mgr.check_ext_triggers(
+                    itask, self.ext_trigger_queue
+                ):
+                    itask.notify_changed()
 
+        # Only tasks which have entered or changed in the waiting set since
+        # the last iteration can have become ready to queue.
+        for itask in self.pool.pop_queue_candidates():
             if (
                 itask.state.external_triggers
                 and not itask.state.external_triggers_all_satisfied()
@@ -1515,7 +1590,7 @@ class Scheduler:
             self.pool.spawn_parentless_sequential_xtriggers()
 
         if self.xtrigger_mgr.do_housekeeping:
-            self.xtrigger_mgr.housekeep(self.pool.get_tasks())
+            self.xtrigger_mgr.housekeep()
 
         self.pool.clock_expire_tasks()
         self.release_queued_tasks()
@@ -1524,7 +1599,7 @@ class Scheduler:
             self.get_run_mode() == RunMode.SIMULATION
             and sim_time_check(
                 self.task_events_mgr,
-                self.pool.get_tasks(),
+                self.pool.get_tasks_by_status(TASK_STATUS_RUNNING),
                 self.workflow_db_mgr,
             )
         ):
@@ -1542,8 +1617,7 @@ class Scheduler:
         self.workflow_db_mgr.put_task_event_timers(self.task_events_mgr)
 
         # List of task whose states have changed.
-        updated_task_list = [
-            t for t in self.pool.get_tasks() if t.state.is_updated]
+        updated_task_list = self.pool.get_updated_tasks()
         has_updated = updated_task_list or self.is_updated
 
         if updated_task_list and self.is_restart_timeout_wait:
@@ -1564,8 +1638,7 @@ class Scheduler:
 
             # Reset workflow and task updated flags.
             self.is_updated = False
-            for itask in updated_task_list:
-                itask.state.is_updated = False
+            self.pool.clear_updated_tasks(updated_task_list)
 
             if not self.is_stalled:
                 # Stop the stalled timer.
@@ -1604,7 +1677,7 @@ class Scheduler:
         # Quick sleep if there are items pending in process pool.
         # (Should probably use quick sleep logic for other queues?)
         elapsed = time() - tinit
-        quick_mode = self.proc_pool.is_not_done()
+        quick_mode = self.proc_pool.needs_polling()
         if (elapsed >= self.INTERVAL_MAIN_LOOP or
                 quick_mode and elapsed >= self.INTERVAL_MAIN_LOOP_QUICK):
             # Main loop has taken quite a bit to get through
@@ -1614,7 +1687,8 @@ class Scheduler:
             duration = self.INTERVAL_MAIN_LOOP_QUICK - elapsed
         else:
             duration = self.INTERVAL_MAIN_LOOP - elapsed
-        await asyncio.sleep(duration)
+        # (the process pool may end the sleep early if a process exits)
+        await self.proc_pool.sleep(duration)
         # Record latest main loop interval
         self.main_loop_intervals.append(time() - tinit)
         # END MAIN LOOP
@@ -1718,6 +1792,9 @@ class Scheduler:
             except Exception as exc:
                 LOG.exception(exc)
 
+        if hasattr(self, 'xtrigger_mgr'):
+            self.xtrigger_mgr.cancel_async_xtriggers()
+
         if hasattr(self, 'pool'):
             try:
                 if not self.is_stalled:
@@ -1843,18 +1920,17 @@ class Scheduler:
             self.check_workflow_stalled() or
             # if more tasks to run (if waiting and not
             # runahead, then held, queued, or xtriggered).
-            any(
-                itask for itask in self.pool.get_tasks()
-                if itask.state(
-                    TASK_STATUS_PREPARING,
-                    TASK_STATUS_SUBMITTED,
-                    TASK_STATUS_RUNNING,
-                ) or (
-                    # This is because runahead limit gets truncated
-                    # to stop_point if there is one, so tasks spawned
-                    # beyond the stop_point must be runahead limited.
-                    itask.state(TASK_STATUS_WAITING)
-                    and not itask.state.is_runahead
+            self.pool.get_tasks_by_status(
+                TASK_STATUS_PREPARING,
+                TASK_STATUS_SUBMITTED,
+                TASK_STATUS_RUNNING,
+            ) or any(
+                # This is because runahead limit gets truncated
+                # to stop_point if there is one, so tasks spawned
+                # beyond the stop_point must be runahead limited.
+                not itask.state.is_runahead
+                for itask in self.pool.get_tasks_by_status(
+                    TASK_STATUS_WAITING
                 )
             )
         ):
@@ -0,0 +1,39 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""cylc job-agent [OPTIONS]
+
+(This command is for internal use.)
+
+Run "cylc jobs-submit", "cylc jobs-poll" and "cylc jobs-kill" commands
+requested by the scheduler on STDIN, until STDIN is closed.
+"""
+
+from cylc.flow.job_agent import run_agent
+from cylc.flow.option_parsers import CylcOptionParser as COP
+from cylc.flow.terminal import cli_function
+
+INTERNAL = True
+
+
+def get_option_parser() -> COP:
+    return COP(__doc__, argdoc=[])
+
+
+@cli_function(get_option_parser)
+def main(parser, opts):
+    """CLI main."""
+    run_agent()
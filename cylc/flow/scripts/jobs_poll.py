@@ -39,6 +39,18 @@ def get_option_parser() -> COP:
             )
         ],
     )
+    parser.add_option(
+        "--poll-cache-max-age",
+        help=(
+            "Reuse a poll of all of the user's jobs made by this process up to"
+            " this many seconds ago, if the job runner supports it."
+            " (Only useful in a job agent.)"
+        ),
+        metavar="SECONDS",
+        type="float",
+        dest="poll_cache_max_age",
+        default=0,
+    )
 
     return parser
 
@@ -46,4 +58,6 @@ def get_option_parser() -> COP:
 @cli_function(get_option_parser)
 def main(parser, options, job_log_root, *job_log_dirs):
     """CLI main."""
-    JobRunnerManager().jobs_poll(job_log_root, job_log_dirs)
+    JobRunnerManager().jobs_poll(
+        job_log_root, job_log_dirs, max_age=options.poll_cache_max_age
+    )
@@ -78,6 +78,15 @@ def get_option_parser() -> COP:
         dest="path",
         default=[]
     )
+    parser.add_option(
+        "--max-workers",
+        help="Maximum number of jobs to submit at the same time.",
+        action="store",
+        type=int,
+        metavar="N",
+        dest="max_workers",
+        default=1,
+    )
     return parser
 
 
@@ -89,4 +98,5 @@ def main(parser, opts, job_log_root, *job_log_dirs):
         job_log_dirs,
         remote_mode=opts.remote_mode,
         utc_mode=opts.utc_mode,
+        max_workers=opts.max_workers,
     )
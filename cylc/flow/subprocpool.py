@@ -15,24 +15,32 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Manage queueing and pooling of subprocesses for the scheduler."""
 
+import asyncio
 from collections import deque
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from io import StringIO
 import json
+from multiprocessing import get_context
 import os
 import select
 from signal import SIGKILL
 import sys
 import shlex
 from tempfile import SpooledTemporaryFile
-from threading import RLock
+from threading import RLock, Thread
 from time import time
-from subprocess import DEVNULL, run  # nosec
-from typing import TYPE_CHECKING, Any, Callable, List, Optional, Set
+from subprocess import DEVNULL, PIPE, run  # nosec
+import traceback
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple, cast
+)
 
 from cylc.flow import LOG, iter_entry_points
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.cylc_subproc import procopen
 from cylc.flow.exceptions import PlatformLookupError
 from cylc.flow.hostuserutil import is_remote_host
+from cylc.flow.job_agent import JobAgent
 from cylc.flow.platforms import (
     log_platform_event,
     get_platform,
@@ -43,6 +51,7 @@ from cylc.flow.task_proxy import TaskProxy
 from cylc.flow.wallclock import get_current_time_string
 
 if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult, Pool
     from subprocess import Popen
     from cylc.flow.subprocctx import SubProcContext
 
@@ -66,7 +75,8 @@ def _killpg(proc, signal):
         # problem that shouldn't happen (it's really a bug in the Cylc subproc)
         LOG.error(
             f'Could not kill process group: {proc.pid}'
-            f'\nCommand: {" ".join(proc.args)}'
+            # (asyncio processes do not record their args)
+            f'\nCommand: {" ".join(getattr(proc, "args", []))}'
         )
         return False
     return True
@@ -156,6 +166,28 @@ def run_function(mod_name, func_name, json_args, json_kwargs, src_dir):
     sys.stdout.write(json.dumps(res))
 
 
+def run_function_in_worker(*args: str) -> Tuple[int, str, str]:
+    """Run a Python function in a worker process of the xtrigger pool.
+
+    The equivalent of "cylc function-run", for a long-lived worker process.
+    Arguments are as for run_function.
+
+    Returns:
+        (ret_code, out, err) of the call.
+
+    """
+    out = StringIO()
+    err = StringIO()
+    ret_code = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            run_function(*args)
+        except (Exception, SystemExit):
+            traceback.print_exc()
+            ret_code = 1
+    return ret_code, out.getvalue(), err.getvalue()
+
+
 class SubProcPool:
     """Manage queueing and pooling of subprocesses.
 
@@ -186,6 +218,38 @@ class SubProcPool:
     JOBS_SUBMIT = 'jobs-submit'
     POLLREAD = select.POLLIN | select.POLLPRI
     RET_CODE_WORKFLOW_STOPPING = 999
+    XTRIGGER_WORKER_POOL = 'worker pool'
+
+    # Classes of queued command, highest priority first.
+    PRIORITY_CLASSES = (
+        'remote init',
+        'file install',
+        'job submission',
+        'job poll and kill',
+        'xtrigger',
+        'event handler',
+    )
+    # Priority class by command key, for commands other than event handlers.
+    CMD_KEY_CLASSES = {
+        'remote-init': 'remote init',
+        'remote-host-select': 'remote init',
+        'file-install': 'file install',
+        JOBS_SUBMIT: 'job submission',
+        'jobs-poll': 'job poll and kill',
+        'jobs-kill': 'job poll and kill',
+        'xtrigger-func': 'xtrigger',
+    }
+    # Queue wait after which a command runs ahead of higher priority classes
+    # (so that a saturated high priority class cannot starve the others).
+    MAX_QUEUE_WAIT = 60.0
+    # Interval between adjustments of the pool size, if adaptive.
+    ADAPT_INTERVAL = 10.0
+    # Delay before trying again to start a job agent that failed to start.
+    JOB_AGENT_RETRY_DELAY = 600.0
+    # Maximum number of requests queued on a job agent behind the one it is
+    # running (agents run requests one at a time, further commands are run
+    # as commands of their own rather than wait behind a slow request).
+    JOB_AGENT_MAX_QUEUED = 4
 
     def __init__(self):
         self.size = glbl_cfg().get(['scheduler', 'process pool size'])
@@ -195,8 +259,38 @@ class SubProcPool:
         self.stopping = False  # No more job submit if True
         # .stopping may be set by an API command in a different thread
         self.stopping_lock = RLock()
-        self.queuings = deque()
+        # queued commands by priority class
+        self.queues: Dict[str, deque] = {
+            key: deque() for key in self.PRIORITY_CLASSES
+        }
         self.runnings = []
+        pool_conf = glbl_cfg().get(['scheduler', 'process pool'])
+        self.limits: Dict[str, Optional[int]] = {
+            key: pool_conf['limits'][key] for key in self.PRIORITY_CLASSES
+        }
+        # adaptive sizing between the configured size and the maximum size
+        self.min_size = self.size
+        self.max_size = max(self.size, pool_conf['maximum size'] or 0)
+        self.target_wait = pool_conf['target queue wait']
+        self.max_load = pool_conf['maximum load']
+        self.adapt_time = time()
+        self.adapt_waits: List[float] = []
+        # launched commands and their queue wait times by priority class
+        self.stats: Dict[str, Dict[str, float]] = {
+            key: {'launched': 0, 'total wait': 0.0, 'max wait': 0.0}
+            for key in self.PRIORITY_CLASSES
+        }
+        # xtrigger functions running in the worker pool, if used
+        self.xtrigger_executor = glbl_cfg().get(
+            ['scheduler', 'xtrigger executor'])
+        self.func_pool: 'Optional[Pool]' = None
+        # worker pools replaced by restart_func_pool, still running functions
+        self.old_func_pools: 'List[Pool]' = []
+        self.func_runnings: list = []
+        # job agents by the command that started them
+        self.job_agents: Dict[Tuple[str, ...], JobAgent] = {}
+        # time of the last failure to start a job agent, by the same key
+        self.job_agent_failures: Dict[Tuple[str, ...], float] = {}
         try:
             self.pipepoller = select.poll()
         except AttributeError:  # select.poll not implemented for this OS
@@ -212,9 +306,62 @@ class SubProcPool:
         """Return a SpooledTemporaryFile for feeding data to command STDIN."""
         return SpooledTemporaryFile()
 
+    @property
+    def queuings(self) -> list:
+        """Return all queued commands, in the order they would be run.
+
+        (Ignoring the per-class limits.)
+        """
+        return [
+            item for key in self.PRIORITY_CLASSES for item in self.queues[key]
+        ]
+
+    @classmethod
+    def get_priority_class(cls, ctx) -> str:
+        """Return the priority class of a command.
+
+        Examples:
+            >>> from cylc.flow.subprocctx import SubProcContext
+            >>> SubProcPool.get_priority_class(
+            ...     SubProcContext('jobs-poll', ['true']))
+            'job poll and kill'
+            >>> SubProcPool.get_priority_class(
+            ...     SubProcContext((('handler', 'failed'), 1), ['true']))
+            'event handler'
+
+        """
+        if isinstance(ctx.cmd_key, str):
+            return cls.CMD_KEY_CLASSES.get(ctx.cmd_key, 'event handler')
+        return 'event handler'
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return queue depth and wait time statistics by priority class.
+
+        For each class: the number of commands "queued" and "running", the
+        number "launched" so far, and their "mean wait" and "max wait" in
+        the queue in seconds.
+        """
+        running = self._count_running()
+        return {
+            key: {
+                'queued': len(self.queues[key]),
+                'running': running[key],
+                'launched': stats['launched'],
+                'mean wait': (
+                    stats['total wait'] / stats['launched']
+                    if stats['launched'] else 0.0
+                ),
+                'max wait': stats['max wait'],
+            }
+            for key, stats in self.stats.items()
+        }
+
     def is_not_done(self):
         """Return True if queuings or runnings not empty."""
-        return self.queuings or self.runnings
+        return (
+            any(self.queues.values()) or self.runnings or self.func_runnings
+            or self._agents_busy()
+        )
 
     def _is_stopping(self):
         """Return whether .stopping is True or not.
@@ -258,7 +405,24 @@ class SubProcPool:
 
     def process(self):
         """Process done child processes and submit more."""
-        # Handle child processes that are done
+        self._process_runnings()
+        self._process_funcs()
+        self._process_agents()
+        self._run_queued()
+
+    def needs_polling(self):
+        """Return True if process() must be called soon to check progress.
+
+        (I.e. the scheduler should use its quick main loop interval.)
+        """
+        return self.is_not_done()
+
+    async def sleep(self, duration: float) -> None:
+        """Sleep between main loop iterations."""
+        await asyncio.sleep(duration)
+
+    def _process_runnings(self):
+        """Handle child processes that are done."""
         runnings = []
         for running in self.runnings:
             (
@@ -299,28 +463,404 @@ class SubProcPool:
 
         # Update list of running items
         self.runnings[:] = runnings
-        # Create more child processes, if items in queue and space in pool
+
+    def _count_running(self) -> Dict[str, int]:
+        """Return the number of running commands by priority class.
+
+        (Including commands sent to job agents and awaiting a response.)
+        """
+        running = dict.fromkeys(self.PRIORITY_CLASSES, 0)
+        for item in self.runnings + self.func_runnings:
+            running[self.get_priority_class(item[1])] += 1
+        for agent in self.job_agents.values():
+            for item in agent.pending.values():
+                running[self.get_priority_class(item[0])] += 1
+        return running
+
+    def _next_class(self, running: Dict[str, int]) -> Optional[str]:
+        """Return the class to run a command from next, if any.
+
+        This is the highest priority class that can run a command now,
+        unless a command has waited longer than MAX_QUEUE_WAIT, in which
+        case the class with the command that has waited longest is run.
+        """
+        keys = [
+            key for key in self.PRIORITY_CLASSES
+            if self.queues[key] and (
+                self.limits[key] is None
+                or running[key] < cast('int', self.limits[key])
+            )
+        ]
+        if not keys:
+            return None
+        oldest = min(keys, key=lambda key: self.queues[key][0][-1])
+        if time() - self.queues[oldest][0][-1] > self.MAX_QUEUE_WAIT:
+            return oldest
+        return keys[0]
+
+    def _adapt_size(self):
+        """Grow or shrink the pool according to queue wait and host load.
+
+        The pool grows one process at a time, up to the maximum size, while
+        commands wait longer than the target to start and the host is not
+        loaded. It shrinks back towards its configured size when the queues
+        are empty or the host is loaded.
+        """
+        if self.max_size <= self.min_size:
+            return
+        now = time()
+        if now < self.adapt_time + self.ADAPT_INTERVAL:
+            return
+        self.adapt_time = now
+        # include commands still waiting
+        waits = self.adapt_waits + [
+            now - item[-1] for queue in self.queues.values() for item in queue
+        ]
+        self.adapt_waits = []
+        mean_wait = sum(waits) / len(waits) if waits else 0.0
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:  # load average not available on this OS
+            load = 0.0
+        size = self.size
+        if (
+            mean_wait > self.target_wait
+            and load < self.max_load
+            and size < self.max_size
+        ):
+            self.size += 1
+        elif (
+            (load >= self.max_load or not any(self.queues.values()))
+            and size > self.min_size
+        ):
+            self.size -= 1
+        if self.size != size:
+            LOG.debug(
+                f'process pool size {size} -> {self.size}'
+                f' (mean queue wait {mean_wait:.1f}s, load {load:.2f})'
+            )
+
+    def _run_queued(self):
+        """Create more child processes, if items in queue and space in pool.
+
+        Queued commands are run highest priority class first, subject to
+        the limit for each class.
+        """
         stopping = self._is_stopping()
-        while self.queuings and len(self.runnings) < self.size:
+        self._adapt_size()
+        running = self._count_running()
+        n_running = sum(running.values())
+        while n_running < self.size:
+            key = self._next_class(running)
+            if key is None:
+                break
             (
                 ctx, bad_hosts, callback, callback_args,
-                callback_255, callback_255_args
-            ) = self.queuings.popleft()
+                callback_255, callback_255_args, queued_time
+            ) = self.queues[key].popleft()
             if stopping and ctx.cmd_key == self.JOBS_SUBMIT:
                 ctx.err = self.ERR_WORKFLOW_STOPPING
                 ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
                 self._run_command_exit(ctx)
+                continue
+            wait = time() - queued_time
+            stats = self.stats[key]
+            stats['launched'] += 1
+            stats['total wait'] += wait
+            stats['max wait'] = max(stats['max wait'], wait)
+            self.adapt_waits.append(wait)
+            running[key] += 1
+            n_running += 1
+            if self._send_to_agent(
+                ctx, bad_hosts, callback, callback_args,
+                callback_255, callback_255_args
+            ):
+                continue
+            if (
+                isinstance(ctx, SubFuncContext)
+                and self.xtrigger_executor == self.XTRIGGER_WORKER_POOL
+            ):
+                LOG.debug(ctx.cmd)
+                ctx.timeout = time() + self.proc_pool_timeout
+                # (args as for "cylc function-run")
+                func_pool = self._get_func_pool()
+                result = func_pool.apply_async(
+                    run_function_in_worker, ctx.cmd[2:]
+                )
+                self.func_runnings.append(
+                    [result, ctx, callback, callback_args, func_pool]
+                )
             else:
-                proc = self._run_command_init(
+                self._launch(
                     ctx, bad_hosts, callback, callback_args,
                     callback_255, callback_255_args
                 )
-                if proc is not None:
+
+    def _launch(
+        self, ctx, bad_hosts, callback, callback_args,
+        callback_255, callback_255_args
+    ):
+        """Launch a queued command and add it to the running items."""
+        proc = self._run_command_init(
+            ctx, bad_hosts, callback, callback_args,
+            callback_255, callback_255_args
+        )
+        if proc is not None:
+            ctx.timeout = time() + self.proc_pool_timeout
+            self.runnings.append([
+                proc, ctx, bad_hosts, callback, callback_args,
+                callback_255, callback_255_args
+            ])
+
+    def _agents_busy(self) -> bool:
+        """Return True if any job agent has requests awaiting a response."""
+        return any(agent.pending for agent in self.job_agents.values())
+
+    def _send_to_agent(
+        self, ctx, bad_hosts, callback, callback_args,
+        callback_255, callback_255_args
+    ) -> bool:
+        """Send a job command to a job agent, if it is to use one.
+
+        Returns False if the command is to be run as a command of its own.
+        """
+        agent_cmd = ctx.cmd_kwargs.get('agent_cmd')
+        if not agent_cmd:
+            return False
+        key = tuple(agent_cmd)
+        if (
+            time() < self.job_agent_failures.get(key, 0)
+            + self.JOB_AGENT_RETRY_DELAY
+        ):
+            return False
+        agent = self.job_agents.get(key)
+        if (
+            agent is not None
+            and len(agent.pending) > self.JOB_AGENT_MAX_QUEUED
+        ):
+            return False
+        try:
+            if agent is None:
+                LOG.debug(f'starting job agent: {" ".join(agent_cmd)}')
+                agent = JobAgent(agent_cmd)
+                self.job_agents[key] = agent
+            stdin = b''
+            for file_ in ctx.cmd_kwargs.get('stdin_files') or []:
+                if hasattr(file_, 'read'):
+                    stdin += file_.read()
+                else:
+                    with open(file_, 'rb') as openfile:
+                        stdin += openfile.read()
+            # (reset when the agent starts running the request)
+            ctx.timeout = time() + self.proc_pool_timeout
+            agent.send(
+                ctx.cmd_kwargs['agent_argv'],
+                stdin.decode(),
+                [
+                    ctx, bad_hosts, callback, callback_args,
+                    callback_255, callback_255_args
+                ]
+            )
+        except OSError as exc:
+            LOG.warning(f'job agent unavailable, running command: {exc}')
+            self.job_agent_failures[key] = time()
+            return False
+        LOG.debug(f'{ctx.cmd_key} sent to job agent on {ctx.host}')
+        return True
+
+    def _process_agents(self):
+        """Handle job agent responses, and job agents that have exited."""
+        for key, agent in list(self.job_agents.items()):
+            for item, response in agent.get_responses():
+                ctx = item[0]
+                if response.get('started'):
                     ctx.timeout = time() + self.proc_pool_timeout
-                    self.runnings.append([
-                        proc, ctx, bad_hosts, callback, callback_args,
-                        callback_255, callback_255_args
-                    ])
+                    continue
+                ctx.ret_code = response.get('ret_code', 1)
+                ctx.out = response.get('out') or None
+                ctx.err = response.get('err') or None
+                self._agent_request_exit(item)
+            if agent.is_alive():
+                self._check_agent_timeout(agent)
+            if agent.is_done():
+                del self.job_agents[key]
+                if not agent.ready:
+                    self.job_agent_failures[key] = time()
+                self._agent_exit(agent)
+            elif self.closed and not agent.pending:
+                agent.stop()
+
+    def _agent_request_exit(self, item):
+        """Handle a job agent request which is done."""
+        (
+            ctx, bad_hosts, callback, callback_args,
+            callback_255, callback_255_args
+        ) = item
+        LOG.debug(ctx)
+        self._run_command_exit(
+            ctx, bad_hosts=bad_hosts,
+            callback=callback, callback_args=callback_args,
+            callback_255=callback_255,
+            callback_255_args=callback_255_args
+        )
+
+    def _check_agent_timeout(self, agent: JobAgent):
+        """Kill a job agent whose request, or start-up, has timed out.
+
+        A request times out as a command of its own would, i.e. the process
+        pool timeout after the agent starts running it. The agent runs
+        requests in-process so it has to be killed, but only the request
+        that timed out fails: requests waiting behind it are run again (see
+        _agent_exit).
+        """
+        now = time()
+        if agent.running is not None:
+            item = agent.pending[agent.running]
+            if now <= item[0].timeout:
+                return
+            LOG.warning(
+                f'job agent request timed out ({self.proc_pool_timeout}):'
+                f' {item[0].cmd_key} on {item[0].host}'
+            )
+            del agent.pending[agent.running]
+            agent.running = None
+            agent.kill()
+            item[0].ret_code = -SIGKILL
+            item[0].err = f'killed on timeout ({self.proc_pool_timeout})'
+            self._agent_request_exit(item)
+        elif not agent.ready and agent.pending and now > min(
+            item[0].timeout for item in agent.pending.values()
+        ):
+            LOG.warning(
+                f'job agent timed out ({self.proc_pool_timeout}) starting:'
+                f' {" ".join(agent.cmd)}'
+            )
+            agent.kill()
+
+    def _agent_exit(self, agent: JobAgent):
+        """Handle requests left unanswered by a job agent that has exited.
+
+        Requests the agent did not start running are run again as commands of
+        their own. A job submission request which was running fails, as a
+        job may have been submitted, but a running poll or kill request is
+        run again.
+        """
+        if not agent.pending:
+            return
+        LOG.warning(
+            f'job agent exited ({agent.proc.returncode}):'
+            f' {" ".join(agent.cmd)}\n{"".join(agent.stderr)}'.rstrip()
+        )
+        for req_id, item in agent.pending.items():
+            ctx = item[0]
+            del ctx.cmd_kwargs['agent_cmd']
+            if req_id == agent.running and ctx.cmd_key == self.JOBS_SUBMIT:
+                ctx.ret_code = 1
+                ctx.err = (
+                    'job agent exited, job submission outcome unknown\n'
+                    + ''.join(agent.stderr)
+                )
+                self._run_command_exit(
+                    ctx, bad_hosts=item[1],
+                    callback=item[2], callback_args=item[3]
+                )
+            else:
+                self.queues[self.get_priority_class(ctx)].appendleft(
+                    [*item, time()]
+                )
+        agent.pending.clear()
+
+    def _process_funcs(self):
+        """Handle xtrigger functions in the worker pool that are done."""
+        func_runnings = []
+        for running in self.func_runnings:
+            result, ctx, callback, callback_args, func_pool = running
+            if result.ready():
+                self._func_exit(result, ctx, "", callback, callback_args)
+            elif time() > ctx.timeout:
+                self._func_exit(
+                    None, ctx,
+                    f"killed on timeout ({self.proc_pool_timeout})",
+                    callback, callback_args
+                )
+                if func_pool is self.func_pool:
+                    # Worker processes cannot be killed individually, so
+                    # replace the pool. The other functions running in it
+                    # are left to finish, then it is terminated (below),
+                    # killing the worker running this one.
+                    self.restart_func_pool()
+            else:
+                func_runnings.append(running)
+        self.func_runnings[:] = func_runnings
+        if self.old_func_pools:
+            # terminate replaced pools once their functions are done
+            in_use = [running[4] for running in self.func_runnings]
+            for func_pool in list(self.old_func_pools):
+                if func_pool not in in_use:
+                    # (this waits for the workers to exit, so don't block
+                    # the main loop)
+                    Thread(target=func_pool.terminate, daemon=True).start()
+                    self.old_func_pools.remove(func_pool)
+        if self.closed and not self.func_runnings:
+            self._kill_func_pool()
+
+    def _func_exit(
+        self,
+        result: 'Optional[AsyncResult]',
+        ctx: 'SubFuncContext',
+        err_xtra: str,
+        callback: Callable,
+        callback_args: list,
+    ):
+        """Get ret_code, out, err of a worker pool function, call callback.
+
+        A result of None means that the function was killed.
+        """
+        out, err = '', ''
+        if result is None:
+            ctx.ret_code = 1
+        else:
+            try:
+                ctx.ret_code, out, err = result.get()
+            except Exception as exc:
+                # e.g. function arguments or results could not be pickled
+                ctx.ret_code = 1
+                err = f'{type(exc).__name__}: {exc}'
+        if out:
+            ctx.out = out
+        if err or err_xtra:
+            ctx.err = err + err_xtra
+        LOG.debug(ctx.dump())
+        self._run_command_exit(
+            ctx, callback=callback, callback_args=callback_args
+        )
+
+    def _get_func_pool(self) -> 'Pool':
+        """Return the xtrigger worker pool, starting it if necessary."""
+        if self.func_pool is None:
+            # (Don't fork the scheduler, it has other threads running.)
+            self.func_pool = get_context('spawn').Pool(self.max_size)
+        return self.func_pool
+
+    def _kill_func_pool(self):
+        """Kill the xtrigger worker pool (and any replaced pools)."""
+        if self.func_pool is not None:
+            self.func_pool.terminate()
+            self.func_pool = None
+        for func_pool in self.old_func_pools:
+            func_pool.terminate()
+        self.old_func_pools.clear()
+
+    def restart_func_pool(self) -> None:
+        """Replace the xtrigger worker pool, e.g. on reload.
+
+        Worker processes keep xtrigger modules imported, so must be replaced
+        to pick up changes to xtrigger functions. New calls start a new pool,
+        calls in progress are left to finish in the old one.
+        """
+        if self.func_pool is not None:
+            self.old_func_pools.append(self.func_pool)
+            self.func_pool = None
 
     def put_command(
         self, ctx, bad_hosts=None, callback=None, callback_args=None,
@@ -348,10 +888,10 @@ class SubProcPool:
                 callback_255=callback_255, callback_255_args=callback_255_args
             )
         else:
-            self.queuings.append(
+            self.queues[self.get_priority_class(ctx)].append(
                 [
                     ctx, bad_hosts, callback, callback_args,
-                    callback_255, callback_255_args
+                    callback_255, callback_255_args, time()
                 ]
             )
 
@@ -378,16 +918,33 @@ class SubProcPool:
         """Drain queue, and kill and process remaining child processes."""
         self.close()
         # Drain queue
-        while self.queuings:
-            ctx = self.queuings.popleft()[0]
-            ctx.err = self.ERR_WORKFLOW_STOPPING
-            ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
-            self._run_command_exit(ctx)
+        for queue in self.queues.values():
+            while queue:
+                ctx = queue.popleft()[0]
+                ctx.err = self.ERR_WORKFLOW_STOPPING
+                ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
+                self._run_command_exit(ctx)
         # Kill remaining processes
         for value in self.runnings:
             proc = value[0]
             if proc:
                 _killpg(proc, SIGKILL)
+        self._kill_func_pool()
+        for value in self.func_runnings:
+            ctx = value[1]
+            ctx.err = self.ERR_WORKFLOW_STOPPING
+            ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
+            self._run_command_exit(ctx)
+        self.func_runnings.clear()
+        for agent in self.job_agents.values():
+            agent.kill()
+            for item in agent.pending.values():
+                ctx = item[0]
+                ctx.err = self.ERR_WORKFLOW_STOPPING
+                ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
+                self._run_command_exit(ctx)
+            agent.pending.clear()
+        self.job_agents.clear()
         # Wait for child processes
         self.process()
 
@@ -450,29 +1007,7 @@ class SubProcPool:
     ):
         """Prepare and launch shell command in ctx."""
         try:
-            if ctx.cmd_kwargs.get('stdin_files'):
-                if len(ctx.cmd_kwargs['stdin_files']) > 1:
-                    stdin_file = cls.get_temporary_file()
-                    for file_ in ctx.cmd_kwargs['stdin_files']:
-                        if hasattr(file_, 'read'):
-                            stdin_file.write(file_.read())
-                        else:
-                            with open(file_, 'rb') as openfile:
-                                stdin_file.write(openfile.read())
-                    stdin_file.seek(0)
-                elif hasattr(ctx.cmd_kwargs['stdin_files'][0], 'read'):
-                    stdin_file = ctx.cmd_kwargs['stdin_files'][0]
-                else:
-                    stdin_file = open(  # noqa: SIM115
-                        # (nasty use of file handles, should avoid in future)
-                        ctx.cmd_kwargs['stdin_files'][0], 'rb'
-                    )
-            elif ctx.cmd_kwargs.get('stdin_str'):
-                stdin_file = cls.get_temporary_file()
-                stdin_file.write(ctx.cmd_kwargs.get('stdin_str').encode())
-                stdin_file.seek(0)
-            else:
-                stdin_file = DEVNULL
+            stdin_file = cls._get_stdin(ctx)
             proc = procopen(
                 ctx.cmd, stdin=stdin_file, stdoutpipe=True, stderrpipe=True,
                 # Execute command as a process group leader,
@@ -498,6 +1033,34 @@ class SubProcPool:
             LOG.debug(ctx.cmd)
             return proc
 
+    @classmethod
+    def _get_stdin(cls, ctx):
+        """Return the STDIN file for the command in ctx."""
+        if ctx.cmd_kwargs.get('stdin_files'):
+            if len(ctx.cmd_kwargs['stdin_files']) > 1:
+                stdin_file = cls.get_temporary_file()
+                for file_ in ctx.cmd_kwargs['stdin_files']:
+                    if hasattr(file_, 'read'):
+                        stdin_file.write(file_.read())
+                    else:
+                        with open(file_, 'rb') as openfile:
+                            stdin_file.write(openfile.read())
+                stdin_file.seek(0)
+            elif hasattr(ctx.cmd_kwargs['stdin_files'][0], 'read'):
+                stdin_file = ctx.cmd_kwargs['stdin_files'][0]
+            else:
+                stdin_file = open(  # noqa: SIM115
+                    # (nasty use of file handles, should avoid in future)
+                    ctx.cmd_kwargs['stdin_files'][0], 'rb'
+                )
+        elif ctx.cmd_kwargs.get('stdin_str'):
+            stdin_file = cls.get_temporary_file()
+            stdin_file.write(ctx.cmd_kwargs.get('stdin_str').encode())
+            stdin_file.seek(0)
+        else:
+            stdin_file = DEVNULL
+        return stdin_file
+
     @classmethod
     def _run_command_exit(
         cls,
@@ -653,3 +1216,177 @@ class SubProcPool:
         ):
             rsync_255_fail = True
         return rsync_255_fail
+
+
+class AsyncSubProcPool(SubProcPool):
+    """A SubProcPool that runs its commands on the asyncio event loop.
+
+    Each command is run by an asyncio task which streams the command's
+    STDOUT/STDERR and waits for it to exit, so running commands do not need
+    to be polled. The scheduler is woken from its main loop sleep as soon as
+    a command exits. Callbacks are still only called from process().
+
+    Must be used from a running event loop.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Running processes by the task running them.
+        self.procs: 'Dict[asyncio.Task, asyncio.subprocess.Process]' = {}
+        # Set when a command exits (created on first use, in the loop).
+        self.exited: Optional[asyncio.Event] = None
+
+    def needs_polling(self):
+        # (Only xtrigger functions in the worker pool and job agents are
+        # polled.)
+        return bool(self.func_runnings) or self._agents_busy()
+
+    async def sleep(self, duration: float) -> None:
+        """Sleep between main loop iterations, until a command exits."""
+        if self.exited is None:
+            self.exited = asyncio.Event()
+        if duration > 0:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.exited.wait(), duration)
+        else:
+            await asyncio.sleep(0)
+        self.exited.clear()
+
+    def _process_runnings(self):
+        """Handle commands that are done."""
+        runnings = []
+        for running in self.runnings:
+            (
+                task, ctx, bad_hosts,
+                callback, callback_args,
+                callback_255, callback_255_args
+            ) = running
+            if not task.done():
+                runnings.append(running)
+                continue
+            try:
+                ctx.ret_code, out, err = task.result()
+            except Exception as exc:
+                LOG.exception(exc)
+                ctx.ret_code, out, err = 1, '', str(exc)
+            if out:
+                ctx.out = (ctx.out or '') + out
+            if err:
+                ctx.err = (ctx.err or '') + err
+            LOG.debug(
+                ctx.dump() if isinstance(ctx, SubFuncContext) else ctx
+            )
+            self._run_command_exit(
+                ctx, bad_hosts=bad_hosts,
+                callback=callback, callback_args=callback_args,
+                callback_255=callback_255, callback_255_args=callback_255_args
+            )
+        self.runnings[:] = runnings
+
+    def _launch(
+        self, ctx, bad_hosts, callback, callback_args,
+        callback_255, callback_255_args
+    ):
+        """Start a task to run a queued command."""
+        ctx.timeout = time() + self.proc_pool_timeout
+        task = asyncio.ensure_future(self._run_command_async(ctx))
+        task.add_done_callback(self._on_exit)
+        self.runnings.append([
+            task, ctx, bad_hosts, callback, callback_args,
+            callback_255, callback_255_args
+        ])
+
+    def _on_exit(self, task: asyncio.Task):
+        """Wake the scheduler when a command has exited."""
+        self.procs.pop(task, None)
+        if self.exited is not None:
+            self.exited.set()
+
+    async def _run_command_async(self, ctx) -> Tuple[int, str, str]:
+        """Run the command in ctx, return (ret_code, out, err)."""
+        cmd = ctx.cmd
+        if ctx.cmd_kwargs.get('shell'):
+            # (as subprocess.Popen with shell=True)
+            cmd = ['/bin/sh', '-c'] + ([cmd] if isinstance(cmd, str) else cmd)
+        stdin_file = self._get_stdin(ctx)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=stdin_file, stdout=PIPE, stderr=PIPE,
+                # Execute command as a process group leader,
+                # so we can use "os.killpg" to kill the whole group.
+                preexec_fn=os.setpgrp,
+                env=ctx.cmd_kwargs.get('env'),
+            )
+        except OSError as exc:
+            if exc.filename is None:
+                exc.filename = ctx.cmd[0]
+            LOG.exception(exc)
+            return 1, '', str(exc)
+        finally:
+            # The child has its own copy, close the file if we opened it
+            # (file handles passed in by the caller are theirs to close).
+            if stdin_file != DEVNULL and not any(
+                stdin_file is file_
+                for file_ in ctx.cmd_kwargs.get('stdin_files') or []
+            ):
+                stdin_file.close()
+        LOG.debug(ctx.cmd)
+        self.procs[asyncio.current_task()] = proc  # type: ignore[index]
+
+        out: List[bytes] = []
+        err: List[bytes] = []
+
+        async def _read(stream, data):
+            while True:
+                chunk = await stream.read(65536)  # 64K
+                if not chunk:
+                    break
+                data.append(chunk)
+
+        done = asyncio.gather(
+            _read(proc.stdout, out), _read(proc.stderr, err), proc.wait()
+        )
+        err_xtra = ''
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(done), max(ctx.timeout - time(), 0)
+            )
+        except asyncio.TimeoutError:
+            # Command timed out, kill it
+            if _killpg(proc, SIGKILL):
+                err_xtra = f"\nkilled on timeout ({self.proc_pool_timeout})"
+            await done
+        return (
+            # (set now that proc.wait() has returned)
+            cast('int', proc.returncode),
+            b''.join(out).decode(),
+            b''.join(err).decode() + err_xtra,
+        )
+
+    def terminate(self):
+        """Drain queue, and kill remaining commands."""
+        for proc in self.procs.values():
+            _killpg(proc, SIGKILL)
+        for value in self.runnings:
+            task, ctx = value[:2]
+            if not task.done():
+                task.cancel()
+                ctx.ret_code = -SIGKILL
+                ctx.err = (ctx.err or '') + "\nkilled on shutdown"
+                self._run_command_exit(
+                    ctx, callback=value[3], callback_args=value[4]
+                )
+        self.runnings.clear()
+        self.procs.clear()
+        super().terminate()
+
+
+def get_proc_pool() -> SubProcPool:
+    """Return a process pool of the configured implementation."""
+    if glbl_cfg().get(
+        ['scheduler', 'process pool implementation']
+    ) == 'asyncio':
+        return AsyncSubProcPool()
+    return SubProcPool()
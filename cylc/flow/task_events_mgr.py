@@ -471,22 +471,24 @@ class TaskEventsManager():
         If now is set, set the timer only if the previous delay is done.
         Return the next delay.
         """
-        if not itask.state(*TASK_STATUSES_ACTIVE):
-            # Reset, task not active
-            itask.timeout = None
-            itask.poll_timer = None
-            return None
         ctx = (itask.submit_num, itask.state.status)
-        if itask.poll_timer is None or itask.poll_timer.ctx != ctx:
-            # Reset, timer no longer relevant
-            itask.timeout = None
-            itask.poll_timer = None
+        if (
+            not itask.state(*TASK_STATUSES_ACTIVE)
+            or itask.poll_timer is None
+            or itask.poll_timer.ctx != ctx
+        ):
+            # Reset, task not active or timer no longer relevant
+            if itask.timeout is not None or itask.poll_timer is not None:
+                itask.timeout = None
+                itask.poll_timer = None
+                itask.notify_changed()
             return None
         if now is not None and not itask.poll_timer.is_delay_done(now):
             return False
         if itask.poll_timer.num is None:
             itask.poll_timer.num = 0
         itask.poll_timer.next(no_exhaust=True)
+        itask.notify_changed()
         return True
 
     def check_job_time(self, itask, now):
@@ -505,6 +507,7 @@ class TaskEventsManager():
         with suppress(TypeError, ValueError):
             msg += ' after %s' % intvl_as_str(itask.timeout - time_ref)
         itask.timeout = None  # emit event only once
+        itask.notify_changed()
         if msg and event:
             LOG.warning(f"[{itask}] {msg}")
             self.setup_event_handlers(itask, event, msg)
@@ -817,6 +820,7 @@ class TaskEventsManager():
             itask.set_summary_time('started')  # unset
             if TimerFlags.SUBMISSION_RETRY in itask.try_timers:
                 itask.try_timers[TimerFlags.SUBMISSION_RETRY].num = 0
+                itask.notify_changed()
             itask.job_vacated = True
             # Believe this and change state without polling (could poll?).
             if itask.state_reset(TASK_STATUS_SUBMITTED, forced=forced):
@@ -1288,6 +1292,8 @@ class TaskEventsManager():
                 os.getenv("CYLC_WORKFLOW_RUN_DIR")
             )
             itask.state.add_xtrigger(label)
+        # (the retry xtrigger signature has changed)
+        self.xtrigger_mgr.add_task(itask)
 
         if itask.state_reset(TASK_STATUS_WAITING):
             self.data_store_mgr.delta_task_state(itask)
@@ -1353,6 +1359,7 @@ class TaskEventsManager():
         # submission was successful so reset submission try number
         if TimerFlags.SUBMISSION_RETRY in itask.try_timers:
             itask.try_timers[TimerFlags.SUBMISSION_RETRY].num = 0
+            itask.notify_changed()
 
     def _process_message_expired(self, itask, event_time, forced):
         """Helper for process_message, handle task expiry."""
@@ -1800,6 +1807,7 @@ class TaskEventsManager():
             # Reset, task not active
             itask.timeout = None
             itask.poll_timer = None
+            itask.notify_changed()
             return
 
         ctx = (itask.submit_num, itask.state.status)
@@ -1842,6 +1850,7 @@ class TaskEventsManager():
             itask.timeout = None
             timeout_str = None
         itask.poll_timer = TaskActionTimer(ctx=ctx, delays=delays)
+        itask.notify_changed()
         # Log timeout and polling schedule
         message = f"health: {timeout_key}={timeout_str}"
         # Attempt to group identical consecutive delays as N*DELAY,...
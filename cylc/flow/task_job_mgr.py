@@ -35,7 +35,7 @@ from logging import (
 )
 from shutil import rmtree
 from time import time
-from typing import TYPE_CHECKING, Any, Union, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Union, Optional
 
 from cylc.flow import LOG
 from cylc.flow.job_runner_mgr import JobPollContext
@@ -165,7 +165,7 @@ class TaskJobManager:
         """
         now = time()
         poll_tasks = set()
-        for itask in task_pool.get_tasks():
+        for itask in task_pool.get_tasks_by_status(*TASK_STATUSES_ACTIVE):
             if self.task_events_mgr.check_job_time(itask, now):
                 poll_tasks.add(itask)
                 if itask.poll_timer.delay is not None:
@@ -229,8 +229,8 @@ class TaskJobManager:
 
         Return [list, list]: list of good tasks, list of bad tasks
         """
-        prepared_tasks = []
-        bad_tasks = []
+        prep_tasks = []
+        job_files = []
         for itask in itasks:
             if not itask.state(TASK_STATUS_PREPARING):
                 # bump the submit_num *before* resetting the state so that the
@@ -238,12 +238,38 @@ class TaskJobManager:
                 itask.submit_num += 1
                 itask.state_reset(TASK_STATUS_PREPARING)
                 self.data_store_mgr.delta_task_state(itask)
-            prep_task = self._prep_submit_task_job(
-                workflow, itask, check_syntax=check_syntax)
-            if prep_task:
-                prepared_tasks.append(itask)
-            elif prep_task is False:
+            prep_tasks.append(
+                self._prep_submit_task_job(
+                    workflow, itask, check_syntax=check_syntax,
+                    job_files=job_files,
+                )
+            )
+
+        # Write the job files together
+        bad_job_files = set()
+        for (itask, local_job_file_path, _), exc in zip(
+            job_files,
+            self.job_file_writer.write_many(
+                [(path, job_conf) for _, path, job_conf in job_files],
+                check_syntax=check_syntax,
+            ),
+        ):
+            if exc is None:
+                itask.local_job_file_path = local_job_file_path
+            else:
+                # Could be a bad command template, IOError, etc
+                itask.waiting_on_job_prep = False
+                self._prep_submit_task_job_error(
+                    workflow, itask, '(prepare job file)', exc)
+                bad_job_files.add(itask.identity)
+
+        prepared_tasks = []
+        bad_tasks = []
+        for itask, prep_task in zip(itasks, prep_tasks):
+            if prep_task is False or itask.identity in bad_job_files:
                 bad_tasks.append(itask)
+            elif prep_task:
+                prepared_tasks.append(itask)
         return [prepared_tasks, bad_tasks]
 
     def submit_task_jobs(self, workflow, itasks, curve_auth,
@@ -507,6 +533,9 @@ class TaskJobManager:
             for path in itask.platform[
                     'job submission executable paths'] + SYSPATH:
                 cmd.append(f"--path={path}")
+            if itask.platform['max parallel submits'] > 1:
+                cmd.append(
+                    f"--max-workers={itask.platform['max parallel submits']}")
             cmd.append('--')
             cmd.append(get_remote_workflow_run_job_dir(workflow))
             # Chop itasks into a series of shorter lists if it's very big
@@ -525,6 +554,7 @@ class TaskJobManager:
                 '%s ... # will invoke in batches, sizes=%s',
                 cmd, [len(b) for b in itasks_batches])
 
+            agent_argv = cmd
             if remote_mode:
                 cmd = construct_ssh_cmd(
                     cmd, platform, host
@@ -562,7 +592,10 @@ class TaskJobManager:
                         cmd + job_log_dirs,
                         stdin_files=stdin_files,
                         job_log_dirs=job_log_dirs,
-                        host=host
+                        host=host,
+                        **self._get_job_agent_kwargs(
+                            platform, host, agent_argv + job_log_dirs
+                        ),
                     ),
                     bad_hosts=self.task_remote_mgr.bad_hosts,
                     callback=self._submit_task_jobs_callback,
@@ -936,6 +969,18 @@ class TaskJobManager:
                 cmd.append("--debug")
             cmd.append("--")
             cmd.append(get_remote_workflow_run_job_dir(workflow))
+            agent_argv = cmd[cmd.index(cmd_key):]
+            if (
+                cmd_key == self.JOBS_POLL
+                and platform['job agent']
+                and platform['poll cache max age']
+            ):
+                # (the poll cache is only kept by job agents)
+                agent_argv.insert(
+                    agent_argv.index("--"),
+                    "--poll-cache-max-age="
+                    f"{float(platform['poll cache max age'])}"
+                )
             job_log_dirs = []
             host = 'localhost'
 
@@ -963,6 +1008,11 @@ class TaskJobManager:
                     ).relative_id
                 )
             cmd += job_log_dirs
+            ctx.cmd_kwargs.update(
+                self._get_job_agent_kwargs(
+                    platform, host, agent_argv + job_log_dirs
+                )
+            )
             LOG.debug(f'{cmd_key} for {platform["name"]} on {host}')
             self.proc_pool.put_command(
                 ctx,
@@ -972,6 +1022,28 @@ class TaskJobManager:
                 callback_255=callback_255,
             )
 
+    @staticmethod
+    def _get_job_agent_kwargs(
+        platform: dict, host: str, argv: List[str]
+    ) -> Dict[str, Any]:
+        """Return command context kwargs to run a job command in an agent.
+
+        (If the platform uses job agents.)
+
+        Args:
+            platform: The platform to run the command on.
+            host: The platform host to run the command on.
+            argv: The job command, e.g. ["jobs-poll", ...].
+
+        """
+        if not platform['job agent']:
+            return {}
+        if is_remote_platform(platform):
+            agent_cmd = construct_ssh_cmd(['job-agent'], platform, host)
+        else:
+            agent_cmd = ['cylc', 'job-agent']
+        return {'agent_cmd': agent_cmd, 'agent_argv': argv}
+
     @staticmethod
     def _set_retry_timers(
         itask: 'TaskProxy',
@@ -996,6 +1068,7 @@ class TaskJobManager:
                 itask.try_timers[key].set_delays(delays)
             except KeyError:
                 itask.try_timers[key] = TaskActionTimer(delays=delays)
+        itask.notify_changed()
 
     def _simulation_submit_task_jobs(self, itasks, workflow):
         """Simulation mode task jobs submission."""
@@ -1102,10 +1175,19 @@ class TaskJobManager:
         self,
         workflow: str,
         itask: 'TaskProxy',
-        check_syntax: bool = True
+        check_syntax: bool = True,
+        job_files: Optional[list] = None,
     ):
         """Prepare a task job submission.
 
+        Args:
+            check_syntax:
+                Check the syntax of the job file.
+            job_files:
+                If provided, the job file is not written but
+                (itask, local_job_file_path, job_conf) is appended to this
+                list, for the caller to write.
+
         Returns:
             * itask - preparation complete.
             * None - preparation in progress.
@@ -1233,6 +1315,9 @@ class TaskJobManager:
                 itask.tdef.name,
                 itask.submit_num,
             )
+            if job_files is not None:
+                job_files.append((itask, local_job_file_path, job_conf))
+                return itask
             self.job_file_writer.write(
                 local_job_file_path,
                 job_conf,
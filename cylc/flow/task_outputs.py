@@ -16,8 +16,10 @@
 """Task output message manager and constants."""
 
 import ast
+from functools import lru_cache
 import re
 from typing import (
+    Callable,
     Dict,
     Iterable,
     Iterator,
@@ -26,6 +28,7 @@ from typing import (
     TYPE_CHECKING,
     Tuple,
     Union,
+    cast,
 )
 
 from cylc.flow.exceptions import InvalidCompletionExpression
@@ -33,6 +36,7 @@ from cylc.flow.util import (
     BOOL_SYMBOLS,
     get_variable_names,
     restricted_evaluator,
+    restricted_parse,
 )
 
 if TYPE_CHECKING:
@@ -70,14 +74,19 @@ TASK_OUTPUTS = (
 # DB output message for forced completion
 FORCED_COMPLETION_MSG = "(manually completed)"
 
-# this evaluates task completion expressions
-CompletionEvaluator = restricted_evaluator(
+# the syntax permitted in task completion expressions
+COMPLETION_EXPRESSION_NODES = (
     # expressions
     ast.Expression,
     # variables
     ast.Name, ast.Load,
     # operations
     ast.BoolOp, ast.And, ast.Or, ast.BinOp,
+)
+
+# this evaluates task completion expressions
+CompletionEvaluator = restricted_evaluator(
+    *COMPLETION_EXPRESSION_NODES,
     error_class=InvalidCompletionExpression,
 )
 
@@ -270,6 +279,110 @@ FINAL_OUTPUT_COMPLETION = ' or '.join(
 )
 
 
+class _CompletionBitsTransformer(ast.NodeTransformer):
+    """Replace completion variables with tests on a bitset of outputs."""
+
+    def __init__(self, compvar_to_bit: Dict[str, int]):
+        self.compvar_to_bit = compvar_to_bit
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        bit = self.compvar_to_bit.get(node.id)
+        if bit is None:
+            return node
+        # (__bits & bit) != 0
+        return ast.copy_location(
+            ast.Compare(
+                left=ast.BinOp(
+                    left=ast.Name(id='__bits', ctx=ast.Load()),
+                    op=ast.BitAnd(),
+                    right=ast.Constant(bit),
+                ),
+                ops=[ast.NotEq()],
+                comparators=[ast.Constant(0)],
+            ),
+            node,
+        )
+
+
+@lru_cache(10000)
+def get_completion_checker(
+    expression: str,
+    compvar_bits: Tuple[Tuple[str, int], ...],
+) -> Callable[[int], bool]:
+    """Return a function which evaluates a completion expression.
+
+    The expression is checked and compiled once into a function of the
+    bitset of completed outputs. The result is cached so all instances of a
+    task share the same function.
+
+    Args:
+        expression: The completion expression.
+        compvar_bits: Tuple of (completion variable, bit) pairs.
+
+    Examples:
+        >>> is_complete = get_completion_checker(
+        ...     'x and (y or z)', (('x', 1), ('y', 2), ('z', 4))
+        ... )
+        >>> is_complete(0b001), is_complete(0b101), is_complete(0b110)
+        (False, True, False)
+        >>> get_completion_checker('x and y', (('x', 1),))(1)
+        Traceback (most recent call last):
+        NameError: name 'y' is not defined
+
+    """
+    expr_node = restricted_parse(
+        expression,
+        *COMPLETION_EXPRESSION_NODES,
+        error_class=InvalidCompletionExpression,
+    )
+    func_node = ast.parse('lambda __bits: None', mode='eval')
+    lambda_node = cast('ast.Lambda', func_node.body)
+    lambda_node.body = _CompletionBitsTransformer(
+        dict(compvar_bits)
+    ).visit(expr_node.body)
+    ast.fix_missing_locations(func_node)
+    return eval(  # nosec
+        # acceptable use of eval as only whitelisted operations are
+        # permitted in the expression
+        compile(func_node, '<completion>', 'eval'),
+        # deny access to builtins
+        {'__builtins__': {}},
+    )
+
+
+@lru_cache(10000)
+def get_output_maps(
+    outputs: Tuple[Tuple[str, str], ...]
+) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, int]]:
+    """Return message maps for a collection of task outputs.
+
+    The result is cached so all instances of a task share the same maps,
+    these must not be modified.
+
+    Args:
+        outputs: Tuple of (trigger, message) pairs.
+
+    Returns:
+        (message_to_trigger, message_to_compvar, message_to_bit)
+
+    Examples:
+        >>> maps = get_output_maps((('x', 'x message'), ('y', 'y message')))
+        >>> maps[2]
+        {'x message': 1, 'y message': 2}
+        >>> get_output_maps((('x', 'x message'), ('y', 'y message'))) is maps
+        True
+
+    """
+    message_to_trigger: Dict[str, str] = {}
+    message_to_compvar: Dict[str, str] = {}
+    message_to_bit: Dict[str, int] = {}
+    for trigger, message in outputs:
+        message_to_trigger[message] = trigger
+        message_to_compvar[message] = trigger_to_completion_variable(trigger)
+        message_to_bit.setdefault(message, 1 << len(message_to_bit))
+    return message_to_trigger, message_to_compvar, message_to_bit
+
+
 class TaskOutputs:
     """Represents a collection of outputs for a task.
 
@@ -298,31 +411,46 @@ class TaskOutputs:
     __slots__ = (
         "_message_to_trigger",
         "_message_to_compvar",
+        "_message_to_bit",
         "_completed",
         "_completion_expression",
+        "_completion_checker",
         "_forced",
     )
 
+    # NOTE: The message maps are shared between all instances of a task, the
+    # per-instance state is held in bitsets (see get_output_maps).
     _message_to_trigger: Dict[str, str]  # message: trigger
     _message_to_compvar: Dict[str, str]  # message: completion variable
-    _completed: Dict[str, bool]  # message: is_complete
+    _message_to_bit: Dict[str, int]  # message: bit
+    _completed: int  # bitset of completed messages
     _completion_expression: str
-    _forced: List[str]  # list of messages of force-completed outputs
+    # evaluates the completion expression (see get_completion_checker)
+    _completion_checker: Optional[Callable[[int], bool]]
+    _forced: int  # bitset of force-completed messages
 
     def __init__(self, tdef: 'Union[TaskDef, str]'):
-        self._message_to_trigger = {}
-        self._message_to_compvar = {}
-        self._completed = {}
-        self._forced = []
+        self._completed = 0
+        self._forced = 0
+        self._completion_checker = None
 
         if isinstance(tdef, str):
             # abnormal use e.g. from the "cylc show" command
             self._completion_expression = tdef
+            self._message_to_trigger = {}
+            self._message_to_compvar = {}
+            self._message_to_bit = {}
         else:
             # normal use e.g. from within the scheduler
             self._completion_expression = get_completion_expression(tdef)
-            for trigger, (message, _required) in tdef.outputs.items():
-                self.add(trigger, message)
+            (
+                self._message_to_trigger,
+                self._message_to_compvar,
+                self._message_to_bit,
+            ) = get_output_maps(tuple(
+                (trigger, message)
+                for trigger, (message, _required) in tdef.outputs.items()
+            ))
 
     def add(self, trigger: str, message: str) -> None:
         """Register a new output.
@@ -332,11 +460,20 @@ class TaskOutputs:
         where TaskOutputs are used outside of the scheduler where there is no
         TaskDef object handy so outputs must be listed manually.
         """
-        self._message_to_trigger[message] = trigger
-        self._message_to_compvar[message] = trigger_to_completion_variable(
-            trigger
-        )
-        self._completed[message] = False
+        # copy the maps as they may be shared with other instances
+        self._message_to_trigger = {
+            **self._message_to_trigger, message: trigger
+        }
+        self._message_to_compvar = {
+            **self._message_to_compvar,
+            message: trigger_to_completion_variable(trigger),
+        }
+        bit = self._message_to_bit.get(message)
+        if bit is None:
+            bit = 1 << len(self._message_to_bit)
+            self._message_to_bit = {**self._message_to_bit, message: bit}
+        self._completed &= ~bit
+        self._completion_checker = None
 
     def get_trigger(self, message: str) -> str:
         """Return the trigger associated with this message."""
@@ -383,15 +520,16 @@ class TaskOutputs:
                 If the output does not apply.
 
         """
-        if message not in self._completed:
+        bit = self._message_to_bit.get(message)
+        if bit is None:
             # no matching output
             return None
 
-        if self._completed[message] is False:
+        if not self._completed & bit:
             # output was incomplete
-            self._completed[message] = True
+            self._completed |= bit
             if forced:
-                self._forced.append(message)
+                self._forced |= bit
             return True
 
         # output was already completed
@@ -405,9 +543,10 @@ class TaskOutputs:
             * False if the message is not complete.
             * None if the message does not apply to these outputs.
         """
-        if message in self._completed:
-            return self._completed[message]
-        return None
+        bit = self._message_to_bit.get(message)
+        if bit is None:
+            return None
+        return bool(self._completed & bit)
 
     def get_completed_outputs(self) -> Dict[str, str]:
         """Return a dict {trigger: message} of completed outputs.
@@ -417,10 +556,10 @@ class TaskOutputs:
         """
         return {
             self._message_to_trigger[message]: (
-                FORCED_COMPLETION_MSG if message in self._forced else message
+                FORCED_COMPLETION_MSG if self._forced & bit else message
             )
-            for message, is_completed in self._completed.items()
-            if is_completed
+            for message, bit in self._message_to_bit.items()
+            if self._completed & bit
         }
 
     def __iter__(self) -> Iterator[Tuple[str, str, bool]]:
@@ -437,8 +576,12 @@ class TaskOutputs:
                 True if the output is complete, else False.
 
         """
-        for message, is_complete in self._completed.items():
-            yield self._message_to_trigger[message], message, is_complete
+        for message, bit in self._message_to_bit.items():
+            yield (
+                self._message_to_trigger[message],
+                message,
+                bool(self._completed & bit),
+            )
 
     def is_complete(self) -> bool:
         """Return True if the outputs are complete."""
@@ -447,14 +590,15 @@ class TaskOutputs:
         # (empty string). In this case, we consider the task outputs to be
         # complete when any final output has been generated.
         # See https://github.com/cylc/cylc-flow/pull/5067
-        expr = self._completion_expression or FINAL_OUTPUT_COMPLETION
-        return CompletionEvaluator(
-            expr,
-            **{
-                self._message_to_compvar[message]: completed
-                for message, completed in self._completed.items()
-            },
-        )
+        if self._completion_checker is None:
+            self._completion_checker = get_completion_checker(
+                self._completion_expression or FINAL_OUTPUT_COMPLETION,
+                tuple(
+                    (self._message_to_compvar[message], bit)
+                    for message, bit in self._message_to_bit.items()
+                ),
+            )
+        return self._completion_checker(self._completed)
 
     def get_incomplete_implied(self, message: str) -> List[str]:
         """Return an ordered list of incomplete implied messages.
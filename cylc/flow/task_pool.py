@@ -16,6 +16,7 @@
 
 """Wrangle task proxies to manage the workflow."""
 
+from bisect import bisect_left, bisect_right, insort
 from contextlib import suppress
 from collections import Counter
 import json
@@ -55,6 +56,7 @@ from cylc.flow.task_proxy import TaskProxy
 from cylc.flow.task_state import (
     TASK_STATUSES_ACTIVE,
     TASK_STATUSES_FINAL,
+    TASK_STATUSES_ORDERED,
     TASK_STATUS_WAITING,
     TASK_STATUS_EXPIRED,
     TASK_STATUS_PREPARING,
@@ -135,10 +137,41 @@ class TaskPool:
 
         # Tasks in the active window of the workflow.
         self.active_tasks: Pool = {}
+        # Sorted list of the cycle points in active_tasks.
+        self._active_points: List['PointBase'] = []
+        # Flat index of active tasks by relative ID.
+        self._tasks_by_id: Dict[str, TaskProxy] = {}
+        # Index of active tasks by task name: {name: {id: itask}}
+        self._tasks_by_name: Dict[str, Dict[str, TaskProxy]] = {}
         self._active_tasks_list: List[TaskProxy] = []
         self.active_tasks_changed = False
         self.tasks_removed = False
 
+        # Per-concern work sets, keyed by task ID. These are updated as tasks
+        # enter, leave or change state in the pool so that the main loop
+        # only needs to visit tasks which might require action.
+        self._tasks_by_status: Dict[str, Dict[str, TaskProxy]] = {
+            status: {} for status in TASK_STATUSES_ORDERED
+        }
+        # waiting, unqueued and released from runahead (i.e. tasks awaiting
+        # xtriggers, ext-triggers or prerequisites before they can queue)
+        self._waiting_tasks: Dict[str, TaskProxy] = {}
+        # waiting tasks which have entered or changed in the waiting set since
+        # they were last checked, i.e. which may now be ready to queue
+        self._queue_candidates: Dict[str, TaskProxy] = {}
+        # waiting tasks with unsatisfied (old-style) external triggers
+        self._ext_trigger_tasks: Dict[str, TaskProxy] = {}
+        # waiting tasks with a clock-expiry time
+        self._expiry_candidates: Dict[str, TaskProxy] = {}
+        # tasks released from queue but not yet through job prep
+        self._job_prep_tasks: Dict[str, TaskProxy] = {}
+        # tasks whose state has changed since the last update
+        self._updated_tasks: Dict[str, TaskProxy] = {}
+        # tasks added or changed, and (cycle, name) of tasks removed, since
+        # the task pool was last written to the database
+        self._db_changed_tasks: Dict[str, TaskProxy] = {}
+        self._db_removed_tasks: List[Tuple[str, str]] = []
+
         self.hold_point: Optional['PointBase'] = None
         self.abs_outputs_done: Set[Tuple[str, str, str]] = set()
 
@@ -182,7 +215,13 @@ class TaskPool:
         """Swap old task for new, during reload."""
         if itask.identity in self.active_tasks.get(itask.point, set()):
             self.active_tasks[itask.point][itask.identity] = itask
+            self._tasks_by_id[itask.identity] = itask
+            self._tasks_by_name[itask.tdef.name][itask.identity] = itask
             self.active_tasks_changed = True
+            itask.state_listener = self._track_task
+            self._job_prep_tasks.pop(itask.identity, None)
+            self.xtrigger_mgr.add_task(itask)
+            self._track_task(itask)
 
     def load_from_point(self):
         """Load the task pool for the workflow start point.
@@ -221,9 +260,19 @@ class TaskPool:
     def add_to_pool(self, itask) -> None:
         """Add a task to the pool."""
 
-        self.active_tasks.setdefault(itask.point, {})
+        if itask.point not in self.active_tasks:
+            self.active_tasks[itask.point] = {}
+            insort(self._active_points, itask.point)
         self.active_tasks[itask.point][itask.identity] = itask
+        self._tasks_by_id[itask.identity] = itask
+        self._tasks_by_name.setdefault(itask.tdef.name, {})[
+            itask.identity
+        ] = itask
         self.active_tasks_changed = True
+        itask.state_listener = self._track_task
+        if itask.state.xtriggers:
+            self.xtrigger_mgr.add_task(itask)
+        self._track_task(itask)
         LOG.debug(f"[{itask}] added to active task pool")
 
         self.create_data_store_elements(itask)
@@ -232,6 +281,64 @@ class TaskPool:
             # (Must do this once added to the pool).
             self.set_max_future_offset()
 
+    def _track_task(self, itask: TaskProxy) -> None:
+        """Update the work sets for a task that has entered or changed state.
+
+        This is the task proxy state listener for tasks in the pool.
+        """
+        id_ = itask.identity
+        if self._tasks_by_id.get(id_) is not itask:
+            # not in the pool (e.g. removed or replaced on reload)
+            return
+        for status, itasks in self._tasks_by_status.items():
+            if status == itask.state.status:
+                itasks[id_] = itask
+            else:
+                itasks.pop(id_, None)
+        if itask.state(
+            TASK_STATUS_WAITING, is_queued=False, is_runahead=False
+        ):
+            self._waiting_tasks[id_] = itask
+            self._queue_candidates[id_] = itask
+            if (
+                itask.state.external_triggers
+                and not itask.state.external_triggers_all_satisfied()
+            ):
+                self._ext_trigger_tasks[id_] = itask
+            else:
+                self._ext_trigger_tasks.pop(id_, None)
+            if itask.state.xtriggers:
+                self.xtrigger_mgr.watch_task(itask)
+        else:
+            self._waiting_tasks.pop(id_, None)
+            self._queue_candidates.pop(id_, None)
+            self._ext_trigger_tasks.pop(id_, None)
+            self.xtrigger_mgr.unwatch_task(itask)
+        if itask.state(TASK_STATUS_WAITING) and itask.expire_time is not None:
+            self._expiry_candidates[id_] = itask
+        else:
+            self._expiry_candidates.pop(id_, None)
+        if itask.state.is_updated:
+            self._updated_tasks[id_] = itask
+        self._db_changed_tasks[id_] = itask
+
+    def _untrack_task(self, itask: TaskProxy) -> None:
+        """Remove a task that has left the pool from the work sets."""
+        itask.state_listener = None
+        id_ = itask.identity
+        for itasks in (
+            *self._tasks_by_status.values(),
+            self._waiting_tasks,
+            self._queue_candidates,
+            self._ext_trigger_tasks,
+            self._expiry_candidates,
+            self._job_prep_tasks,
+            self._updated_tasks,
+            self._db_changed_tasks,
+        ):
+            itasks.pop(id_, None)
+        self._db_removed_tasks.append((str(itask.point), itask.tdef.name))
+
     def create_data_store_elements(self, itask):
         """Create the node window elements about given task proxy."""
         # Register pool node reference
@@ -265,9 +372,10 @@ class TaskPool:
         # tasks can cause the task pool to change size during iteration.
         release_me = [
             itask
-            for point, itask_id_map in self.active_tasks.items()
-            for itask in itask_id_map.values()
-            if point <= self.runahead_limit_point
+            for point in self._active_points[
+                :bisect_right(self._active_points, self.runahead_limit_point)
+            ]
+            for itask in self.active_tasks[point].values()
             if itask.state.is_runahead
         ]
 
@@ -332,14 +440,14 @@ class TaskPool:
             )
         else:
             # Find the earliest point with incomplete tasks.
-            for point, itasks in sorted(self.get_tasks_by_point().items()):
+            for point in self._active_points:
                 # All n=0 tasks are incomplete by definition, but Cylc 7
                 # ignores failed ones (it does not ignore submit-failed!).
                 if (
                     cylc.flow.flags.cylc7_back_compat and
                     all(
                         itask.state(TASK_STATUS_FAILED)
-                        for itask in itasks
+                        for itask in self.active_tasks[point].values()
                     )
                 ):
                     continue
@@ -643,14 +751,14 @@ class TaskPool:
             return
         LOG.info("+ %s/%s %s" % (cycle, name, ctx_key))
         if ctx_key == "poll_timer":
-            itask = self._get_task_by_id(id_)
+            itask = self.get_task_by_id(id_)
             if itask is None:
                 LOG.warning("%(id)s: task not found, skip" % {"id": id_})
                 return
             itask.poll_timer = TaskActionTimer(
                 ctx, delays, num, delay, timeout)
         elif ctx_key[0] == "try_timers":
-            itask = self._get_task_by_id(id_)
+            itask = self.get_task_by_id(id_)
             if itask is None:
                 LOG.warning("%(id)s: task not found, skip" % {"id": id_})
                 return
@@ -736,7 +844,7 @@ class TaskPool:
 
         It does not add a spawned task proxy to the pool.
         """
-        ntask = self._get_task_by_id(
+        ntask = self.get_task_by_id(
             Tokens(cycle=str(point), task=tdef.name).relative_id
         )
         is_in_pool = False
@@ -841,10 +949,20 @@ class TaskPool:
         except KeyError:
             pass
         else:
+            del self._tasks_by_id[itask.identity]
+            name_tasks = self._tasks_by_name[itask.tdef.name]
+            del name_tasks[itask.identity]
+            if not name_tasks:
+                del self._tasks_by_name[itask.tdef.name]
             self.tasks_removed = True
             self.active_tasks_changed = True
+            self._untrack_task(itask)
+            self.xtrigger_mgr.remove_task(itask)
             if not self.active_tasks[itask.point]:
                 del self.active_tasks[itask.point]
+                del self._active_points[
+                    bisect_left(self._active_points, itask.point)
+                ]
             self.task_queue_mgr.remove_task(itask)
             if itask.tdef.max_future_prereq_offset is not None:
                 self.set_max_future_offset()
@@ -879,6 +997,64 @@ class TaskPool:
                     self._active_tasks_list.append(itask)
         return self._active_tasks_list
 
+    def get_tasks_by_status(self, *statuses: str) -> List[TaskProxy]:
+        """Return a list of task proxies in the pool with given statuses."""
+        return [
+            itask
+            for status in statuses
+            for itask in self._tasks_by_status[status].values()
+        ]
+
+    def get_waiting_tasks(self) -> List[TaskProxy]:
+        """Return waiting tasks that are not queued or runahead limited.
+
+        These are tasks which may be waiting on xtriggers, ext-triggers or
+        prerequisites before they are ready to queue.
+        """
+        return list(self._waiting_tasks.values())
+
+    def pop_queue_candidates(self) -> List[TaskProxy]:
+        """Return and reset the waiting tasks which may be ready to queue.
+
+        These are waiting tasks which have entered the waiting set, or
+        changed (e.g. had prerequisites or xtriggers satisfied), since this
+        was last called.
+        """
+        itasks = list(self._queue_candidates.values())
+        self._queue_candidates = {}
+        return itasks
+
+    def get_ext_trigger_tasks(self) -> List[TaskProxy]:
+        """Return waiting tasks with unsatisfied external triggers."""
+        return list(self._ext_trigger_tasks.values())
+
+    def get_updated_tasks(self) -> List[TaskProxy]:
+        """Return tasks whose state has changed since the last update."""
+        return list(self._updated_tasks.values())
+
+    def clear_updated_tasks(self, itasks: Iterable[TaskProxy]) -> None:
+        """Reset the updated flag of tasks (from get_updated_tasks)."""
+        for itask in itasks:
+            itask.state.is_updated = False
+            self._updated_tasks.pop(itask.identity, None)
+
+    def pop_db_changes(
+        self
+    ) -> Tuple[List[TaskProxy], List[Tuple[str, str]]]:
+        """Return and reset the tasks changed or removed since last called.
+
+        Returns:
+            (changed, removed):
+                Task proxies added to or changed in the pool, and the
+                (cycle, name) of tasks removed from the pool.
+
+        """
+        changed = list(self._db_changed_tasks.values())
+        removed = self._db_removed_tasks
+        self._db_changed_tasks = {}
+        self._db_removed_tasks = []
+        return changed, removed
+
     def get_tasks_by_point(self) -> 'Dict[PointBase, List[TaskProxy]]':
         """Return a map of task proxies by cycle point."""
         point_itasks = {}
@@ -894,12 +1070,13 @@ class TaskPool:
             return tasks[rel_id]
         return None
 
-    def _get_task_by_id(self, id_: str) -> Optional[TaskProxy]:
+    def get_task_by_id(self, id_: str) -> Optional[TaskProxy]:
         """Return pool task by ID if it exists, or None."""
-        for itask_ids in self.active_tasks.values():
-            with suppress(KeyError):
-                return itask_ids[id_]
-        return None
+        return self._tasks_by_id.get(id_)
+
+    def get_tasks_by_name(self, name: str) -> List[TaskProxy]:
+        """Return all instances of a task in the pool."""
+        return list(self._tasks_by_name.get(name, {}).values())
 
     def queue_task(self, itask: TaskProxy) -> None:
         """Queue a task that is ready to run."""
@@ -925,22 +1102,30 @@ class TaskPool:
         # entered the PREPARING state
         pre_prep_tasks = []
 
-        for itask in self.get_tasks():
-            # populate active_task_counter and pre_prep_tasks together to
-            # avoid iterating the task pool twice
+        for id_, itask in list(self._job_prep_tasks.items()):
             if itask.waiting_on_job_prep:
                 # a task which has entered the submission pipeline
                 # for the purposes of queue limiting this should be treated
                 # the same as an active task
                 active_task_counter.update([itask.tdef.name])
                 pre_prep_tasks.append(itask)
-            elif itask.state(
-                TASK_STATUS_PREPARING,
-                TASK_STATUS_SUBMITTED,
-                TASK_STATUS_RUNNING,
-            ):
+            else:
+                # job prep has completed or failed
+                del self._job_prep_tasks[id_]
+        for itask in self.get_tasks_by_status(
+            TASK_STATUS_PREPARING,
+            TASK_STATUS_SUBMITTED,
+            TASK_STATUS_RUNNING,
+        ):
+            if not itask.waiting_on_job_prep:
                 # an active task
                 active_task_counter.update([itask.tdef.name])
+            elif itask.identity not in self._job_prep_tasks:
+                # a preparing task sent back for job prep (e.g. to submit
+                # to another host after an SSH failure)
+                self._job_prep_tasks[itask.identity] = itask
+                active_task_counter.update([itask.tdef.name])
+                pre_prep_tasks.append(itask)
 
         # release queued tasks
         released = self.task_queue_mgr.release_tasks(active_task_counter)
@@ -949,6 +1134,7 @@ class TaskPool:
             itask.state_reset(is_queued=False)
             self.data_store_mgr.delta_task_queued(itask)
             itask.waiting_on_job_prep = True
+            self._job_prep_tasks[itask.identity] = itask
 
             if cylc.flow.flags.cylc7_back_compat:
                 # Cylc 7 Back Compat: spawn downstream to cause Cylc 7 style
@@ -963,11 +1149,9 @@ class TaskPool:
 
     def get_min_point(self):
         """Return the minimum cycle point currently in the pool."""
-        cycles = list(self.active_tasks)
-        minc = None
-        if cycles:
-            minc = min(cycles)
-        return minc
+        if self._active_points:
+            return self._active_points[0]
+        return None
 
     def set_max_future_offset(self):
         """Calculate the latest required future trigger offset."""
@@ -1385,7 +1569,7 @@ class TaskPool:
                 task=c_name,
             ).relative_id
 
-            c_task = self._get_task_by_id(c_taskid)
+            c_task = self.get_task_by_id(c_taskid)
             in_pool = c_task is not None
 
             if c_task is not None and c_task != itask:
@@ -1403,10 +1587,7 @@ class TaskPool:
             if c_task is not None:
                 # Have child task, update its prerequisites.
                 if is_abs:
-                    tasks, *_ = self.filter_task_proxies(
-                        [f'*/{c_name}'],
-                        warn=False,
-                    )
+                    tasks = self.get_tasks_by_name(c_name)
                     if c_task not in tasks:
                         tasks.append(c_task)
                 else:
@@ -1526,7 +1707,7 @@ class TaskPool:
                     cycle=str(c_point),
                     task=c_name,
                 ).relative_id
-                c_task = self._get_task_by_id(c_taskid)
+                c_task = self.get_task_by_id(c_taskid)
                 if c_task is not None:
                     # already spawned
                     continue
@@ -1990,6 +2171,7 @@ class TaskPool:
         """
         if prereqs == ["all"]:
             itask.state.set_prerequisites_all_satisfied()
+            itask.notify_changed()
         else:
             # Attempt to set the given presrequisites.
             # Log any that aren't valid for the task.
@@ -2212,7 +2394,7 @@ class TaskPool:
         while self.xtrigger_mgr.sequential_spawn_next:
             taskid = self.xtrigger_mgr.sequential_spawn_next.pop()
             self.xtrigger_mgr.sequential_has_spawned_next.add(taskid)
-            itask = self._get_task_by_id(taskid)
+            itask = self.get_task_by_id(taskid)
             # Will spawn out to RH limit or next parentless clock trigger
             # or non-parentless.
             self.spawn_to_rh_limit(
@@ -2223,7 +2405,7 @@ class TaskPool:
 
     def clock_expire_tasks(self):
         """Expire any tasks past their clock-expiry time."""
-        for itask in self.get_tasks():
+        for itask in list(self._expiry_candidates.values()):
             if (
                 # force triggered tasks can not clock-expire
                 # see proposal point 10:
@@ -2246,13 +2428,8 @@ class TaskPool:
 
     def task_succeeded(self, id_):
         """Return True if task with id_ is in the succeeded state."""
-        return any(
-            (
-                itask.identity == id_
-                and itask.state(TASK_STATUS_SUCCEEDED)
-            )
-            for itask in self.get_tasks()
-        )
+        itask = self.get_task_by_id(id_)
+        return itask is not None and itask.state(TASK_STATUS_SUCCEEDED)
 
     def stop_flow(self, flow_num):
         """Stop a given flow from spawning any further.
@@ -2266,6 +2443,7 @@ class TaskPool:
             except KeyError:
                 continue
             else:
+                itask.notify_changed()
                 if (
                     not itask.state(
                         *TASK_STATUSES_ACTIVE, TASK_STATUS_PREPARING)
@@ -2312,11 +2490,23 @@ class TaskPool:
             (matched, future_matched, unmatched)
 
         """
-        matched, unmatched = filter_ids(
-            self.active_tasks,
-            ids,
-            warn=warn,
-        )
+        matched: List[TaskProxy] = []
+        unmatched: List[str] = []
+        other_ids: List[str] = []
+        for id_ in ids:
+            # plain task IDs can be looked up directly
+            itask = self.get_task_by_id(id_)
+            if itask is None:
+                other_ids.append(id_)
+            else:
+                matched.append(itask)
+        if other_ids:
+            other_matched, unmatched = filter_ids(
+                self.active_tasks,
+                other_ids,
+                warn=warn,
+            )
+            matched.extend(other_matched)
         future_matched: 'Set[Tuple[str, PointBase]]' = set()
         if future and unmatched:
             future_matched, unmatched = self.match_future_tasks(
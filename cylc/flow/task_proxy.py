@@ -101,6 +101,10 @@ class TaskProxy:
             This attribute provides a useful link to the latest replacement
             instance while the current object may still be referenced by a job
             manipulation command.
+        .state_listener:
+            Callback invoked with this task proxy whenever its state changes
+            (set by the task pool so it can track tasks needing action and
+            tasks to write to the database). See notify_changed.
         .submit_num:
             Number of times the task has attempted job submission.
         .summary (dict):
@@ -193,6 +197,7 @@ class TaskProxy:
         'submit_num',
         'tdef',
         'state',
+        'state_listener',
         'summary',
         'flow_nums',
         'flow_wait',
@@ -280,6 +285,7 @@ class TaskProxy:
         self.late_time: Optional[float] = None
         self.is_late = is_late
         self.waiting_on_job_prep = False
+        self.state_listener: Optional[Callable[['TaskProxy'], None]] = None
 
         self.state = TaskState(tdef, self.point, status, is_held)
 
@@ -497,6 +503,7 @@ class TaskProxy:
         # unset any retry delay timers
         for timer in self.try_timers.values():
             timer.timeout = None
+        self.notify_changed()
 
     def status_match(self, status: Optional[str]) -> bool:
         """Return whether a string matches the task's status.
@@ -519,6 +526,7 @@ class TaskProxy:
     def merge_flows(self, flow_nums: Set) -> None:
         """Merge another set of flow_nums with mine."""
         self.flow_nums.update(flow_nums)
+        self.notify_changed()
         LOG.info(
             f"[{self}] merged in flow(s) "
             f"{','.join(str(f) for f in flow_nums)}"
@@ -542,10 +550,20 @@ class TaskProxy:
         ):
             if not silent and not self.transient:
                 LOG.info(f"[{before}] => {self.state}")
+            self.notify_changed()
             return True
 
         return False
 
+    def notify_changed(self) -> None:
+        """Notify the state listener (if any) of a change to this task.
+
+        Call this after changing anything the task pool persists (state,
+        prerequisites, flow numbers, timers) other than via state_reset.
+        """
+        if self.state_listener is not None:
+            self.state_listener(self)
+
     def satisfy_me(
         self, task_messages: 'Iterable[Tokens]'
     ) -> 'Set[Tokens]':
@@ -558,6 +576,8 @@ class TaskProxy:
 
         """
         used = self.state.satisfy_me(task_messages)
+        if used:
+            self.notify_changed()
         return set(task_messages) - used
 
     def clock_expire(self) -> bool:
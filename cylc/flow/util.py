@@ -17,7 +17,7 @@
 
 import ast
 from contextlib import suppress
-from functools import partial
+from functools import lru_cache, partial
 import json
 import re
 from textwrap import dedent
@@ -197,6 +197,10 @@ def restricted_evaluator(
     Note:
         If you don't need to parse expressions, use ast.literal_eval instead.
 
+    Note:
+        Expressions are parsed, checked and compiled once, the compiled code
+        is cached and re-used for subsequent evaluations.
+
     Args:
         whitelist:
             Types to permit e.g. `ast.Expression`, see the ast docs for
@@ -270,46 +274,20 @@ def restricted_evaluator(
     # this is the bit which rejects types which are not whitelisted
     visitor = RestrictedNodeVisitor(whitelist)
 
-    def _eval(expr, **variables):
+    @lru_cache(10000)
+    def _compile(expr):
         nonlocal visitor
+        return compile(
+            _restricted_parse(expr, visitor, error_class), '<string>', 'eval'
+        )
 
-        # parse the expression
-        try:
-            expr_node = ast.parse(expr.strip(), mode='eval')
-        except SyntaxError as exc:
-            raise _get_exception(
-                error_class,
-                f'{exc.msg}: {exc.text}',
-                {'expr': expr}
-            ) from None
-
-        # check against whitelisted types
-        try:
-            visitor.visit(expr_node)
-        except _RestrictedEvalError as exc:
-            # non-whitelisted node detected in expression
-            # => raise exception
-            error_node = exc.args[0]
-            raise _get_exception(
-                error_class,
-                (
-                    f'Invalid expression: {expr}'
-                    f'\n"{error_node.__class__.__name__}" not permitted'
-                ),
-                {
-                    'expr': expr,
-                    'expr_node': expr_node,
-                    'error_node': error_node,
-                    'error_type': error_node.__class__.__name__,
-                },
-            ) from None
-
+    def _eval(expr, **variables):
         # run the expresion
         # Note: this may raise runtime errors
         return eval(  # nosec
             # acceptable use of eval as only whitelisted operations are
             # permitted
-            compile(expr_node, '<string>', 'eval'),
+            _compile(expr),
             # deny access to builtins
             {'__builtins__': {}},
             # provide access to explicitly provided variables
@@ -319,6 +297,71 @@ def restricted_evaluator(
     return _eval
 
 
+def restricted_parse(
+    expr: str,
+    *whitelist: type,
+    error_class: Callable = ValueError,
+) -> ast.Expression:
+    """Parse an expression, permitting only whitelisted operations.
+
+    This performs the checks of restricted_evaluator and returns the AST
+    (e.g. for transformation before compiling it).
+
+    Examples:
+        >>> restricted_parse('a or b', ast.Expression, ast.BoolOp, ast.Or,
+        ...                  ast.Name, ast.Load)
+        <ast.Expression object at ...>
+        >>> restricted_parse('a + b', ast.Expression)
+        Traceback (most recent call last):
+        ValueError: Invalid expression: a + b
+        "BinOp" not permitted
+
+    """
+    return _restricted_parse(
+        expr, RestrictedNodeVisitor(whitelist), error_class
+    )
+
+
+def _restricted_parse(
+    expr: str,
+    visitor: 'RestrictedNodeVisitor',
+    error_class: Callable,
+) -> ast.Expression:
+    """Parse an expression and check it with the given node visitor."""
+    # parse the expression
+    try:
+        expr_node = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as exc:
+        raise _get_exception(
+            error_class,
+            f'{exc.msg}: {exc.text}',
+            {'expr': expr}
+        ) from None
+
+    # check against whitelisted types
+    try:
+        visitor.visit(expr_node)
+    except _RestrictedEvalError as exc:
+        # non-whitelisted node detected in expression
+        # => raise exception
+        error_node = exc.args[0]
+        raise _get_exception(
+            error_class,
+            (
+                f'Invalid expression: {expr}'
+                f'\n"{error_node.__class__.__name__}" not permitted'
+            ),
+            {
+                'expr': expr,
+                'expr_node': expr_node,
+                'error_node': error_node,
+                'error_type': error_node.__class__.__name__,
+            },
+        ) from None
+
+    return expr_node
+
+
 class RestrictedNodeVisitor(ast.NodeVisitor):
     """AST node visitor which errors on non-whitelisted syntax.
 
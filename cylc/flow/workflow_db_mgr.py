@@ -23,13 +23,27 @@ This module provides the logic to:
 * Manage existing run database files on restart.
 """
 
+from collections import deque
 import json
 import os
 from shutil import copy, rmtree
 from sqlite3 import OperationalError
 from tempfile import mkstemp
+from threading import Condition, Thread
+from time import time
 from typing import (
-    Any, AnyStr, Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Union
+    Any,
+    AnyStr,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
 )
 
 from packaging.version import parse as parse_version
@@ -55,6 +69,17 @@ Version = Any
 # annotations in cylc.flow.task_state.TaskState
 DbArgDict = Dict[str, Any]
 DbUpdateTuple = Tuple[DbArgDict, DbArgDict]
+# (operation, table_name, *args) e.g. ("insert", "task_pool", {...})
+DbOp = Tuple[Any, ...]
+
+
+class TaskPoolRows(NamedTuple):
+    """The rows recorded for a task proxy in the task pool tables."""
+    pool: DbArgDict
+    prerequisites: List[DbArgDict]
+    timeout: Optional[DbArgDict]
+    # {ctx_key: row}
+    action_timers: Dict[str, DbArgDict]
 
 
 PERM_PRIVATE = 0o600  # -rw-------
@@ -63,6 +88,126 @@ PERM_PRIVATE = 0o600  # -rw-------
 INCOMPAT_MSG = f"Workflow database is incompatible with Cylc {CYLC_VERSION}"
 
 
+def add_db_ops(dao: CylcWorkflowDAO, ops: List[DbOp]) -> None:
+    """Queue database operations on a DAO."""
+    for op, table_name, *args in ops:
+        if op == 'delete':
+            dao.add_delete_item(table_name, *args)
+        elif op == 'insert':
+            dao.add_insert_item(table_name, *args)
+        else:
+            dao.add_update_item(table_name, *args)
+
+
+class PublicDatabaseWriter:
+    """Write to the public database on a background thread.
+
+    The public database does not need to be fully in sync with the private
+    database, so batches of operations are queued by the scheduler and
+    applied to the public database on this thread.
+
+    If the public database falls more than "max_lag" seconds behind, the
+    scheduler waits for it to catch up.
+    """
+
+    def __init__(self, dao: CylcWorkflowDAO, max_lag: float) -> None:
+        self.dao = dao
+        self.max_lag = max_lag
+        # [(time queued, ops), ...]
+        self._batches: Deque[Tuple[float, List[DbOp]]] = deque()
+        # time the oldest batch being written was queued
+        self._writing: Optional[float] = None
+        self._cond = Condition()
+        self._stopping = False
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._stopping = False
+        self._thread = Thread(
+            target=self._run, name='public-db-writer', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, discard: bool = False) -> None:
+        """Stop the writer thread.
+
+        Args:
+            discard: Discard any pending operations rather than writing them
+                (e.g. if the public database is about to be replaced).
+
+        """
+        with self._cond:
+            if discard:
+                self._batches.clear()
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def put(self, ops: List[DbOp]) -> None:
+        """Queue a batch of operations for the public database.
+
+        Wait for the writer to catch up if it is lagging too far behind.
+        """
+        with self._cond:
+            self._batches.append((time(), ops))
+            self._cond.notify_all()
+        lag = self.lag
+        if lag > self.max_lag:
+            LOG.warning(
+                f"{self.dao.db_file_name}: public database {lag:.1f}s"
+                " behind, waiting for it to catch up"
+            )
+            self.wait()
+
+    @property
+    def lag(self) -> float:
+        """How far the public database is behind (seconds)."""
+        with self._cond:
+            if self._writing is not None:
+                return time() - self._writing
+            if self._batches:
+                return time() - self._batches[0][0]
+        return 0.0
+
+    def wait(self) -> None:
+        """Wait until all queued operations have been written."""
+        with self._cond:
+            while (
+                (self._batches or self._writing is not None)
+                and self._thread is not None
+                and self._thread.is_alive()
+            ):
+                self._cond.wait(1.0)
+
+    def _run(self) -> None:
+        """Write queued operations until stopped."""
+        try:
+            while True:
+                with self._cond:
+                    while not self._batches and not self._stopping:
+                        self._cond.wait()
+                    if not self._batches:
+                        return
+                    # (batches are written in separate transactions as the
+                    # DAO does not preserve the order of operations on a
+                    # table, e.g. a DELETE following an INSERT)
+                    self._writing, ops = self._batches.popleft()
+                try:
+                    add_db_ops(self.dao, ops)
+                    self.dao.execute_queued_items()
+                except Exception as exc:
+                    LOG.exception(exc)
+                finally:
+                    with self._cond:
+                        self._writing = None
+                        self._cond.notify_all()
+        finally:
+            self.dao.close()
+
+
 class WorkflowDatabaseManager:
     """Manage the workflow runtime private and public databases."""
 
@@ -103,7 +248,16 @@ class WorkflowDatabaseManager:
     TABLE_XTRIGGERS = CylcWorkflowDAO.TABLE_XTRIGGERS
     TABLE_ABS_OUTPUTS = CylcWorkflowDAO.TABLE_ABS_OUTPUTS
 
-    def __init__(self, pri_d=None, pub_d=None):
+    def __init__(
+        self,
+        pri_d=None,
+        pub_d=None,
+        incremental_task_pool=False,
+        task_pool_checkpoint_interval=600.0,
+        persistent_connections=False,
+        pub_writer_thread=False,
+        pub_max_lag=60.0,
+    ):
         self.pri_path = None
         if pri_d:
             self.pri_path = os.path.join(
@@ -114,6 +268,12 @@ class WorkflowDatabaseManager:
                 pub_d, CylcWorkflowDAO.DB_FILE_BASE_NAME)
         self.pri_dao = None
         self.pub_dao = None
+        # Keep the DB connections open between transactions (WAL mode)?
+        self.persistent_connections = persistent_connections
+        # Write the public database on a background thread?
+        self.pub_writer_thread = pub_writer_thread
+        self.pub_max_lag = pub_max_lag
+        self.pub_writer: Optional[PublicDatabaseWriter] = None
         self.n_restart = 0
 
         self.db_deletes_map: Dict[str, List[DbArgDict]] = {
@@ -143,9 +303,33 @@ class WorkflowDatabaseManager:
             self.TABLE_ABS_OUTPUTS: []}
         self.db_updates_map: Dict[str, List[DbUpdateTuple]] = {}
 
+        # Incremental task pool persistence: only write rows for tasks
+        # added, removed or changed since the last call to put_task_pool,
+        # with a periodic full rewrite of the tables for safety.
+        self.incremental_task_pool = incremental_task_pool
+        self.task_pool_checkpoint_interval = task_pool_checkpoint_interval
+        # {(cycle, name): rows last written}
+        self._task_pool_rows: Dict[Tuple[str, str], TaskPoolRows] = {}
+        self._task_pool_checkpoint_time: Optional[float] = None
+        # Keys of the task event timer rows last written (None if unknown).
+        self._event_timer_keys: Optional[List[DbArgDict]] = None
+
     def copy_pri_to_pub(self) -> None:
         """Copy content of primary database file to public database file."""
+        if self.pub_writer is not None:
+            # (pending public database changes are in the private database)
+            self.pub_writer.stop(discard=True)
+            try:
+                self._copy_pri_to_pub()
+            finally:
+                self.pub_writer.start()
+        else:
+            self._copy_pri_to_pub()
+
+    def _copy_pri_to_pub(self) -> None:
         self.pub_dao.close()
+        # Ensure all changes are in the primary database file
+        self.pri_dao.checkpoint()
         # Use temporary file to ensure that we do not end up with a
         # partial file.
         # If an external connection is locking the old public db, it will
@@ -211,13 +395,29 @@ class WorkflowDatabaseManager:
                 # ... however, in case there is a directory at the path for
                 # some bizarre reason:
                 rmtree(self.pri_path, ignore_errors=True)
-        self.pri_dao = self.get_pri_dao()
+        self.pri_dao = CylcWorkflowDAO(
+            self.pri_path,
+            create_tables=True,
+            persistent=self.persistent_connections,
+        )
         os.chmod(self.pri_path, PERM_PRIVATE)
-        self.pub_dao = CylcWorkflowDAO(self.pub_path, is_public=True)
+        self.pub_dao = CylcWorkflowDAO(
+            self.pub_path,
+            is_public=True,
+            persistent=self.persistent_connections,
+        )
         self.copy_pri_to_pub()
+        if self.pub_writer_thread:
+            self.pub_writer = PublicDatabaseWriter(
+                self.pub_dao, self.pub_max_lag
+            )
+            self.pub_writer.start()
 
     def on_workflow_shutdown(self):
         """Close data access objects."""
+        if self.pub_writer:
+            self.pub_writer.stop()
+            self.pub_writer = None
         if self.pri_dao:
             self.pri_dao.close()
             self.pri_dao = None
@@ -225,47 +425,53 @@ class WorkflowDatabaseManager:
             self.pub_dao.close()
             self.pub_dao = None
 
+    def get_pub_lag(self) -> Optional[float]:
+        """Return how far the public database is behind (seconds).
+
+        Returns None unless the public database is written on a background
+        thread (otherwise it is kept in sync).
+        """
+        if self.pub_writer is None:
+            return None
+        return self.pub_writer.lag
+
     def process_queued_ops(self) -> None:
         """Handle queued db operations for each task proxy."""
         if self.pri_dao is None or self.pub_dao is None:
             return
         # Record workflow parameters and tasks in pool
         # Record any broadcast settings to be dumped out
-        if any(self.db_deletes_map.values()):
-            for table_name, db_deletes in sorted(
-                    self.db_deletes_map.items()):
-                while db_deletes:
-                    where_args = db_deletes.pop(0)
-                    self.pri_dao.add_delete_item(table_name, where_args)
-                    self.pub_dao.add_delete_item(table_name, where_args)
-        if any(self.db_inserts_map.values()):
-            for table_name, db_inserts in sorted(
-                    self.db_inserts_map.items()):
-                while db_inserts:
-                    db_insert = db_inserts.pop(0)
-                    self.pri_dao.add_insert_item(table_name, db_insert)
-                    self.pub_dao.add_insert_item(table_name, db_insert)
-        if (hasattr(self, 'db_updates_map') and
-                any(self.db_updates_map.values())):
-            for table_name, db_updates in sorted(
-                    self.db_updates_map.items()):
-                while db_updates:
-                    set_args, where_args = db_updates.pop(0)
-                    self.pri_dao.add_update_item(
-                        table_name, set_args, where_args)
-                    self.pub_dao.add_update_item(
-                        table_name, set_args, where_args)
-
-        # Previously, we used a separate thread for database writes. This has
-        # now been removed. For the private database, there is no real
-        # advantage in using a separate thread as it needs to be always in sync
-        # with what is current. For the public database, which does not need to
-        # be fully in sync, there is some advantage of using a separate
-        # thread/process, if writing to it becomes a bottleneck. At the moment,
-        # there is no evidence that this is a bottleneck, so it is better to
-        # keep the logic simple.
+        ops: List[DbOp] = []
+        for table_name, db_deletes in sorted(self.db_deletes_map.items()):
+            ops.extend(
+                ('delete', table_name, where_args)
+                for where_args in db_deletes
+            )
+            db_deletes.clear()
+        for table_name, db_inserts in sorted(self.db_inserts_map.items()):
+            ops.extend(
+                ('insert', table_name, db_insert)
+                for db_insert in db_inserts
+            )
+            db_inserts.clear()
+        for table_name, db_updates in sorted(self.db_updates_map.items()):
+            ops.extend(
+                ('update', table_name, set_args, where_args)
+                for set_args, where_args in db_updates
+            )
+            db_updates.clear()
+
+        # The private database needs to be always in sync with what is
+        # current. The public database does not need to be fully in sync, so
+        # can optionally be written on a separate thread.
+        add_db_ops(self.pri_dao, ops)
         self.pri_dao.execute_queued_items()
-        self.pub_dao.execute_queued_items()
+        if self.pub_writer is not None:
+            if ops:
+                self.pub_writer.put(ops)
+        else:
+            add_db_ops(self.pub_dao, ops)
+            self.pub_dao.execute_queued_items()
 
     def put_broadcast(self, modified_settings, is_cancel=False):
         """Put or clear broadcasts in runtime database."""
@@ -390,14 +596,31 @@ class WorkflowDatabaseManager:
     def put_task_event_timers(self, task_events_mgr) -> None:
         """Put statements to update the task_action_timers table."""
         if task_events_mgr.event_timers_updated:
-            self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+            if (
+                self.incremental_task_pool
+                and self._event_timer_keys is not None
+            ):
+                # Only replace the event timer rows, this table also holds
+                # the task poll and try timers.
+                self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].extend(
+                    self._event_timer_keys
+                )
+            else:
+                self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+                # The task poll and try timers must be rewritten too.
+                self._task_pool_checkpoint_time = None
+            self._event_timer_keys = []
             id_key: 'EventKey'
             for id_key, timer in task_events_mgr._event_timers.items():
                 key1 = (id_key.handler, id_key.event)
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
+                where_args = {
                     "name": id_key.tokens['task'],
                     "cycle": id_key.tokens['cycle'],
                     "ctx_key": json.dumps((key1, id_key.tokens['job'],)),
+                }
+                self._event_timer_keys.append(where_args)
+                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
+                    **where_args,
                     "ctx": self._namedtuple2json(timer.ctx),
                     "delays": json.dumps(timer.delays),
                     "num": timer.num,
@@ -459,72 +682,42 @@ class WorkflowDatabaseManager:
             (set_args, where_args))
 
     def put_task_pool(self, pool: 'TaskPool') -> None:
-        """Delete task pool table content and recreate from current task pool.
+        """Write the task pool tables from the current task pool.
 
-        Also recreate:
+        Covers:
+        - task pool table
         - prerequisites table
         - timeout timers table
-        - action timers table
+        - action timers table (poll and try timers)
 
         And update:
         - task states table
+
+        By default the tables are deleted and recreated in full. In
+        incremental mode only the rows of tasks which have been added to,
+        removed from or changed in the pool since the previous call are
+        written (as reported by the task pool), except at the periodic
+        checkpoint when the tables are recreated anyway. Task states are
+        updated for the same tasks.
         """
-        self.db_deletes_map[self.TABLE_TASK_POOL].append({})
-        # Comment this out to retain the trigger-time prereq status of past
-        # tasks (but then the prerequisite table will grow indefinitely):
-        self.db_deletes_map[self.TABLE_TASK_PREREQUISITES].append({})
-        # This should already be done by self.put_task_event_timers above:
-        # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
-        self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
-        for itask in pool.get_tasks():
-            for prereq in itask.state.prerequisites:
-                for (p_cycle, p_name, p_output), satisfied_state in (
-                    prereq.items()
-                ):
-                    self.put_insert_task_prerequisites(itask, {
-                        "flow_nums": serialise_set(itask.flow_nums),
-                        "prereq_name": p_name,
-                        "prereq_cycle": p_cycle,
-                        "prereq_output": p_output,
-                        "satisfied": satisfied_state
-                    })
-            self.db_inserts_map[self.TABLE_TASK_POOL].append({
-                "name": itask.tdef.name,
-                "cycle": str(itask.point),
-                "flow_nums": serialise_set(itask.flow_nums),
-                "status": itask.state.status,
-                "is_held": itask.state.is_held
-            })
-            if itask.timeout is not None:
-                self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "timeout": itask.timeout
-                })
-            if itask.poll_timer is not None:
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps("poll_timer"),
-                    "ctx": self._namedtuple2json(itask.poll_timer.ctx),
-                    "delays": json.dumps(itask.poll_timer.delays),
-                    "num": itask.poll_timer.num,
-                    "delay": itask.poll_timer.delay,
-                    "timeout": itask.poll_timer.timeout
-                })
-            for ctx_key_1, timer in itask.try_timers.items():
-                if timer is None:
-                    continue
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps(("try_timers", ctx_key_1)),
-                    "ctx": self._namedtuple2json(timer.ctx),
-                    "delays": json.dumps(timer.delays),
-                    "num": timer.num,
-                    "delay": timer.delay,
-                    "timeout": timer.timeout
-                })
+        changed, removed = pool.pop_db_changes()
+        now = time()
+        if (
+            not self.incremental_task_pool
+            or self._task_pool_checkpoint_time is None
+            or (
+                now - self._task_pool_checkpoint_time
+                >= self.task_pool_checkpoint_interval
+            )
+        ):
+            # (don't rely on the task pool reporting every change)
+            changed = pool.get_tasks()
+            self._put_task_pool_full(changed)
+            self._task_pool_checkpoint_time = now
+        else:
+            self._put_task_pool_changes(changed, removed)
+
+        for itask in changed:
             if itask.state.time_updated:
                 set_args = {
                     "time_updated": itask.state.time_updated,
@@ -544,6 +737,146 @@ class WorkflowDatabaseManager:
                 )
                 itask.state.time_updated = None
 
+    def _put_task_pool_full(self, itasks: Iterable['TaskProxy']) -> None:
+        """Delete task pool table content and recreate from the task pool."""
+        self.db_deletes_map[self.TABLE_TASK_POOL].append({})
+        # Comment this out to retain the trigger-time prereq status of past
+        # tasks (but then the prerequisite table will grow indefinitely):
+        self.db_deletes_map[self.TABLE_TASK_PREREQUISITES].append({})
+        # This should already be done by self.put_task_event_timers above:
+        # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+        self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+        self._task_pool_rows.clear()
+        for itask in itasks:
+            rows = self._get_task_pool_rows(itask)
+            self._put_insert_task_pool_rows(rows)
+            if self.incremental_task_pool:
+                self._task_pool_rows[
+                    (rows.pool["cycle"], rows.pool["name"])
+                ] = rows
+
+    def _put_task_pool_changes(
+        self,
+        changed: Iterable['TaskProxy'],
+        removed: Iterable[Tuple[str, str]],
+    ) -> None:
+        """Write the task pool table rows of changed and removed tasks."""
+        for key in removed:
+            old = self._task_pool_rows.pop(key, None)
+            if old is not None:
+                self._put_delete_task_pool_rows(old)
+        for itask in changed:
+            rows = self._get_task_pool_rows(itask)
+            key = (rows.pool["cycle"], rows.pool["name"])
+            old = self._task_pool_rows.get(key)
+            if old == rows:
+                continue
+            self._task_pool_rows[key] = rows
+            if old is not None:
+                self._put_delete_task_pool_rows(old, rows.action_timers)
+            self._put_insert_task_pool_rows(rows, old)
+
+    def _get_task_pool_rows(self, itask: 'TaskProxy') -> TaskPoolRows:
+        """Return the task pool table rows for a task proxy."""
+        cycle = str(itask.point)
+        name = itask.tdef.name
+        flow_nums = serialise_set(itask.flow_nums)
+        prerequisites = [
+            {
+                "cycle": cycle,
+                "name": name,
+                "flow_nums": flow_nums,
+                "prereq_name": p_name,
+                "prereq_cycle": p_cycle,
+                "prereq_output": p_output,
+                "satisfied": satisfied_state
+            }
+            for prereq in itask.state.prerequisites
+            for (p_cycle, p_name, p_output), satisfied_state in prereq.items()
+        ]
+        timeout = None
+        if itask.timeout is not None:
+            timeout = {
+                "name": name,
+                "cycle": cycle,
+                "timeout": itask.timeout
+            }
+        action_timers: Dict[str, DbArgDict] = {}
+        timers = []
+        if itask.poll_timer is not None:
+            timers.append((json.dumps("poll_timer"), itask.poll_timer))
+        for ctx_key_1, timer in itask.try_timers.items():
+            if timer is not None:
+                timers.append(
+                    (json.dumps(("try_timers", ctx_key_1)), timer)
+                )
+        for ctx_key, timer in timers:
+            action_timers[ctx_key] = {
+                "name": name,
+                "cycle": cycle,
+                "ctx_key": ctx_key,
+                "ctx": self._namedtuple2json(timer.ctx),
+                "delays": json.dumps(timer.delays),
+                "num": timer.num,
+                "delay": timer.delay,
+                "timeout": timer.timeout
+            }
+        return TaskPoolRows(
+            pool={
+                "name": name,
+                "cycle": cycle,
+                "flow_nums": flow_nums,
+                "status": itask.state.status,
+                "is_held": itask.state.is_held
+            },
+            prerequisites=prerequisites,
+            timeout=timeout,
+            action_timers=action_timers,
+        )
+
+    def _put_insert_task_pool_rows(
+        self, rows: TaskPoolRows, old: Optional[TaskPoolRows] = None
+    ) -> None:
+        """Put INSERT statements for a task's task pool table rows.
+
+        If the previously written rows are given, unchanged action timer rows
+        are not rewritten.
+        """
+        self.db_inserts_map[self.TABLE_TASK_POOL].append(rows.pool)
+        self.db_inserts_map[self.TABLE_TASK_PREREQUISITES].extend(
+            rows.prerequisites
+        )
+        if rows.timeout is not None:
+            self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append(
+                rows.timeout
+            )
+        for ctx_key, row in rows.action_timers.items():
+            if old is None or old.action_timers.get(ctx_key) != row:
+                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append(row)
+
+    def _put_delete_task_pool_rows(
+        self,
+        rows: TaskPoolRows,
+        keep_action_timers: Optional[Dict[str, DbArgDict]] = None,
+    ) -> None:
+        """Put DELETE statements for a task's task pool table rows.
+
+        Action timer rows are deleted individually, as this table also holds
+        task event timers. Timers in keep_action_timers are not deleted.
+        """
+        where_args = {"cycle": rows.pool["cycle"], "name": rows.pool["name"]}
+        for table in (
+            self.TABLE_TASK_POOL,
+            self.TABLE_TASK_PREREQUISITES,
+            self.TABLE_TASK_TIMEOUT_TIMERS,
+        ):
+            self.db_deletes_map[table].append(where_args)
+        for ctx_key in rows.action_timers:
+            if keep_action_timers is None or ctx_key not in keep_action_timers:
+                self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append(
+                    {**where_args, "ctx_key": ctx_key}
+                )
+
     def put_tasks_to_hold(
         self, tasks: Set[Tuple[str, 'PointBase']]
     ) -> None:
@@ -14,16 +14,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+from collections import deque
 from contextlib import suppress
 from enum import Enum
-from inspect import signature
+from inspect import iscoroutinefunction, signature
 import json
 import re
 from copy import deepcopy
+from heapq import heappop, heappush
 from time import time
+import traceback
 from typing import (
     Any,
+    Deque,
     Dict,
+    List,
     Optional,
     Set,
     Tuple,
@@ -31,6 +37,7 @@ from typing import (
 )
 
 from cylc.flow import LOG
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.exceptions import WorkflowConfigError, XtriggerConfigError
 import cylc.flow.flags
 from cylc.flow.hostuserutil import get_user
@@ -176,6 +183,8 @@ class XtriggerCollator:
         self.functx_map: 'Dict[str, SubFuncContext]' = {}
         # Clock labels, to avoid repeated string comparisons
         self.wall_clock_labels: Set[str] = set()
+        # Labels of async (coroutine function) xtriggers.
+        self.async_labels: Set[str] = set()
         # Workflow-wide default, used when not specified in xtrigger kwargs.
         self.sequential_xtriggers_default = False
         # Labels whose xtriggers are sequentially checked.
@@ -184,6 +193,7 @@ class XtriggerCollator:
     def update(self, xtriggers: 'XtriggerCollator'):
         self.functx_map.update(xtriggers.functx_map)
         self.wall_clock_labels.update(xtriggers.wall_clock_labels)
+        self.async_labels.update(xtriggers.async_labels)
         self.sequential_xtrigger_labels.update(
             xtriggers.sequential_xtrigger_labels)
 
@@ -206,6 +216,10 @@ class XtriggerCollator:
         ):
             # (the "_wall_clock" function fails "wall_clock" validation)
             self._validate(label, fctx, fdir)
+            if iscoroutinefunction(
+                get_xtrig_func(fctx.mod_name, fctx.func_name, fdir)
+            ):
+                self.async_labels.add(label)
 
         self.functx_map[label] = fctx
 
@@ -445,6 +459,9 @@ class XtriggerManager:
     managed uniquely - i.e. many tasks depending on the same clock trigger
     (with same offset from cycle point) get satisfied by the same call.
 
+    Xtrigger functions defined with "async def" are awaited concurrently on
+    the scheduler's event loop instead of being run in the process pool.
+
     Parentless tasks with xtrigger(s) are, by default, spawned out to the
     runahead limit. This results in non-sequential, and potentially
     unnecessary, checking out to this limit (and may introduce clutter to
@@ -494,7 +511,28 @@ class XtriggerManager:
         # Satisfied triggers and their function results, by signature.
         self.sat_xtrig: dict = {}
         # Signatures of active functions (waiting on callback).
-        self.active: list = []
+        self.active: Set[str] = set()
+        # Pool tasks by xtrigger signature: {sig: {task id: itask}}
+        self.sig_tasks: 'Dict[str, Dict[str, TaskProxy]]' = {}
+        # xtrigger signatures of pool tasks: {task id: {label: sig}}
+        self.task_sigs: Dict[str, Dict[str, str]] = {}
+        # Waiting tasks (unqueued and outside the runahead limit) by
+        # unsatisfied xtrigger signature: {sig: {task id: (itask, label)}}
+        self.sig_waiting: 'Dict[str, Dict[str, Tuple[TaskProxy, str]]]' = {}
+        # The signatures each waiting task is in sig_waiting under.
+        self.task_waiting: Dict[str, Set[str]] = {}
+        # When to next check signatures with waiting tasks, as a heap of
+        # (time, sig), and the time each signature is due by signature.
+        self.due: List[Tuple[float, str]] = []
+        self.due_time: Dict[str, float] = {}
+        # Signatures that may no longer be needed by any task.
+        self.housekeep_sigs: Set[str] = set()
+        # Running async xtrigger calls, and the limit on them.
+        self.async_tasks: Set[asyncio.Task] = set()
+        # (created on first use, in the scheduler's event loop)
+        self.async_limit: Optional[asyncio.Semaphore] = None
+        # Finished async xtrigger calls, waiting on the callback.
+        self.async_done: Deque['SubFuncContext'] = deque()
 
         # Gather parentless tasks whose xtrigger(s) have been satisfied
         # (these will be used to spawn the next occurrence).
@@ -549,33 +587,92 @@ class XtriggerManager:
             LOG.info("LOADING satisfied xtriggers")
         sig, results = row
         self.sat_xtrig[sig] = json.loads(results)
+        self.housekeep_sigs.add(sig)
+        self.do_housekeeping = True
 
-    def _get_xtrigs(self, itask: 'TaskProxy', unsat_only: bool = False,
-                    sigs_only: bool = False):
-        """(Internal helper method.)
+    def add_task(self, itask: 'TaskProxy') -> None:
+        """Index the xtrigger signatures of a pool task.
 
-        Args:
-            itask (TaskProxy): TaskProxy
-            unsat_only (bool): whether to retrieve only unsatisfied xtriggers
-                or not
-            sigs_only (bool): whether to append only the function signature
-                or not
-        Returns:
-            List[Union[str, Tuple[str, str, SubFuncContext, bool]]]: a list
-                with either signature (if sigs_only True) or with tuples of
-                label, signature, function context, and flag for satisfied.
+        Call this again if the task's xtriggers change (e.g. retry timers).
         """
-        res = []
-        for label, satisfied in itask.state.xtriggers.items():
-            if unsat_only and satisfied:
+        id_ = itask.identity
+        old_sigs = self.task_sigs.pop(id_, {})
+        new_sigs = {
+            label: self.get_xtrig_ctx(itask, label).get_signature()
+            for label in itask.state.xtriggers
+            if label in self.xtriggers.functx_map
+        }
+        for sig in set(old_sigs.values()) - set(new_sigs.values()):
+            self._unref_sig(sig, id_)
+        for sig in new_sigs.values():
+            self.sig_tasks.setdefault(sig, {})[id_] = itask
+        if new_sigs:
+            self.task_sigs[id_] = new_sigs
+
+    def remove_task(self, itask: 'TaskProxy') -> None:
+        """Forget the xtrigger signatures of a task removed from the pool."""
+        id_ = itask.identity
+        self.unwatch_task(itask)
+        for sig in set(self.task_sigs.pop(id_, {}).values()):
+            self._unref_sig(sig, id_)
+
+    def watch_task(self, itask: 'TaskProxy') -> None:
+        """Check the xtriggers of a waiting task from now on.
+
+        Call this when a task enters (or changes in) the waiting set, i.e.
+        waiting, unqueued and outside of the runahead limit. Its unsatisfied
+        xtriggers are called by call_xtriggers_due.
+        """
+        id_ = itask.identity
+        self.unwatch_task(itask)
+        for label in list(itask.state.xtriggers):
+            if itask.state.xtriggers[label]:
                 continue
-            ctx = self.get_xtrig_ctx(itask, label)
-            sig = ctx.get_signature()
-            if sigs_only:
-                res.append(sig)
-            else:
-                res.append((label, sig, ctx, satisfied))
-        return res
+            sig = self._get_sig(itask, label)
+            if sig in self.sat_xtrig:
+                # Already satisfied, just update the task
+                self._satisfy_task(itask, label, sig)
+                continue
+            self.sig_waiting.setdefault(sig, {})[id_] = (itask, label)
+            self.task_waiting.setdefault(id_, set()).add(sig)
+            if sig not in self.active:
+                self._schedule(sig, self.t_next_call.get(sig, 0))
+
+    def unwatch_task(self, itask: 'TaskProxy') -> None:
+        """Stop checking the xtriggers of a task (see watch_task)."""
+        id_ = itask.identity
+        for sig in self.task_waiting.pop(id_, ()):
+            itasks = self.sig_waiting.get(sig)
+            if itasks is None:
+                continue
+            itasks.pop(id_, None)
+            if not itasks:
+                del self.sig_waiting[sig]
+
+    def _schedule(self, sig: str, when: float) -> None:
+        """Check a signature again at a given time (if not due sooner)."""
+        if self.due_time.get(sig, when + 1) <= when:
+            return
+        self.due_time[sig] = when
+        heappush(self.due, (when, sig))
+
+    def _unref_sig(self, sig: str, id_: str) -> None:
+        """Remove a task from the index of tasks using a signature."""
+        itasks = self.sig_tasks.get(sig)
+        if itasks is None:
+            return
+        itasks.pop(id_, None)
+        if not itasks:
+            del self.sig_tasks[sig]
+            self.housekeep_sigs.add(sig)
+            self.do_housekeeping = True
+
+    def _get_sig(self, itask: 'TaskProxy', label: str) -> str:
+        """Return the signature of a task xtrigger, from the index if there.
+        """
+        with suppress(KeyError):
+            return self.task_sigs[itask.identity][label]
+        return self.get_xtrig_ctx(itask, label).get_signature()
 
     def get_xtrig_ctx(
         self,
@@ -630,6 +727,30 @@ class XtriggerManager:
         ctx.update_command(self.workflow_run_dir)
         return ctx
 
+    def call_xtriggers_due(self) -> None:
+        """Call the xtrigger functions that waiting tasks are due to check.
+
+        Only signatures whose next call is due are visited (see watch_task),
+        one call for all of the tasks waiting on each.
+        """
+        now = time()
+        due = []
+        while self.due and self.due[0][0] <= now:
+            when, sig = heappop(self.due)
+            if self.due_time.get(sig) == when:
+                del self.due_time[sig]
+                due.append(sig)
+        for sig in due:
+            itasks = self.sig_waiting.get(sig)
+            if not itasks:
+                # no longer needed by a waiting task
+                continue
+            if sig in self.sat_xtrig:
+                self._satisfy_tasks(sig)
+                continue
+            itask, label = next(iter(itasks.values()))
+            self._call_xtrigger(itask, label, sig)
+
     def call_xtriggers_async(self, itask: 'TaskProxy'):
         """Call itask's xtrigger functions via the process pool...
 
@@ -638,72 +759,156 @@ class XtriggerManager:
         Args:
             itask: task proxy to check.
         """
-        for label, sig, ctx, _ in self._get_xtrigs(itask, unsat_only=True):
-            if label in self.xtriggers.wall_clock_labels:
-                # Special case: quick synchronous clock check.
-                if sig in self.sat_xtrig:
-                    # Already satisfied, just update the task
-                    itask.state.xtriggers[label] = True
-                    if self.all_task_seq_xtriggers_satisfied(itask):
-                        self.sequential_spawn_next.add(itask.identity)
-                elif _wall_clock(*ctx.func_args, **ctx.func_kwargs):
-                    # Newly satisfied
-                    itask.state.xtriggers[label] = True
-                    self.sat_xtrig[sig] = {}
-                    self.data_store_mgr.delta_task_xtrigger(sig, True)
-                    self.workflow_db_mgr.put_xtriggers({sig: {}})
-                    LOG.info('xtrigger satisfied: %s = %s', label, sig)
-                    if self.all_task_seq_xtriggers_satisfied(itask):
-                        self.sequential_spawn_next.add(itask.identity)
-                    self.do_housekeeping = True
+        for label, satisfied in list(itask.state.xtriggers.items()):
+            if satisfied:
                 continue
-            # General case: potentially slow asynchronous function call.
+            sig = self._get_sig(itask, label)
             if sig in self.sat_xtrig:
                 # Already satisfied, just update the task
-                if not itask.state.xtriggers[label]:
-                    itask.state.xtriggers[label] = True
-                    res = {}
-                    for key, val in self.sat_xtrig[sig].items():
-                        res["%s_%s" % (label, key)] = val
-                    if res:
-                        xtrigger_env = [{'environment': {key: str(val)}} for
-                                        key, val in res.items()]
-                        self.broadcast_mgr.put_broadcast(
-                            [str(itask.point)],
-                            [itask.tdef.name],
-                            xtrigger_env
-                        )
-                    if self.all_task_seq_xtriggers_satisfied(itask):
-                        self.sequential_spawn_next.add(itask.identity)
+                self._satisfy_task(itask, label, sig)
                 continue
+            self._call_xtrigger(itask, label, sig)
 
-            # Call the function to check the unsatisfied xtrigger.
-            if sig in self.active:
-                # Already waiting on this result.
-                continue
-            now = time()
-            if sig in self.t_next_call and now < self.t_next_call[sig]:
-                # Too soon to call this one again.
-                continue
-            self.t_next_call[sig] = now + ctx.intvl
-            # Queue to the process pool, and record as active.
-            self.active.append(sig)
+    def _call_xtrigger(
+        self, itask: 'TaskProxy', label: str, sig: str
+    ) -> None:
+        """Call an unsatisfied xtrigger function for a task...
+
+        ...if previous call not still in-process and retry period is up.
+        """
+        if label in self.xtriggers.wall_clock_labels:
+            # Special case: quick synchronous clock check.
+            ctx = self.get_xtrig_ctx(itask, label)
+            if _wall_clock(*ctx.func_args, **ctx.func_kwargs):
+                # Newly satisfied
+                self.sat_xtrig[sig] = {}
+                self.data_store_mgr.delta_task_xtrigger(sig, True)
+                self.workflow_db_mgr.put_xtriggers({sig: {}})
+                LOG.info('xtrigger satisfied: %s = %s', label, sig)
+                self._satisfy_task(itask, label, sig)
+                self._satisfy_tasks(sig)
+            elif sig in self.sig_waiting:
+                self._schedule(sig, ctx.func_kwargs['trigger_time'])
+            return
+        # General case: potentially slow asynchronous function call.
+
+        # Call the function to check the unsatisfied xtrigger.
+        if sig in self.active:
+            # Already waiting on this result.
+            return
+        now = time()
+        if sig in self.t_next_call and now < self.t_next_call[sig]:
+            # Too soon to call this one again.
+            if sig in self.sig_waiting:
+                self._schedule(sig, self.t_next_call[sig])
+            return
+        ctx = self.get_xtrig_ctx(itask, label)
+        self.t_next_call[sig] = now + ctx.intvl
+        # Queue to the process pool, and record as active.
+        self.active.add(sig)
+        if label in self.xtriggers.async_labels:
+            task = asyncio.create_task(self._call_async(ctx))
+            self.async_tasks.add(task)
+            task.add_done_callback(self.async_tasks.discard)
+        else:
             self.proc_pool.put_command(ctx, callback=self.callback)
 
-    def housekeep(self, itasks):
+    async def _call_async(self, ctx: 'SubFuncContext') -> None:
+        """Await an async xtrigger function on the scheduler event loop.
+
+        The outcome is recorded in the function context as if the function
+        had been run in the process pool, then queued for the callback (see
+        process_async_xtriggers).
+
+        Calls are limited by the async xtrigger limit, and cancelled after
+        the process pool timeout.
+        """
+        timeout = self.proc_pool.proc_pool_timeout
+        if self.async_limit is None:
+            self.async_limit = asyncio.Semaphore(
+                glbl_cfg().get(['scheduler', 'async xtrigger limit'])
+            )
+        done = False
+        try:
+            async with self.async_limit:
+                LOG.debug(ctx.cmd)
+                try:
+                    func = get_xtrig_func(
+                        ctx.mod_name, ctx.func_name, self.workflow_run_dir
+                    )
+                    res = await asyncio.wait_for(
+                        func(*ctx.func_args, **ctx.func_kwargs), timeout
+                    )
+                    ctx.out = json.dumps(res)
+                except asyncio.TimeoutError:
+                    ctx.ret_code = 1
+                    ctx.err = f"cancelled on timeout ({timeout})"
+                except Exception:
+                    ctx.ret_code = 1
+                    ctx.err = traceback.format_exc()
+                else:
+                    ctx.ret_code = 0
+            LOG.debug(ctx.dump())
+            self.async_done.append(ctx)
+            done = True
+        finally:
+            if not done:
+                # cancelled, there will be no callback
+                self.active.discard(ctx.get_signature())
+
+    def process_async_xtriggers(self) -> None:
+        """Call back on finished async xtrigger calls.
+
+        Called from the main loop, like process pool callbacks.
+        """
+        while self.async_done:
+            self.callback(self.async_done.popleft())
+
+    def cancel_async_xtriggers(self) -> None:
+        """Cancel async xtrigger calls in progress (on shutdown)."""
+        for task in self.async_tasks:
+            task.cancel()
+
+    def _satisfy_task(self, itask: 'TaskProxy', label: str, sig: str):
+        """Satisfy a task xtrigger from the stored function results."""
+        itask.state.xtriggers[label] = True
+        res = {}
+        for key, val in self.sat_xtrig[sig].items():
+            res["%s_%s" % (label, key)] = val
+        if res:
+            xtrigger_env = [{'environment': {key: str(val)}} for
+                            key, val in res.items()]
+            self.broadcast_mgr.put_broadcast(
+                [str(itask.point)],
+                [itask.tdef.name],
+                xtrigger_env
+            )
+        if self.all_task_seq_xtriggers_satisfied(itask):
+            self.sequential_spawn_next.add(itask.identity)
+        # (the task may now be ready to queue)
+        itask.notify_changed()
+
+    def _satisfy_tasks(self, sig: str):
+        """Satisfy waiting tasks on a newly satisfied xtrigger.
+
+        Only tasks in sig_waiting (unqueued and outside the runahead limit)
+        are satisfied. Other pool tasks with the xtrigger are satisfied if
+        and when they become waiting tasks (see watch_task).
+        """
+        for id_, (itask, _) in list(self.sig_waiting.get(sig, {}).items()):
+            for label, task_sig in self.task_sigs[id_].items():
+                if task_sig == sig and not itask.state.xtriggers[label]:
+                    self._satisfy_task(itask, label, sig)
+
+    def housekeep(self):
         """Forget satisfied xtriggers no longer needed by any task.
 
         Check self.do_housekeeping before calling this method.
-
-        Args:
-            itasks: list of all task proxies.
         """
-        all_xtrig = []
-        for itask in itasks:
-            all_xtrig += self._get_xtrigs(itask, sigs_only=True)
-        for sig in list(self.sat_xtrig):
-            if sig not in all_xtrig:
-                del self.sat_xtrig[sig]
+        for sig in self.housekeep_sigs:
+            if sig not in self.sig_tasks:
+                self.sat_xtrig.pop(sig, None)
+        self.housekeep_sigs.clear()
         self.do_housekeeping = False
 
     def all_task_seq_xtriggers_satisfied(self, itask: 'TaskProxy') -> bool:
@@ -728,6 +933,8 @@ class XtriggerManager:
             ValueError: if the context given is not active
         """
         sig = ctx.get_signature()
+        if sig not in self.active:
+            raise ValueError(f'xtrigger not active: {sig}')
         self.active.remove(sig)
 
         if ctx.ret_code != 0:
@@ -739,10 +946,13 @@ class XtriggerManager:
         try:
             satisfied, results = json.loads(ctx.out)
         except (ValueError, TypeError):
-            return
-
-        LOG.debug('%s: returned %s', sig, results)
+            satisfied = False
+        else:
+            LOG.debug('%s: returned %s', sig, results)
         if not satisfied:
+            if sig in self.sig_waiting:
+                # check again after the call interval
+                self._schedule(sig, self.t_next_call.get(sig, 0))
             return
 
         # Newly satisfied
@@ -750,4 +960,9 @@ class XtriggerManager:
         self.workflow_db_mgr.put_xtriggers({sig: results})
         LOG.info('xtrigger satisfied: %s = %s', ctx.label, sig)
         self.sat_xtrig[sig] = results
-        self.do_housekeeping = True
+        if sig in self.sig_tasks:
+            self._satisfy_tasks(sig)
+        else:
+            # the tasks that needed it have gone
+            self.housekeep_sigs.add(sig)
+            self.do_housekeeping = True
@@ -20,12 +20,16 @@ import pytest
 
 from cylc.flow.data_messages_pb2 import PbPrerequisite, PbTaskProxy
 from cylc.flow.data_store_mgr import (
+    ALL_DELTAS,
+    DELTAS_MAP,
     EDGES,
     FAMILY_PROXIES,
     JOBS,
     TASK_PROXIES,
     TASKS,
     WORKFLOW,
+    NodeIndex,
+    generate_checksum,
 )
 from cylc.flow.id import Tokens
 from cylc.flow.scheduler import Scheduler
@@ -322,7 +326,7 @@ def test_delta_task_prerequisite(harness):
         for prereq in itask.state.prerequisites:
             prereq._all_satisfied = False
             for key in prereq:
-                prereq._satisfied[key] = False
+                prereq[key] = False
         schd.data_store_mgr.delta_task_prerequisite(itask)
     assert not any(p.satisfied for p in get_pb_prereqs(schd))
 
@@ -358,3 +362,125 @@ async def test_absolute_graph_edges(flow, scheduler, start):
             # +2 for Cylc's runahead
             for cycle in range(1, runahead_cycles + 3)
         }
+
+
+async def test_delta_checksums(flow, scheduler, start):
+    """It should maintain the checksums as elements are added and pruned."""
+    id_ = flow({
+        'scheduling': {
+            'initial cycle point': '1',
+            'cycling mode': 'integer',
+            'runahead limit': 'P1',
+            'graph': {
+                'P1': 'foo => bar',
+            },
+        },
+    })
+    schd = scheduler(id_)
+
+    def assert_checksums():
+        data = schd.data_store_mgr.data[schd.id]
+        for key, checksum in schd.data_store_mgr.checksums.items():
+            s_att = 'id' if key == EDGES else 'stamp'
+            assert checksum == generate_checksum(
+                getattr(e, s_att) for e in data[key].values()
+            ), key
+
+    async with start(schd):
+        await schd.update_data_structure()
+        assert_checksums()
+        for _ in range(3):
+            # complete the active tasks, spawning and pruning tasks
+            schd.pool.set_prereqs_and_outputs(
+                [itask.identity for itask in schd.pool.get_tasks()],
+                [TASK_STATUS_SUCCEEDED],
+                [],
+                ['all'],
+            )
+            await schd.update_data_structure()
+            assert_checksums()
+        # (tasks were pruned)
+        assert '1/foo' not in {
+            Tokens(tp_id).relative_id
+            for tp_id in schd.data_store_mgr.data[schd.id][TASK_PROXIES]
+        }
+        # the published checksums are those of the store
+        published = {
+            key.decode(): DELTAS_MAP[key.decode()].FromString(msg).checksum
+            for key, msg, _ in schd.data_store_mgr.publish_deltas
+            if key.decode() in schd.data_store_mgr.checksums
+        }
+        assert published
+        for key, checksum in published.items():
+            assert checksum == schd.data_store_mgr.checksums[key]
+
+
+async def test_publish_deltas(one_conf, flow, scheduler, start):
+    """The "all" deltas message is made of the serialized deltas."""
+    schd = scheduler(flow(one_conf))
+    async with start(schd):
+        await schd.update_data_structure()
+        published = {
+            key.decode(): msg
+            for key, msg, _ in schd.data_store_mgr.publish_deltas
+        }
+        all_deltas = DELTAS_MAP[ALL_DELTAS].FromString(published[ALL_DELTAS])
+        assert set(published) - {ALL_DELTAS} == {
+            field.name for field, _ in all_deltas.ListFields()
+        }
+        for key, msg in published.items():
+            if key != ALL_DELTAS:
+                assert getattr(all_deltas, key) == (
+                    DELTAS_MAP[key].FromString(msg)
+                )
+
+
+async def test_node_index(flow, scheduler, start):
+    """It should maintain the node index as elements change."""
+    id_ = flow({
+        'scheduling': {
+            'initial cycle point': '1',
+            'cycling mode': 'integer',
+            'runahead limit': 'P1',
+            'graph': {
+                'P1': 'foo => bar',
+            },
+        },
+    })
+    schd = scheduler(id_)
+
+    def assert_index():
+        data = schd.data_store_mgr.data[schd.id]
+        index = schd.data_store_mgr.node_indexes[schd.id]
+        for key, fields in NodeIndex.INDEXED_FIELDS.items():
+            assert set(index.tokens[key]) == set(data[key])
+            assert index.sort(key, data[key]) == list(data[key])
+            for field in fields:
+                expected = {}
+                for element in data[key].values():
+                    expected.setdefault(
+                        getattr(element, field), set()
+                    ).add(element.id)
+                assert index.ids[key][field] == expected, (key, field)
+
+    async with start(schd):
+        await schd.update_data_structure()
+        assert_index()
+        schd.pool.hold_tasks(['1/foo'])
+        await schd.update_data_structure()
+        assert_index()
+        index = schd.data_store_mgr.node_indexes[schd.id]
+        assert {
+            Tokens(tp_id).relative_id
+            for tp_id in index.ids[TASK_PROXIES]['is_held'][True]
+        } == {'1/foo'}
+        for _ in range(3):
+            # complete the active tasks, spawning and pruning tasks
+            schd.pool.set_prereqs_and_outputs(
+                [itask.identity for itask in schd.pool.get_tasks()],
+                [TASK_STATUS_SUCCEEDED],
+                [],
+                ['all'],
+            )
+            await schd.update_data_structure()
+            assert_index()
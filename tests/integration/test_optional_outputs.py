@@ -38,6 +38,7 @@ from cylc.flow.task_outputs import (
     TASK_OUTPUT_FAILED,
     TASK_OUTPUT_FINISHED,
     TASK_OUTPUT_SUCCEEDED,
+    TaskOutputs,
     get_completion_expression,
 )
 from cylc.flow.task_state import (
@@ -58,10 +59,7 @@ def reset_outputs(itask: 'TaskProxy'):
 
     This assumes you haven't completed the task.
     """
-    itask.state.outputs._completed = {
-        message: False
-        for message in itask.state.outputs._completed
-    }
+    itask.state.outputs = TaskOutputs(itask.tdef)
     itask.state_reset(
         TASK_STATUS_WAITING,
         is_queued=False,
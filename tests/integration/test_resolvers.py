@@ -14,16 +14,23 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
 from typing import AsyncGenerator, Callable
 from unittest.mock import Mock
 
 import pytest
 
-from cylc.flow.data_store_mgr import EDGES, TASK_PROXIES
+from cylc.flow.data_store_mgr import (
+    EDGES,
+    FAMILY_PROXIES,
+    TASK_PROXIES,
+    DELTA_UPDATED,
+    create_delta_store,
+)
 from cylc.flow.id import Tokens
 from cylc.flow import CYLC_LOG
-from cylc.flow.network.resolvers import Resolvers
+from cylc.flow.network.resolvers import DeltaQueue, Resolvers, node_filter
 from cylc.flow.scheduler import Scheduler
 from cylc.flow.workflow_status import StopMode
 
@@ -127,6 +134,27 @@ async def test_get_nodes_all(mock_flow, node_args):
     assert len(nodes) == 1
 
 
+@pytest.mark.parametrize('node_type', [TASK_PROXIES, FAMILY_PROXIES])
+@pytest.mark.parametrize('args', [
+    {'states': ['waiting']},
+    {'exstates': ['waiting']},
+    {'is_held': False},
+    {'ids': [Tokens('20000101T0000Z/foo', relative=True)]},
+    {'ids': [Tokens('20000101T0000Z/*', relative=True)]},
+    {'ids': [Tokens('*/prep', relative=True)], 'is_queued': False},
+])
+async def test_get_nodes_all_indexed(mock_flow, node_args, node_type, args):
+    """Nodes looked up in the index are those a scan would find."""
+    node_args.update(args)
+    expected = [
+        node
+        for node in mock_flow.data[node_type].values()
+        if node_filter(node, node_type, node_args, node.state)
+    ]
+    nodes = await mock_flow.resolvers.get_nodes_all(node_type, node_args)
+    assert nodes == expected
+
+
 async def test_get_nodes_by_ids(mock_flow, node_args):
     """Test method returning workflow(s) node messages
     who's ID is a match to any given."""
@@ -306,3 +334,63 @@ async def test_command_validation_failure(
     # caplog)
     assert caplog.records[-1].levelno == logging.ERROR
     assert msg in caplog.records[-1].message
+
+
+async def test_delta_queue():
+    """Deltas put from another thread wake the subscription, deltas of a
+    workflow which have not been taken are merged."""
+    deltas_queue = DeltaQueue()
+    delta_store = create_delta_store(workflow_id='a')
+    assert deltas_queue.get() is None
+    await asyncio.gather(
+        asyncio.get_running_loop().run_in_executor(
+            None, deltas_queue.put, ('a', 'x', delta_store)
+        ),
+        asyncio.wait_for(deltas_queue.wait(), 1),
+    )
+    deltas_queue.put(('b', 'x', create_delta_store(workflow_id='b')))
+    deltas_queue.put(('a', 'shutdown', create_delta_store(workflow_id='a')))
+    assert deltas_queue.has_deltas({'a'})
+    assert deltas_queue.get(exclude={'a'})[0] == 'b'
+    w_id, topic, merged = deltas_queue.get()
+    assert (w_id, topic, merged['id']) == ('a', 'shutdown', 'a')
+    assert deltas_queue.get() is None
+
+
+async def test_subscribe_delta(one, start):
+    """Deltas are yielded as soon as they are put."""
+    async with start(one):
+        resolvers = Resolvers(one.data_store_mgr, schd=one)
+        info = Mock(field_name='deltas', variable_values={}, context={})
+        subscription = resolvers.subscribe_delta(
+            'op', info, {'workflows': [one.id], 'ignore_interval': 0}
+        )
+        pending = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)
+        (sub_id, deltas_queue), = (
+            one.data_store_mgr.delta_queues[one.id].items()
+        )
+        assert not pending.done()
+        delta_store = create_delta_store(workflow_id=one.id)
+        delta_store[DELTA_UPDATED][TASK_PROXIES] = {'x': Mock()}
+        deltas_queue.put((one.id, 'all', delta_store))
+        assert await asyncio.wait_for(pending, 1) is delta_store
+
+        # the next delta waits until the last was processed
+        pending = asyncio.ensure_future(subscription.__anext__())
+        deltas_queue.put(
+            (one.id, 'all', create_delta_store(workflow_id=one.id))
+        )
+        await asyncio.sleep(0)
+        assert not pending.done()
+        await resolvers.flow_delta_processed(info.context, 'op')
+        assert (await asyncio.wait_for(pending, 1))['id'] == one.id
+
+        # cancelling the subscription stops it waiting
+        pending = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)
+        pending.cancel()
+        assert await pending is None
+        await subscription.aclose()
+        assert sub_id not in resolvers.delta_subscriptions
+        assert sub_id not in one.data_store_mgr.delta_queues[one.id]
@@ -22,7 +22,9 @@ import re
 from typing import Any, Callable
 
 from cylc.flow import commands
+from cylc.flow.cycling.integer import IntegerPoint
 from cylc.flow.exceptions import CylcError
+from cylc.flow.network.resolvers import TaskMsg
 from cylc.flow.parsec.exceptions import ParsecError
 from cylc.flow.scheduler import Scheduler, SchedulerStop
 from cylc.flow.task_state import (
@@ -374,3 +376,38 @@ async def test_restart_timeout(
         schd.pool.force_trigger_tasks(['1/one'], {1})
         await asyncio.sleep(0)  # yield control to the main loop
         assert log_filter(log, contains='restart timer stopped')
+
+
+async def test_process_queued_task_messages(
+    one_conf, flow, scheduler, start, log_filter
+):
+    """It should coalesce duplicate messages and dispatch them by task ID."""
+    id_ = flow(one_conf)
+    schd = scheduler(id_)
+    async with start(schd, level=logging.DEBUG) as log:
+        schd.pool.get_task(IntegerPoint('1'), 'one').submit_num = 1
+        for job_id in ('1/one/01', '1/one/01', '1/two/01'):
+            schd.message_queue.put(
+                TaskMsg(job_id, '2000-01-01T00:00:00+00', 'INFO', 'hello')
+            )
+        schd.process_queued_task_messages()
+        assert schd.message_queue.qsize() == 0
+        assert log_filter(
+            log, contains='Processed 1 of 3 task message(s) for 2 task(s)'
+        )
+        assert {
+            key: value
+            for key, value in schd.task_message_stats.items()
+            if key != 'time'
+        } == {
+            'received': 3,
+            'processed': 1,
+            'duplicate': 1,
+            'undeliverable': 1,
+        }
+        assert log_filter(log, contains='(received)hello')
+        assert log_filter(
+            log,
+            contains='Undeliverable task messages received and ignored:'
+            '\n  1/two/01: INFO - "hello"'
+        )
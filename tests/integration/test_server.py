@@ -15,11 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from typing import Callable
+from unittest.mock import AsyncMock
 from async_timeout import timeout
 from getpass import getuser
 
 import pytest
 
+from cylc.flow.data_messages_pb2 import TPDeltas
+from cylc.flow.data_store_mgr import TASK_PROXIES, serialize_deltas
 from cylc.flow.network.server import PB_METHOD_MAP
 from cylc.flow.scheduler import Scheduler
 
@@ -128,3 +131,35 @@ async def test_publish_before_shutdown(
         one.server.publish_queue.put([(b'fake', b'blah')])
         await one.server.stop('i said stop!')
         assert not one.server.publish_queue.qsize()
+
+
+async def test_publish_interval(one: Scheduler, start: Callable):
+    """Test queued deltas are merged and published at most once an interval.
+    """
+    def publish_deltas(*pruned):
+        one.server.publish_queue.put(serialize_deltas({
+            TASK_PROXIES: TPDeltas(pruned=pruned)
+        }))
+
+    async with start(one):
+        one.server.publish_queue.queue.clear()
+        publish = one.server.publisher.publish = AsyncMock()
+        one.server.publish_interval = 60
+        one.server.last_publish_time = 0
+
+        # queued deltas are merged
+        publish_deltas('a')
+        publish_deltas('b')
+        await one.server.publish_queued_items()
+        assert publish.call_count == 1
+        topic, msg, _ = publish.call_args[0][0]
+        assert topic == TASK_PROXIES.encode()
+        assert TPDeltas.FromString(msg).pruned == ['a', 'b']
+
+        # nothing is published within the interval (unless forced)
+        publish_deltas('c')
+        await one.server.publish_queued_items()
+        assert publish.call_count == 1
+        await one.server.publish_queued_items(force=True)
+        assert publish.call_count == 2
+        assert not one.server.publish_queue.qsize()
@@ -14,13 +14,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 from contextlib import suppress
 import logging
+from pathlib import Path
+from time import time
 from typing import Any as Fixture
 
+import pytest
+
 from cylc.flow import CYLC_LOG
+from cylc.flow.platforms import get_platform
 from cylc.flow.scheduler import Scheduler
-from cylc.flow.task_state import TASK_STATUS_RUNNING
+from cylc.flow.task_outputs import TASK_OUTPUT_STARTED, TASK_OUTPUT_SUBMITTED
+from cylc.flow.task_state import TASK_STATUS_RUNNING, TASK_STATUS_SUCCEEDED
 
 
 
@@ -187,3 +194,117 @@ async def test__prep_submit_task_job_impl_handles_execution_time_limit(
             schd.task_job_mgr._prep_submit_task_job(
                 schd.workflow, task_a)
         assert not task_a.summary.get('execution_time_limit', '')
+
+
+async def test_job_agent(
+    flow: Fixture,
+    scheduler: Fixture,
+    start: Fixture,
+    mock_glbl_cfg: Fixture,
+):
+    """It should run job commands in a job agent, if configured."""
+    mock_glbl_cfg(
+        'cylc.flow.platforms.glbl_cfg',
+        '''
+            [platforms]
+                [[agent-platform]]
+                    hosts = localhost
+                    install target = localhost
+                    job agent = True
+        ''',
+    )
+    id_ = flow({
+        'scheduling': {'graph': {'R1': 'foo'}},
+        'runtime': {'foo': {'platform': 'agent-platform'}},
+    })
+    schd: Scheduler = scheduler(id_, run_mode='live')
+    async with start(schd):
+        itask = schd.pool.get_tasks()[0]
+        itask.platform = get_platform('agent-platform')
+        itask.submit_num = 1
+        itask.state_reset(TASK_STATUS_RUNNING)
+        itask.state.outputs.set_message_complete(TASK_OUTPUT_SUBMITTED)
+        itask.state.outputs.set_message_complete(TASK_OUTPUT_STARTED)
+        job_dir = Path(
+            schd.workflow_run_dir, 'log', 'job', '1', 'foo', '01'
+        )
+        job_dir.mkdir(parents=True)
+        (job_dir / 'job.status').write_text(
+            'CYLC_JOB_RUNNER_NAME=background\n'
+            'CYLC_JOB_ID=99999\n'
+            'CYLC_JOB_INIT_TIME=2020-01-01T00:00:00Z\n'
+            'CYLC_JOB_EXIT=SUCCEEDED\n'
+            'CYLC_JOB_EXIT_TIME=2020-01-01T00:01:00Z\n'
+        )
+
+        schd.task_job_mgr.poll_task_jobs(schd.workflow, [itask])
+        schd.proc_pool.process()
+        # the poll is sent to an agent instead of running a command
+        assert not schd.proc_pool.runnings
+        assert len(schd.proc_pool.job_agents) == 1
+        start_time = time()
+        while schd.proc_pool.is_not_done():
+            assert time() - start_time < 60
+            await asyncio.sleep(0.1)
+            schd.proc_pool.process()
+        assert itask.state(TASK_STATUS_SUCCEEDED)
+
+        # the agent is reused for later commands
+        agent = list(schd.proc_pool.job_agents.values())[0]
+        schd.task_job_mgr.poll_task_jobs(schd.workflow, [itask])
+        schd.proc_pool.process()
+        assert list(schd.proc_pool.job_agents.values()) == [agent]
+        assert agent.pending
+
+        # the agent is stopped on shutdown
+        schd.proc_pool.terminate()
+        assert not schd.proc_pool.job_agents
+        assert not agent.is_alive()
+
+
+@pytest.mark.parametrize('job_agent', [True, False])
+async def test_poll_cache_max_age(
+    flow: Fixture,
+    scheduler: Fixture,
+    start: Fixture,
+    mock_glbl_cfg: Fixture,
+    monkeypatch: pytest.MonkeyPatch,
+    job_agent: bool,
+):
+    """It should only use the poll cache for polls sent to a job agent."""
+    mock_glbl_cfg(
+        'cylc.flow.platforms.glbl_cfg',
+        f'''
+            [platforms]
+                [[cache-platform]]
+                    hosts = localhost
+                    install target = localhost
+                    job agent = {job_agent}
+                    poll cache max age = PT30S
+        ''',
+    )
+    id_ = flow({
+        'scheduling': {'graph': {'R1': 'foo'}},
+        'runtime': {'foo': {'platform': 'cache-platform'}},
+    })
+    schd: Scheduler = scheduler(id_, run_mode='live')
+    async with start(schd):
+        ctxs = []
+        monkeypatch.setattr(
+            schd.proc_pool,
+            'put_command',
+            lambda ctx, **_: ctxs.append(ctx),
+        )
+        itask = schd.pool.get_tasks()[0]
+        itask.platform = get_platform('cache-platform')
+        itask.submit_num = 1
+        schd.task_job_mgr._run_job_cmd(
+            schd.task_job_mgr.JOBS_POLL, schd.workflow, [itask], None, None
+        )
+        ctx, = ctxs
+        # (the command is run if the agent is unavailable)
+        assert '--poll-cache-max-age=30.0' not in ctx.cmd
+        assert (
+            '--poll-cache-max-age=30.0'
+            in ctx.cmd_kwargs.get('agent_argv', [])
+        ) == job_agent
@@ -738,7 +738,7 @@ async def test_restart_prereqs(
         ][0]
         assert sorted(
             (
-                p._satisfied
+                dict(p.items())
                 for p in task_z.state.prerequisites
             ),
             key=lambda d: tuple(d.keys())[0],
@@ -850,7 +850,7 @@ async def test_reload_prereqs(
         ][0]
         assert sorted(
             (
-                p._satisfied
+                dict(p.items())
                 for p in task_z.state.prerequisites
             ),
             key=lambda d: tuple(d.keys())[0],
@@ -2152,3 +2152,195 @@ async def test_trigger_unqueued(flow, scheduler, start):
         assert not schd.pool.task_queue_mgr.force_released, (
             "Triggering an unqueued task should not affect the force_released list"
         )
+
+
+def assert_work_sets_consistent(pool) -> None:
+    """Check the task pool work sets agree with a full scan of the pool."""
+    tasks = pool.get_tasks()
+    for status in (
+        TASK_STATUS_WAITING,
+        TASK_STATUS_PREPARING,
+        TASK_STATUS_RUNNING,
+        TASK_STATUS_SUCCEEDED,
+    ):
+        assert {t.identity for t in pool.get_tasks_by_status(status)} == {
+            t.identity for t in tasks if t.state(status)
+        }
+    assert {t.identity for t in pool.get_waiting_tasks()} == {
+        t.identity for t in tasks
+        if t.state(TASK_STATUS_WAITING, is_queued=False, is_runahead=False)
+    }
+    assert {t.identity for t in pool.get_updated_tasks()} == {
+        t.identity for t in tasks if t.state.is_updated
+    }
+
+
+async def test_work_sets(example_flow):
+    """The pool work sets should track task state changes.
+
+    The main loop uses these instead of scanning the whole pool.
+    """
+    pool = example_flow.pool
+    assert_work_sets_consistent(pool)
+
+    # release tasks from runahead (they become candidates for queueing)
+    pool.release_runahead_tasks()
+    assert pool.get_waiting_tasks()
+    assert_work_sets_consistent(pool)
+
+    # queue a task (it is no longer waiting to be queued)
+    itask = pool.get_task(IntegerPoint(1), 'foo')
+    pool.queue_task(itask)
+    assert itask not in pool.get_waiting_tasks()
+    assert_work_sets_consistent(pool)
+
+    # change task state
+    itask.state_reset(TASK_STATUS_RUNNING, is_queued=False)
+    assert pool.get_tasks_by_status(TASK_STATUS_RUNNING) == [itask]
+    assert itask in pool.get_updated_tasks()
+    assert_work_sets_consistent(pool)
+
+    # clear the updated flags
+    pool.clear_updated_tasks(pool.get_updated_tasks())
+    assert not pool.get_updated_tasks()
+    assert_work_sets_consistent(pool)
+
+    # remove the task (state changes should no longer be tracked)
+    pool.remove(itask, 'test')
+    assert not pool.get_tasks_by_status(TASK_STATUS_RUNNING)
+    itask.state_reset(TASK_STATUS_SUCCEEDED)
+    assert itask not in pool.get_tasks_by_status(TASK_STATUS_SUCCEEDED)
+    assert_work_sets_consistent(pool)
+
+
+async def test_queue_candidates(example_flow):
+    """Only waiting tasks which have changed should be candidates to queue."""
+    pool = example_flow.pool
+    pool.release_runahead_tasks()
+    itask = pool.get_task(IntegerPoint(2), 'pub')
+    assert itask in pool.pop_queue_candidates()
+
+    # nothing has changed since the candidates were last popped
+    assert not pool.pop_queue_candidates()
+
+    # a change to a waiting task makes it a candidate again
+    itask.notify_changed()
+    assert pool.pop_queue_candidates() == [itask]
+
+    # queued tasks are not candidates
+    pool.queue_task(itask)
+    itask.notify_changed()
+    assert not pool.pop_queue_candidates()
+
+
+async def test_job_prep_resubmit_after_ssh_failure(example_flow):
+    """Preparing tasks sent back for job prep should be released again.
+
+    A job submission which fails with SSH error 255 sends the task back for
+    job prep (to try another host) after it has left the job prep set.
+    """
+    schd = example_flow
+    pool = schd.pool
+    pool.release_runahead_tasks()
+    itask = pool.get_task(IntegerPoint(1), 'foo')
+    pool.queue_task(itask)
+    assert itask in pool.release_queued_tasks()
+
+    # job prep completes
+    itask.state_reset(TASK_STATUS_PREPARING)
+    itask.waiting_on_job_prep = False
+    assert itask not in pool.release_queued_tasks()
+
+    # job submission fails with SSH error 255
+    schd.task_job_mgr._submit_task_job_callback_255(
+        schd.workflow, itask, None, ''
+    )
+    assert itask in pool.release_queued_tasks()
+    # (and it is still released until job prep completes)
+    assert itask in pool.release_queued_tasks()
+    itask.waiting_on_job_prep = False
+    assert itask not in pool.release_queued_tasks()
+
+
+async def test_task_lookup_by_id(example_flow, monkeypatch):
+    """Plain task IDs should be looked up in the pool ID index."""
+    pool = example_flow.pool
+    itask = pool.get_task(IntegerPoint(1), 'foo')
+    assert pool.get_task_by_id('1/foo') is itask
+    assert pool.get_task_by_id('1/qux') is None
+
+    # plain IDs should not need to be pattern matched against the pool
+    def _filter_ids(_, ids, **__):
+        return [], list(ids)
+
+    monkeypatch.setattr('cylc.flow.task_pool.filter_ids', _filter_ids)
+    assert pool.filter_task_proxies(['1/foo', '2/bar', '1/qux']) == (
+        [itask, pool.get_task(IntegerPoint(2), 'bar')], set(), ['1/qux']
+    )
+
+    # removed tasks should be removed from the index
+    pool.remove(itask, 'test')
+    assert pool.get_task_by_id('1/foo') is None
+
+
+async def test_absolute_trigger_satisfies_all_instances(
+    flow, scheduler, start
+):
+    """Absolute outputs should update all instances of the child task.
+
+    The instances are looked up in the pool task name index.
+    """
+    id_ = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': 1,
+            'runahead limit': 'P2',
+            'graph': {
+                'R1': 'build',
+                'P1': 'build[^] & foo => run',
+            },
+        },
+    })
+    schd: 'Scheduler' = scheduler(id_)
+    async with start(schd):
+        pool = schd.pool
+        for cycle in (1, 2, 3):
+            pool.spawn_on_output(
+                pool.get_task(IntegerPoint(cycle), 'foo'),
+                TASK_OUTPUT_SUCCEEDED
+            )
+        runs = pool.get_tasks_by_name('run')
+        assert sorted(itask.identity for itask in runs) == [
+            '1/run', '2/run', '3/run'
+        ]
+        assert not any(itask.is_waiting_prereqs_done() for itask in runs)
+
+        build = pool.get_task(IntegerPoint(1), 'build')
+        pool.spawn_on_output(build, TASK_OUTPUT_SUCCEEDED)
+        assert all(itask.is_waiting_prereqs_done() for itask in runs)
+
+        # removed tasks should be removed from the index
+        pool.remove(build, 'test')
+        assert pool.get_tasks_by_name('build') == []
+
+
+async def test_active_points(example_flow):
+    """The sorted point index should follow the cycle points in the pool."""
+    pool = example_flow.pool
+    assert pool._active_points == sorted(pool.active_tasks)
+    assert pool.get_min_point() == IntegerPoint(1)
+
+    # removing the last task at a point removes the point
+    for itask in pool.get_tasks():
+        if itask.point == IntegerPoint(1):
+            pool.remove(itask, 'test')
+    assert pool._active_points == sorted(pool.active_tasks)
+    assert pool.get_min_point() == IntegerPoint(2)
+
+    # the runahead base point moves up to the new minimum point
+    assert pool.compute_runahead()
+    assert pool.runahead_limit_point == IntegerPoint(5)
+    pool.release_runahead_tasks()
+    assert pool._active_points == sorted(pool.active_tasks)
+    for itask in pool.get_tasks():
+        assert itask.state.is_runahead is (itask.point > IntegerPoint(5))
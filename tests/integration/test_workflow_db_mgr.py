@@ -19,6 +19,8 @@ import sqlite3
 from typing import TYPE_CHECKING
 
 from cylc.flow import commands
+from cylc.flow.rundb import CylcWorkflowDAO
+from cylc.flow.workflow_db_mgr import PublicDatabaseWriter
 
 if TYPE_CHECKING:
     from cylc.flow.scheduler import Scheduler
@@ -178,3 +180,217 @@ async def test_record_only_non_clock_triggers(
     assert db_select(schd, False, 'xtriggers', 'signature') == [
         ('xrandom(100)',),
         ('xrandom(100, _=Not a real wall clock trigger)',)]
+
+
+async def test_incremental_task_pool(flow, scheduler, start, db_select):
+    """Incremental task pool persistence should match full rewrites."""
+    id_ = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'runahead limit': 'P2',
+            'graph': {'P1': 'a => b => c'},
+        },
+    })
+    schd: 'Scheduler' = scheduler(id_, paused_start=True)
+    tables = (
+        'task_pool',
+        'task_prerequisites',
+        'task_timeout_timers',
+        'task_action_timers',
+    )
+
+    def select_tables():
+        return {
+            table: sorted(db_select(schd, True, table))
+            for table in tables
+        }
+
+    async with start(schd):
+        db_mgr = schd.workflow_db_mgr
+        db_mgr.incremental_task_pool = True
+
+        # the first write is a full rewrite
+        db_mgr.put_task_pool(schd.pool)
+        assert db_mgr.db_deletes_map['task_pool'] == [{}]
+        schd.process_workflow_db_queue()
+
+        # nothing has changed, so nothing should be written
+        db_mgr.put_task_pool(schd.pool)
+        assert not db_mgr.db_deletes_map['task_pool']
+        assert not db_mgr.db_inserts_map['task_pool']
+
+        # change the pool: spawn, satisfy, hold and remove tasks
+        schd.pool.set_prereqs_and_outputs(['1/a'], ['succeeded'], [], ['1'])
+        schd.pool.hold_tasks(['2/a'])
+        schd.pool.remove_tasks(['3/a'])
+        db_mgr.put_task_pool(schd.pool)
+        assert len(db_mgr.db_inserts_map['task_pool']) < len(
+            schd.pool.get_tasks()
+        )
+        incremental = select_tables()
+
+        # a full rewrite (at the next checkpoint) should give the same result
+        db_mgr._task_pool_checkpoint_time = None
+        db_mgr.put_task_pool(schd.pool)
+        assert db_mgr.db_deletes_map['task_pool'] == [{}]
+        assert select_tables() == incremental
+        assert ('1', 'b', '[1]', 'waiting', 0) in incremental['task_pool']
+        assert ('2', 'a', '[1]', 'waiting', 1) in incremental['task_pool']
+        assert not any(
+            row[:2] in {('1', 'a'), ('3', 'a')}
+            for row in incremental['task_pool']
+        )
+
+
+async def test_incremental_task_pool_restart(
+    flow, scheduler, start, db_select
+):
+    """Restarting from incremental or full task pool writes should match."""
+    conf = {
+        'scheduling': {
+            'cycling mode': 'integer',
+            'runahead limit': 'P2',
+            'graph': {'P1': 'a => b => c'},
+        },
+    }
+
+    async def run_and_restart(incremental: bool):
+        id_ = flow(conf)
+        schd: 'Scheduler' = scheduler(id_, paused_start=True)
+        async with start(schd):
+            db_mgr = schd.workflow_db_mgr
+            db_mgr.incremental_task_pool = incremental
+            db_mgr.put_task_pool(schd.pool)
+            schd.process_workflow_db_queue()
+
+            schd.pool.set_prereqs_and_outputs(
+                ['1/a'], ['succeeded'], [], ['1']
+            )
+            schd.pool.hold_tasks(['2/a'])
+            schd.pool.remove_tasks(['3/a'])
+            db_mgr.put_task_pool(schd.pool)
+            schd.process_workflow_db_queue()
+
+            schd.pool.release_held_tasks(['2/a'])
+            schd.pool.set_prereqs_and_outputs(
+                ['2/b'], [], ['2/a:succeeded'], ['1']
+            )
+            schd.pool.set_prereqs_and_outputs(['1/b'], ['started'], [], ['1'])
+            db_mgr.put_task_pool(schd.pool)
+            schd.process_workflow_db_queue()
+        task_states = sorted(db_select(
+            schd,
+            False,
+            'task_states',
+            'name',
+            'cycle',
+            'flow_nums',
+            'submit_num',
+            'status',
+            'is_manual_submit',
+        ))
+
+        # restart and return the resulting task pool
+        schd = scheduler(id_, paused_start=True)
+        async with start(schd):
+            pool = sorted(
+                (
+                    itask.identity,
+                    itask.state.status,
+                    itask.state.is_held,
+                    sorted(
+                        (key, bool(state))
+                        for prereq in itask.state.prerequisites
+                        for key, state in prereq.items()
+                    ),
+                )
+                for itask in schd.pool.get_tasks()
+            )
+        return pool, task_states
+
+    incremental = await run_and_restart(True)
+    assert incremental == await run_and_restart(False)
+    pool, _ = incremental
+    assert [row[0] for row in pool] == ['1/b', '2/a', '2/b', '4/a']
+    assert not any(is_held for _, _, is_held, _ in pool)
+
+
+async def test_persistent_connections(
+    one_conf, flow, scheduler, run, mock_glbl_cfg
+):
+    """It should keep DB connections open and keep the public DB in sync."""
+    mock_glbl_cfg(
+        'cylc.flow.scheduler.glbl_cfg',
+        '''
+            [scheduler]
+                [[database]]
+                    persistent connections = True
+        '''
+    )
+    schd: 'Scheduler' = scheduler(flow(one_conf), paused_start=True)
+    async with run(schd):
+        db_mgr = schd.workflow_db_mgr
+        assert db_mgr.pri_dao.persistent
+        conn = db_mgr.pri_dao.conn
+        assert conn is not None
+        schd.resume_workflow()
+        schd.process_workflow_db_queue()
+        assert db_mgr.pri_dao.conn is conn
+
+        # recover the public DB from the private one
+        db_mgr.copy_pri_to_pub()
+        w_params = dict(db_mgr.pub_dao.select_workflow_params())
+        assert w_params['is_paused'] == '0'
+
+
+async def test_background_public_database_writes(
+    one_conf, flow, scheduler, run, mock_glbl_cfg, db_select
+):
+    """It should write the public database on a background thread."""
+    mock_glbl_cfg(
+        'cylc.flow.scheduler.glbl_cfg',
+        '''
+            [scheduler]
+                [[database]]
+                    background public database writes = True
+        '''
+    )
+    schd: 'Scheduler' = scheduler(flow(one_conf), paused_start=True)
+    async with run(schd):
+        db_mgr = schd.workflow_db_mgr
+        pub_writer = db_mgr.pub_writer
+        assert pub_writer is not None
+
+        schd.resume_workflow()
+        schd.process_workflow_db_queue()
+        pub_writer.wait()
+        assert pub_writer.lag == 0.0
+        w_params = dict(db_mgr.pub_dao.select_workflow_params())
+        assert w_params['is_paused'] == '0'
+
+        # recovery of the public DB should work with the writer running
+        db_mgr.pri_dao.add_insert_item('workflow_params', ['foo', 'bar'])
+        db_mgr.pri_dao.execute_queued_items()
+        db_mgr.copy_pri_to_pub()
+        assert db_mgr.pub_writer is pub_writer
+        w_params = dict(db_mgr.pub_dao.select_workflow_params())
+        assert w_params['foo'] == 'bar'
+
+    # the writer should be stopped on shutdown
+    assert db_mgr.pub_writer is None
+    assert not pub_writer._thread
+
+
+def test_public_database_writer_max_lag(tmp_path, caplog):
+    """It should wait for the public DB to catch up if it lags too far."""
+    dao = CylcWorkflowDAO(tmp_path / 'db', create_tables=True)
+    dao.close()
+    writer = PublicDatabaseWriter(dao, max_lag=-1)
+    writer.start()
+    writer.put([('insert', 'workflow_params', ['a', 'b'])])
+    # max lag exceeded => should have waited for the write
+    assert writer.lag == 0.0
+    assert 'waiting for it to catch up' in caplog.text
+    writer.stop()
+    with CylcWorkflowDAO(tmp_path / 'db') as dao:
+        assert list(dao.select_workflow_params()) == [('a', 'b')]
@@ -249,3 +249,177 @@ async def test_1_seq_clock_trigger_2_tasks(flow, start, scheduler):
             for year in range(1991, 1994)
             for name in ('foo', 'bar')
         )
+
+
+async def test_async_xtrigger(flow, start, scheduler, log_filter):
+    """Async xtrigger functions should be awaited on the event loop."""
+    id_ = flow({
+        'scheduling': {
+            'xtriggers': {
+                'ready': 'ready(name="%(name)s")',
+                'slow': 'slow()',
+                'broken': 'broken()',
+            },
+            'graph': {
+                'R1': '''
+                    @ready => foo
+                    @slow => bar
+                    @broken => baz
+                ''',
+            },
+        }
+    })
+
+    # add custom async xtriggers to the workflow
+    run_dir = Path(get_workflow_run_dir(id_))
+    xtrig_dir = run_dir / 'lib/python'
+    xtrig_dir.mkdir(parents=True)
+    for name, body in (
+        ('ready', 'return True, {"name": name}'),
+        ('slow', 'await asyncio.sleep(60)'),
+        ('broken', 'raise Exception("This Xtrigger is broken")'),
+    ):
+        (xtrig_dir / f'{name}.py').write_text(dedent(f'''
+            import asyncio
+            async def {name}(*args, **kwargs):
+                name = kwargs.get('name')
+                {body}
+        '''))
+
+    schd = scheduler(id_)
+    async with start(schd) as log:
+        xtrigger_mgr = schd.xtrigger_mgr
+        assert xtrigger_mgr.xtriggers.async_labels == {
+            'ready', 'slow', 'broken'
+        }
+        xtrigger_mgr.proc_pool.proc_pool_timeout = 0.5
+        for itask in schd.pool.get_tasks():
+            xtrigger_mgr.call_xtriggers_async(itask)
+        # no subprocesses are used
+        assert not schd.proc_pool.is_not_done()
+        assert len(xtrigger_mgr.active) == 3
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            if not xtrigger_mgr.async_tasks:
+                break
+        else:
+            raise Exception('Async xtriggers did not complete')
+        # the results wait for the main loop to call back
+        assert len(xtrigger_mgr.active) == 3
+        assert not xtrigger_mgr.sat_xtrig
+        xtrigger_mgr.process_async_xtriggers()
+        assert not xtrigger_mgr.active
+        assert not xtrigger_mgr.async_done
+
+        # the results are recorded as for process pool xtriggers
+        assert xtrigger_mgr.sat_xtrig == {'ready(name=foo)': {'name': 'foo'}}
+        assert log_filter(
+            log, contains='xtrigger satisfied: ready = ready(name=foo)'
+        )
+        assert log_filter(log, contains='cancelled on timeout (0.5)')
+        assert log_filter(log, contains='This Xtrigger is broken')
+
+        # calls cancelled (on shutdown) are no longer active
+        xtrigger_mgr.t_next_call.clear()
+        for itask in schd.pool.get_tasks():
+            xtrigger_mgr.call_xtriggers_async(itask)
+        assert len(xtrigger_mgr.active) == 2
+        await asyncio.sleep(0)
+        xtrigger_mgr.cancel_async_xtriggers()
+        await asyncio.gather(*xtrigger_mgr.async_tasks, return_exceptions=True)
+        # (calls which finished before they were cancelled await callback)
+        xtrigger_mgr.process_async_xtriggers()
+        assert not xtrigger_mgr.active
+
+
+async def test_xtrigger_task_index(flow, start, scheduler):
+    """Tasks should be indexed by the signatures of their xtriggers.
+
+    All tasks waiting on an xtrigger are satisfied by its callback, and its
+    result is forgotten once the tasks have gone.
+    """
+    id_ = flow({
+        'scheduling': {
+            'xtriggers': {
+                'x': 'echo(succeed=True, name="%(point)s")',
+            },
+            'graph': {
+                'R1': '@x => foo & bar',
+            },
+        }
+    })
+    schd = scheduler(id_)
+    async with start(schd):
+        xtrigger_mgr = schd.xtrigger_mgr
+        sig = 'echo(name=1, succeed=True)'
+        assert set(xtrigger_mgr.sig_tasks) == {sig}
+        assert set(xtrigger_mgr.sig_tasks[sig]) == {'1/foo', '1/bar'}
+
+        # the xtrigger is called once for both tasks
+        foo = schd.pool.get_task_by_id('1/foo')
+        bar = schd.pool.get_task_by_id('1/bar')
+        xtrigger_mgr.call_xtriggers_async(foo)
+        xtrigger_mgr.call_xtriggers_async(bar)
+        assert xtrigger_mgr.active == {sig}
+
+        # its callback satisfies both tasks
+        ctx = xtrigger_mgr.get_xtrig_ctx(foo, 'x')
+        ctx.ret_code = 0
+        ctx.out = '[true, {"name": "1"}]'
+        xtrigger_mgr.callback(ctx)
+        assert foo.state.xtriggers == {'x': True}
+        assert bar.state.xtriggers == {'x': True}
+
+        # the result is kept until no task needs it
+        schd.pool.remove(foo, 'test')
+        xtrigger_mgr.housekeep()
+        assert sig in xtrigger_mgr.sat_xtrig
+        schd.pool.remove(bar, 'test')
+        assert xtrigger_mgr.do_housekeeping
+        xtrigger_mgr.housekeep()
+        assert not xtrigger_mgr.sat_xtrig
+        assert not xtrigger_mgr.sig_tasks
+        assert not xtrigger_mgr.task_sigs
+
+
+async def test_xtrigger_satisfies_waiting_tasks(flow, start, scheduler):
+    """The callback should only satisfy tasks outside the runahead limit.
+
+    Tasks in the runahead limit are satisfied when they are released.
+    """
+    id_ = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'runahead limit': 'P0',
+            'xtriggers': {
+                'x': 'echo(succeed=True)',
+            },
+            'graph': {
+                'P1': '@x => foo',
+            },
+        }
+    })
+    schd = scheduler(id_)
+    async with start(schd):
+        xtrigger_mgr = schd.xtrigger_mgr
+        pool = schd.pool
+        sig = 'echo(succeed=True)'
+        foo1 = pool.get_task_by_id('1/foo')
+        foo2 = pool.get_task_by_id('2/foo')
+        assert foo2.state.is_runahead
+        assert set(xtrigger_mgr.sig_waiting[sig]) == {'1/foo'}
+
+        xtrigger_mgr.call_xtriggers_due()
+        ctx = xtrigger_mgr.get_xtrig_ctx(foo1, 'x')
+        ctx.ret_code = 0
+        ctx.out = '[true, {}]'
+        xtrigger_mgr.callback(ctx)
+        assert foo1.state.xtriggers == {'x': True}
+        assert foo2.state.xtriggers == {'x': False}
+
+        # the runahead task is satisfied when released
+        pool.remove(foo1, 'test')
+        pool.compute_runahead(force=True)
+        pool.release_runahead_tasks()
+        assert not foo2.state.is_runahead
+        assert foo2.state.xtriggers == {'x': True}
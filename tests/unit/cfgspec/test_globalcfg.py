@@ -149,6 +149,40 @@ def test_source_dir_validation(
     else:
         glblcfg.load()
 
+
+@pytest.mark.parametrize('limit, err_expected', [(1, False), (0, True)])
+def test_process_pool_limits_validation(
+    limit: int, err_expected: bool, mock_global_config: Callable
+):
+    glblcfg: GlobalConfig = mock_global_config(f'''
+    [scheduler]
+        [[process pool]]
+            [[[limits]]]
+                xtrigger = {limit}
+    ''')
+    if err_expected:
+        with pytest.raises(ValidationError) as excinfo:
+            glblcfg.load()
+        assert "must be at least 1" in str(excinfo.value)
+    else:
+        glblcfg.load()
+
+
+@pytest.mark.parametrize('limit, err_expected', [(1, False), (0, True)])
+def test_async_xtrigger_limit_validation(
+    limit: int, err_expected: bool, mock_global_config: Callable
+):
+    glblcfg: GlobalConfig = mock_global_config(f'''
+    [scheduler]
+        async xtrigger limit = {limit}
+    ''')
+    if err_expected:
+        with pytest.raises(ValidationError) as excinfo:
+            glblcfg.load()
+        assert "must be at least 1" in str(excinfo.value)
+    else:
+        glblcfg.load()
+
 def test_platform_ssh_forward_variables(mock_global_config):
 
     glblcfg: GlobalConfig = mock_global_config('''
@@ -16,6 +16,7 @@
 
 import pytest
 
+from cylc.flow.hostuserutil import get_user
 from cylc.flow.job_runner_handlers.slurm import JOB_RUNNER_HANDLER
 
 
@@ -144,6 +145,12 @@ def test_get_poll_many_cmd(job_ids: list, cmd: list):
     assert JOB_RUNNER_HANDLER.get_poll_many_cmd(job_ids) == cmd
 
 
+def test_get_poll_all_cmd():
+    assert JOB_RUNNER_HANDLER.get_poll_all_cmd() == [
+        'squeue', '-h', '-u', get_user()
+    ]
+
+
 @pytest.mark.parametrize(
     'out,job_ids',
     [
@@ -0,0 +1,35 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from unittest.mock import Mock
+
+from cylc.flow.main_loop.log_proc_pool import log_proc_pool
+from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.subprocpool import SubProcPool
+
+
+async def test_log_proc_pool(caplog):
+    """It should log statistics for the classes of command in use."""
+    proc_pool = SubProcPool()
+    proc_pool.put_command(SubProcContext('jobs-submit', ['true']))
+    scheduler = Mock(proc_pool=proc_pool)
+    caplog.set_level(logging.INFO)
+    await log_proc_pool(scheduler, None)
+    assert caplog.messages == [
+        'process pool job submission: queued=1 running=0 launched=0'
+        ' mean wait=0.0s max wait=0.0s'
+    ]
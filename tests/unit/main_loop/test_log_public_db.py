@@ -0,0 +1,37 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from unittest.mock import Mock
+
+from cylc.flow.main_loop.log_public_db import log_public_db
+from cylc.flow.workflow_db_mgr import WorkflowDatabaseManager
+
+
+async def test_log_public_db(caplog):
+    """It should log the lag of a background public database writer."""
+    db_mgr = WorkflowDatabaseManager(pub_max_lag=30.0)
+    scheduler = Mock(workflow_db_mgr=db_mgr)
+    caplog.set_level(logging.INFO)
+
+    # public database written in sync
+    await log_public_db(scheduler, None)
+    assert not caplog.messages
+
+    # public database written on a background thread
+    db_mgr.pub_writer = Mock(lag=2.5)
+    await log_public_db(scheduler, None)
+    assert caplog.messages == ['public database lag: 2.5s (maximum 30.0s)']
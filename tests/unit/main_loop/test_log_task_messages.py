@@ -0,0 +1,34 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from unittest.mock import Mock
+
+from cylc.flow.main_loop.log_task_messages import log_task_messages
+
+
+async def test_log_task_messages(caplog):
+    """It should log the task message statistics."""
+    scheduler = Mock(task_message_stats={
+        'received': 3, 'processed': 1, 'duplicate': 1, 'undeliverable': 1,
+        'time': 0.25,
+    })
+    caplog.set_level(logging.INFO)
+    await log_task_messages(scheduler, None)
+    assert caplog.messages == [
+        'task messages: received=3 processed=1 duplicate=1 undeliverable=1'
+        ' time=0.2s rate=12.0/s'
+    ]
@@ -17,13 +17,23 @@
 from copy import deepcopy
 from time import time
 
+from cylc.flow.data_messages_pb2 import PbTaskProxy, PbWorkflow, TPDeltas
 from cylc.flow.data_store_mgr import (
     task_mean_elapsed_time,
     apply_delta,
+    create_delta_store,
+    merge_delta_stores,
+    merge_deltas,
+    merge_publish_deltas,
+    serialize_deltas,
     WORKFLOW,
     DELTAS_MAP,
     ALL_DELTAS,
-    DATA_TEMPLATE
+    DATA_TEMPLATE,
+    DELTA_ADDED,
+    DELTA_PRUNED,
+    DELTA_UPDATED,
+    TASK_PROXIES,
 )
 
 
@@ -67,3 +77,114 @@ def test_apply_delta():
 
     assert data[WORKFLOW].id == w_id
     assert data[WORKFLOW].pruned is True
+
+
+def test_merge_delta_stores():
+    """Merged delta stores have the effect of both, in turn."""
+    old = create_delta_store(workflow_id='w')
+    old[DELTA_ADDED][TASK_PROXIES] = {
+        'a': PbTaskProxy(id='a', state='waiting'),
+    }
+    old[DELTA_UPDATED][TASK_PROXIES] = {
+        'b': PbTaskProxy(id='b', state='running', is_held=True),
+    }
+    old[DELTA_PRUNED][TASK_PROXIES] = ['c']
+    old[DELTA_UPDATED][WORKFLOW].status = 'running'
+    new = create_delta_store(workflow_id='w')
+    new[DELTA_ADDED][TASK_PROXIES] = {'c': PbTaskProxy(id='c')}
+    new[DELTA_UPDATED][TASK_PROXIES] = {
+        'a': PbTaskProxy(id='a', state='running'),
+        'b': PbTaskProxy(id='b', state='failed'),
+    }
+    new[DELTA_PRUNED][TASK_PROXIES] = ['d']
+    new[DELTA_UPDATED][WORKFLOW].is_held_total = 1
+
+    merged = merge_delta_stores(old, new)
+    assert merged['id'] == 'w'
+    assert merged[DELTA_ADDED][TASK_PROXIES] == {
+        'a': PbTaskProxy(id='a', state='running'),
+        'c': PbTaskProxy(id='c'),
+    }
+    assert merged[DELTA_UPDATED][TASK_PROXIES] == {
+        'b': PbTaskProxy(id='b', state='failed', is_held=True),
+    }
+    assert merged[DELTA_PRUNED][TASK_PROXIES] == ['d']
+    assert merged[DELTA_UPDATED][WORKFLOW].status == 'running'
+    assert merged[DELTA_UPDATED][WORKFLOW].is_held_total == 1
+    # the delta stores are not modified
+    assert old[DELTA_ADDED][TASK_PROXIES]['a'].state == 'waiting'
+    assert old[DELTA_PRUNED][TASK_PROXIES] == ['c']
+    assert not old[DELTA_UPDATED][WORKFLOW].is_held_total
+
+
+def test_merge_deltas():
+    """Merged deltas have the effect of both, in turn."""
+    delta = TPDeltas(
+        time=1,
+        checksum=1,
+        added=[PbTaskProxy(id='a', state='waiting')],
+        updated=[
+            PbTaskProxy(id='b', state='running', is_held=True),
+        ],
+        pruned=['c'],
+    )
+    new_delta = TPDeltas(
+        time=2,
+        checksum=2,
+        added=[PbTaskProxy(id='c')],
+        updated=[
+            PbTaskProxy(id='a', state='running'),
+            PbTaskProxy(id='b', state='failed'),
+        ],
+        pruned=['d'],
+    )
+    merged = merge_deltas(TASK_PROXIES, delta, new_delta)
+    assert merged == TPDeltas(
+        time=2,
+        checksum=2,
+        added=[
+            PbTaskProxy(id='a', state='running'),
+            PbTaskProxy(id='c'),
+        ],
+        updated=[
+            PbTaskProxy(id='b', state='failed', is_held=True),
+        ],
+        pruned=['d'],
+    )
+    # the deltas are not modified
+    assert delta.added[0].state == 'waiting'
+
+    # pruning an element removes its updates
+    merged = merge_deltas(TASK_PROXIES, delta, TPDeltas(pruned=['a', 'b']))
+    assert not merged.added
+    assert not merged.updated
+    assert list(merged.pruned) == ['c', 'a', 'b']
+
+    # a reloaded delta replaces the earlier delta
+    reloaded = TPDeltas(added=[PbTaskProxy(id='x')], reloaded=True)
+    assert merge_deltas(TASK_PROXIES, delta, reloaded) == reloaded
+
+
+def test_merge_publish_deltas():
+    """Sets of deltas for publishing are merged into one."""
+    first = DELTAS_MAP[ALL_DELTAS]()
+    first.workflow.updated.CopyFrom(PbWorkflow(status='running'))
+    first.task_proxies.pruned.append('a')
+    second = DELTAS_MAP[ALL_DELTAS]()
+    second.workflow.updated.CopyFrom(PbWorkflow(is_held_total=1))
+    publish_deltas_list = [
+        serialize_deltas({
+            field.name: delta for field, delta in all_deltas.ListFields()
+        })
+        for all_deltas in (first, second)
+    ]
+    merged = merge_publish_deltas(
+        [*publish_deltas_list, [(b'other', b'x')]]
+    )
+    topics = [item[0] for item in merged]
+    assert topics == [b'task_proxies', b'workflow', b'all', b'other']
+    all_deltas = DELTAS_MAP[ALL_DELTAS].FromString(merged[2][1])
+    assert all_deltas.workflow.updated == PbWorkflow(
+        status='running', is_held_total=1
+    )
+    assert list(all_deltas.task_proxies.pruned) == ['a']
@@ -0,0 +1,218 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from io import StringIO
+import json
+import os
+import sys
+from time import sleep, time
+from types import SimpleNamespace
+
+from cylc.flow.job_agent import run_agent, run_job_command
+from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.subprocpool import SubProcPool
+
+
+def test_run_agent(tmp_path):
+    """It should run job commands and respond with their output."""
+    stdin = StringIO(
+        json.dumps({'id': 1, 'argv': ['rm', '-rf', str(tmp_path)]}) + '\n'
+        + 'not a request\n'
+        + json.dumps({
+            'id': 2,
+            'argv': ['jobs-poll', '--', str(tmp_path), '1/foo/01'],
+        }) + '\n'
+    )
+    stdout = StringIO()
+    run_agent(stdin, stdout)
+    ready, started1, unsupported, started2, poll = (
+        json.loads(line) for line in stdout.getvalue().splitlines()
+    )
+    assert ready == {'ready': True}
+    assert started1 == {'id': 1, 'started': True}
+    assert started2 == {'id': 2, 'started': True}
+    assert unsupported == {
+        'id': 1,
+        'ret_code': 1,
+        'out': '',
+        'err': 'job agent: unsupported command: rm\n',
+    }
+    assert tmp_path.exists()
+    assert poll['id'] == 2
+    assert poll['ret_code'] == 0
+    assert 'No such file or directory' in poll['err']
+
+
+def test_run_job_command_environ(monkeypatch):
+    """It should not leak command changes to the agent's environment."""
+    def main(*_):
+        os.environ['PATH'] += ':/extra/bin'
+        os.environ['CYLC_TEST_AGENT_VAR'] = 'x'
+
+    monkeypatch.setattr(
+        'cylc.flow.job_agent.import_module',
+        lambda _: SimpleNamespace(main=main),
+    )
+    path = os.environ['PATH']
+    for _ in range(2):
+        assert run_job_command(['jobs-submit']) == (0, '', '')
+        assert os.environ['PATH'] == path
+        assert 'CYLC_TEST_AGENT_VAR' not in os.environ
+
+
+def test_job_agent_fallback():
+    """It should run commands as usual if the job agent fails to start."""
+    pool = SubProcPool()
+    done = []
+    ctx = SubProcContext(
+        'jobs-poll',
+        ['echo', 'polled'],
+        agent_cmd=['false'],
+        agent_argv=['jobs-poll', '--', 'log/job'],
+    )
+    pool.put_command(ctx, callback=done.append)
+    pool.process()
+    assert len(pool.job_agents) == 1
+    start = time()
+    while pool.is_not_done():
+        assert time() - start < 10
+        sleep(0.1)
+        pool.process()
+    assert done == [ctx]
+    assert (ctx.ret_code, ctx.out) == (0, 'polled\n')
+    assert not pool.job_agents
+    # don't try to start the agent again straight away
+    assert ('false',) in pool.job_agent_failures
+    ctx = SubProcContext('jobs-poll', ['true'], **ctx.cmd_kwargs)
+    pool.put_command(ctx)
+    pool.process()
+    assert not pool.job_agents
+    pool.terminate()
+
+
+# A stand-in job agent which runs "sleep" requests slowly.
+FAKE_AGENT = """
+import json, sys, time
+print(json.dumps({'ready': True}), flush=True)
+while True:
+    line = sys.stdin.readline()
+    if not line:
+        break
+    req = json.loads(line)
+    print(json.dumps({'id': req['id'], 'started': True}), flush=True)
+    if req['argv'][0] == 'sleep':
+        time.sleep(60)
+    print(json.dumps(
+        {'id': req['id'], 'ret_code': 0, 'out': 'agent\\n', 'err': ''}
+    ), flush=True)
+"""
+
+
+def _agent_ctx(argv, cmd):
+    return SubProcContext(
+        'jobs-poll',
+        cmd,
+        agent_cmd=[sys.executable, '-c', FAKE_AGENT],
+        agent_argv=argv,
+    )
+
+
+def _run_pool(pool, timeout=10):
+    start = time()
+    while pool.is_not_done():
+        assert time() - start < timeout
+        sleep(0.1)
+        pool.process()
+
+
+def test_job_agent_slots(mock_glbl_cfg):
+    """Requests sent to a job agent should count against the pool size."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 1
+        '''
+    )
+    pool = SubProcPool()
+    done = []
+    ctxs = [_agent_ctx(['jobs-poll'], ['true']) for _ in range(2)]
+    for ctx in ctxs:
+        pool.put_command(ctx, callback=done.append)
+    pool.process()
+    agent = list(pool.job_agents.values())[0]
+    assert len(agent.pending) == 1
+    assert len(pool.queuings) == 1
+    _run_pool(pool)
+    assert done == ctxs
+    assert [ctx.out for ctx in ctxs] == ['agent\n', 'agent\n']
+    pool.terminate()
+
+
+def test_job_agent_timeout(mock_glbl_cfg):
+    """Only the request that timed out should fail.
+
+    The timeout should start when the agent starts running the request.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 2
+        '''
+    )
+    pool = SubProcPool()
+    pool.proc_pool_timeout = 1
+    done = []
+    slow = _agent_ctx(['sleep'], ['echo', 'slow'])
+    waiting = _agent_ctx(['jobs-poll'], ['echo', 'polled'])
+    for ctx in (slow, waiting):
+        pool.put_command(ctx, callback=done.append)
+    _run_pool(pool)
+    assert done == [slow, waiting]
+    assert slow.ret_code == -9
+    assert slow.err == 'killed on timeout (1)'
+    # the request waiting behind it was run again, as a command of its own
+    assert (waiting.ret_code, waiting.out) == (0, 'polled\n')
+    pool.terminate()
+
+
+def test_job_agent_max_queued(mock_glbl_cfg):
+    """Commands should not queue on a busy job agent beyond the limit."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 3
+        '''
+    )
+    pool = SubProcPool()
+    pool.JOB_AGENT_MAX_QUEUED = 1
+    pool.proc_pool_timeout = 1
+    done = []
+    slow = _agent_ctx(['sleep'], ['echo', 'slow'])
+    queued = _agent_ctx(['jobs-poll'], ['echo', 'queued'])
+    extra = _agent_ctx(['jobs-poll'], ['echo', 'extra'])
+    for ctx in (slow, queued, extra):
+        pool.put_command(ctx, callback=done.append)
+    pool.process()
+    agent = list(pool.job_agents.values())[0]
+    assert [item[0] for item in agent.pending.values()] == [slow, queued]
+    assert [item[1] for item in pool.runnings] == [extra]
+    _run_pool(pool)
+    assert set(done) == {slow, queued, extra}
+    assert (extra.ret_code, extra.out) == (0, 'extra\n')
+    pool.terminate()
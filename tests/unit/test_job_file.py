@@ -535,3 +535,68 @@ def test_homeless_platform(fixture_get_platform):
         if 'HOME' in job_sh_txt:
             raise Exception('$HOME found in job.sh\n{job_sh_txt}')
 
+
+def test_write_many(fixture_get_platform, monkeypatch, tmp_path):
+    """Test job files are written with one syntax check per user code."""
+    platform = fixture_get_platform()
+
+    def get_job_conf(task_name, script):
+        return {
+            "platform": platform,
+            "task_id": f"1/{task_name}",
+            "workflow_name": "farm_noises",
+            "work_d": None,
+            "uuid_str": "neigh",
+            "environment": {"cow": "moo"},
+            "job_d": f"1/{task_name}/01",
+            "try_num": 1,
+            "flow_nums": {1},
+            "param_var": {},
+            "execution_time_limit": None,
+            "namespace_hierarchy": ["root", task_name],
+            "dependencies": [],
+            "init-script": "",
+            "env-script": "",
+            "err-script": "",
+            "pre-script": "",
+            "script": script,
+            "post-script": "",
+            "exit-script": "",
+        }
+
+    checked = []
+    check_syntax = JobFileWriter._check_syntax
+
+    def _check_syntax(local_job_file_path):
+        checked.append(local_job_file_path)
+        check_syntax(local_job_file_path)
+
+    monkeypatch.setattr(
+        JobFileWriter, '_check_syntax', staticmethod(_check_syntax))
+    jobs = [
+        (str(tmp_path / f'good{i}'), get_job_conf(f'good{i}', 'echo baa'))
+        for i in range(5)
+    ] + [
+        (str(tmp_path / f'bad{i}'), get_job_conf(f'bad{i}', 'if then'))
+        for i in range(2)
+    ]
+    job_file_writer = JobFileWriter()
+    errors = job_file_writer.write_many(jobs)
+    assert errors[:5] == [None] * 5
+    assert all(isinstance(exc, RuntimeError) for exc in errors[5:])
+    for i in range(5):
+        job_script = (tmp_path / f'good{i}').read_text()
+        assert f'# Task: 1/good{i}\n' in job_script
+        assert 'echo baa' in job_script
+        assert os.access(tmp_path / f'good{i}', os.X_OK)
+    assert not (tmp_path / 'bad0').exists()
+    assert len(checked) == 2
+
+    # the same user code is not checked again
+    assert job_file_writer.write_many(jobs[:1]) == [None]
+    job_file_writer.write(*jobs[1])
+    assert len(checked) == 2
+    # but it is checked if it has changed
+    job_file_writer.write(
+        str(tmp_path / 'new'), get_job_conf('new', 'echo neigh'))
+    assert len(checked) == 3
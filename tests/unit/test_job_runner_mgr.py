@@ -0,0 +1,204 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+from time import sleep
+from types import SimpleNamespace
+
+import pytest
+
+from cylc.flow.job_runner_mgr import JobRunnerManager
+
+
+@pytest.fixture
+def job_runner_mgr(monkeypatch):
+    """A JobRunnerManager with empty caches."""
+    monkeypatch.setattr(JobRunnerManager, '_STATUS_FILES', {})
+    monkeypatch.setattr(JobRunnerManager, '_POLL_ALL_RESULTS', {})
+    return JobRunnerManager()
+
+
+def test_jobs_poll_status_files(job_runner_mgr, tmp_path):
+    """It should only parse what is appended to job status files."""
+    job_dir = tmp_path / '1' / 'foo' / '01'
+    job_dir.mkdir(parents=True)
+    status_file = job_dir / 'job.status'
+    status_file.write_text(
+        'CYLC_JOB_RUNNER_NAME=background\n'
+        'CYLC_JOB_ID=1234\n'
+    )
+    ctx = job_runner_mgr._jobs_poll_status_files(tmp_path, '1/foo/01')
+    assert (ctx.job_runner_name, ctx.job_id) == ('background', '1234')
+
+    # a partial line is parsed, but parsed again once complete
+    with open(status_file, 'a') as handle:
+        handle.write('CYLC_JOB_INIT_TIME=2020\nCYLC_MESSAGE=2020|INFO|hel')
+    ctx = job_runner_mgr._jobs_poll_status_files(tmp_path, '1/foo/01')
+    assert ctx.time_run == '2020'
+    assert ctx.messages == ['2020|INFO|hel']
+    with open(status_file, 'a') as handle:
+        handle.write('lo\nCYLC_JOB_EXIT=SUCCEEDED\n')
+    ctx = job_runner_mgr._jobs_poll_status_files(tmp_path, '1/foo/01')
+    assert (ctx.job_id, ctx.time_run) == ('1234', '2020')
+    assert ctx.messages == ['2020|INFO|hello']
+    assert ctx.run_status == 0
+    assert job_runner_mgr._STATUS_FILES[str(status_file)][2] == (
+        status_file.stat().st_size
+    )
+
+    # a rewritten file is parsed from the start
+    status_file.unlink()
+    status_file.write_text('CYLC_JOB_RUNNER_NAME=at\n')
+    ctx = job_runner_mgr._jobs_poll_status_files(tmp_path, '1/foo/01')
+    assert (ctx.job_runner_name, ctx.job_id, ctx.messages) == ('at', None, [])
+
+
+def test_jobs_poll_cache(job_runner_mgr, tmp_path, capsys, monkeypatch):
+    """It should share polls of all jobs, unless job status files change."""
+    count_file = tmp_path / 'count'
+    monkeypatch.setitem(
+        JobRunnerManager._INSTANCES,
+        'fake',
+        SimpleNamespace(
+            POLL_CMD='echo',
+            get_poll_all_cmd=lambda: [
+                'sh', '-c', f'echo >> {count_file}; echo 101; echo 102'
+            ],
+        )
+    )
+    for job_log_dir, job_id in [('1/a/01', '101'), ('1/b/01', '103')]:
+        job_dir = tmp_path / job_log_dir
+        job_dir.mkdir(parents=True)
+        (job_dir / 'job.status').write_text(
+            f'CYLC_JOB_RUNNER_NAME=fake\nCYLC_JOB_ID={job_id}\n'
+        )
+        os.utime(job_dir / 'job.status', (0, 0))
+
+    def poll(max_age=60):
+        job_runner_mgr.jobs_poll(str(tmp_path), ['1/a/01', '1/b/01'], max_age)
+        return {
+            line.split('|')[1]: json.loads(line.split('|', 2)[2])
+            for line in capsys.readouterr().out.splitlines()
+        }
+
+    def n_polls():
+        return len(count_file.read_text().splitlines())
+
+    results = poll()
+    assert results['1/a/01']['job_runner_exit_polled'] == 0
+    assert results['1/b/01']['job_runner_exit_polled'] == 1
+    assert n_polls() == 1
+    # the poll is reused
+    assert poll()['1/a/01']['job_runner_exit_polled'] == 0
+    assert n_polls() == 1
+    # ... unless the job status file has changed since
+    os.utime(tmp_path / '1/a/01/job.status')
+    assert poll()['1/a/01']['job_runner_exit_polled'] == 0
+    assert n_polls() == 2
+    # ... or caching is off
+    assert poll(max_age=0)['1/a/01']['job_runner_exit_polled'] == 0
+    assert n_polls() == 2
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_jobs_submit_by_stdin(
+    job_runner_mgr, tmp_path, capsys, monkeypatch, max_workers
+):
+    """It should submit jobs as their job files are read from STDIN."""
+    job_log_root = tmp_path / 'log' / 'job'
+    read = []
+    submitted = []
+
+    def _job_submit_impl(job_file_path, job_runner_name, submit_opts):
+        # the job file has been written, but STDIN may not be all read
+        with open(job_file_path) as job_file:
+            assert 'echo hello' in job_file.read()
+        submitted.append((job_file_path, len(read)))
+        return 0, 'out\n', '', job_file_path.split(os.sep)[-3]
+
+    job_files = []
+    for name in ('a', 'b', 'c'):
+        job_files.append(
+            f'{JobRunnerManager.LINE_PREFIX_JOB_RUNNER_NAME}background\n'
+            f'{JobRunnerManager.LINE_PREFIX_JOB_LOG_DIR}1/{name}/01\n'
+            'echo hello\n'
+            f'{JobRunnerManager.LINE_PREFIX_EOF}1/{name}/01\n'
+        )
+    lines = ''.join(job_files).splitlines(True)
+
+    def readline():
+        if lines:
+            read.append(lines.pop(0))
+            return read[-1]
+        return ''
+
+    monkeypatch.setattr('sys.stdin', SimpleNamespace(readline=readline))
+    monkeypatch.setattr(
+        job_runner_mgr, '_job_submit_impl', _job_submit_impl)
+    job_runner_mgr.jobs_submit(
+        str(job_log_root),
+        ['1/a/01', '1/b/01', '1/c/01', '1/d/01'],
+        remote_mode=True,
+        max_workers=max_workers,
+    )
+    # jobs were submitted before all job files were read
+    assert len(submitted) == 3
+    assert submitted[0][1] < len(read)
+    assert all(
+        os.access(job_log_root / f'1/{name}/01/job', os.X_OK)
+        for name in ('a', 'b', 'c')
+    )
+    out = capsys.readouterr().out.splitlines()
+    summaries = sorted(
+        line.split('|', 1)[1]
+        for line in out
+        if line.startswith(JobRunnerManager.OUT_PREFIX_SUMMARY)
+    )
+    assert summaries == [
+        '1/a/01|0|a', '1/b/01|0|b', '1/c/01|0|c', '1/d/01|1|'
+    ]
+    assert len(out) == 7  # summary + STDOUT lines, none for missing job
+
+
+def test_jobs_submit_parallel_path(job_runner_mgr, tmp_path, monkeypatch):
+    """Parallel job submissions should not modify the shared environment.
+
+    Each should get the "--path" directories on its own copy of PATH.
+    """
+    job_log_root = tmp_path / 'log' / 'job'
+    job_log_dirs = [f'1/{name}/01' for name in 'abcd']
+    for job_log_dir in job_log_dirs:
+        (job_log_root / job_log_dir).mkdir(parents=True)
+        (job_log_root / job_log_dir / 'job').write_text(
+            f'{JobRunnerManager.LINE_PREFIX_JOB_RUNNER_NAME}fake\n'
+        )
+    paths = []
+
+    def submit(job_file_path, submit_opts):
+        sleep(0.05)  # overlap with the other submissions
+        paths.append(submit_opts['env']['PATH'])
+        return 0, '', ''
+
+    monkeypatch.setattr(
+        job_runner_mgr, '_get_sys', lambda _: SimpleNamespace(submit=submit)
+    )
+    monkeypatch.setenv('PATH', '/usr/bin')
+    job_runner_mgr.env = []
+    job_runner_mgr.path = ['/extra/bin']
+    job_runner_mgr.jobs_submit(str(job_log_root), job_log_dirs, max_workers=4)
+    assert paths == ['/usr/bin:/extra/bin'] * 4
+    assert os.environ['PATH'] == '/usr/bin'
@@ -206,6 +206,47 @@ def test_similar_but_not_exact_match():
         platform_from_name('vld1', PLATFORMS_WITH_RE)
 
 
+def test_platform_from_name_cache(mock_glbl_cfg):
+    """It should cache platforms for as long as the global config is in use.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.platforms.glbl_cfg',
+        '''
+        [platforms]
+            [[desktop[0-9]{2}]]
+                job runner = background
+            [[desktop01]]
+                job runner = at
+        '''
+    )
+    platform = platform_from_name('desktop01')
+    assert platform['job runner'] == 'at'
+    assert platform['hosts'] == ['desktop01']
+    assert platform['name'] == 'desktop01'
+    # the platform returned is a copy
+    platform['job runner'] = 'slurm'
+    assert platform_from_name('desktop01')['job runner'] == 'at'
+    assert platform_from_name('desktop02')['job runner'] == 'background'
+
+    # a new global config (i.e. reload) is not served from the cache
+    mock_glbl_cfg(
+        'cylc.flow.platforms.glbl_cfg',
+        '''
+        [platforms]
+            [[desktop[0-9]{2}]]
+                job runner = background
+        '''
+    )
+    assert platform_from_name('desktop01')['job runner'] == 'background'
+
+    # platforms given explicitly are not cached
+    assert platform_from_name('desktop01', PLATFORMS)['job runner'] == (
+        'background'
+    )
+    with pytest.raises(PlatformLookupError):
+        platform_from_name('desktop01', {'sugar': {}})
+
+
 # ----------------------------------------------------------------------------
 # Tests of platform_name_from_job_info
 # ----------------------------------------------------------------------------
@@ -18,6 +18,7 @@ import pytest
 
 from cylc.flow.cycling.integer import IntegerPoint
 from cylc.flow.cycling.loader import ISO8601_CYCLING_TYPE, get_point
+from cylc.flow import prerequisite
 from cylc.flow.prerequisite import Prerequisite
 from cylc.flow.id import Tokens
 
@@ -34,7 +35,7 @@ def prereq(set_cycling_type):
 
 
 def test_satisfied(prereq: Prerequisite):
-    assert prereq._satisfied == {
+    assert dict(prereq.items()) == {
         # the pre-initial dependency should be marked as satisfied
         ('1999', 'a', 'succeeded'): 'satisfied naturally',
         # all others should not
@@ -53,7 +54,7 @@ def test_satisfied(prereq: Prerequisite):
         Tokens('2000/b:succeeded', relative=True),
         Tokens('2000/c:succeeded', relative=True),
     ])
-    assert prereq._satisfied == {
+    assert dict(prereq.items()) == {
         # the pre-initial dependency should be marked as satisfied
         ('1999', 'a', 'succeeded'): 'satisfied naturally',
         # the two newly-satisfied dependency should be satisfied
@@ -68,7 +69,7 @@ def test_satisfied(prereq: Prerequisite):
 
     # mark all prereqs as satisfied
     prereq.set_satisfied()
-    assert prereq._satisfied == {
+    assert dict(prereq.items()) == {
         # the pre-initial dependency should be marked as satisfied
         ('1999', 'a', 'succeeded'): 'satisfied naturally',
         # the two newly-satisfied dependency should be satisfied
@@ -122,6 +123,36 @@ def test_set_condition(prereq: Prerequisite):
     assert prereq.is_satisfied()
 
 
+def test_conditional_expression(set_cycling_type):
+    """Conditional expressions should be shared between task instances."""
+    set_cycling_type()
+    prereqs = []
+    for point in (IntegerPoint(1), IntegerPoint(2)):
+        prereq = Prerequisite(point)
+        prereq[(point, 'a', 'succeeded')] = False
+        prereq[(point, 'b', 'failed')] = False
+        prereq[(point, 'c', 'x')] = False
+        prereq.set_condition(
+            f'({point}/a succeeded | {point}/b failed) & {point}/c x'
+        )
+        prereqs.append(prereq)
+    one, two = prereqs
+
+    assert one.conditional_expression == '(_[0] | _[1]) & _[2]'
+    assert one.conditional_expression is two.conditional_expression
+    assert two.get_raw_conditional_expression() == (
+        '(2/a succeeded | 2/b failed) & 2/c x'
+    )
+
+    assert not one.is_satisfied()
+    one.satisfy_me([Tokens('1/b:failed', relative=True)])
+    assert not one.is_satisfied()
+    one.satisfy_me([Tokens('1/c:x', relative=True)])
+    assert one.is_satisfied()
+    # the other instance is unaffected
+    assert not two.is_satisfied()
+
+
 def test_iter_target_point_strings(prereq):
     assert set(prereq.iter_target_point_strings()) == {
         '1999',
@@ -149,3 +180,47 @@ def test_get_resolved_dependencies():
         '1/c',
         '1/d',
     ]
+
+
+@pytest.mark.parametrize('num', [3, Prerequisite.INDEX_THRESHOLD * 2])
+def test_many_messages(num):
+    """It should look up and update messages however many there are."""
+    prereq = Prerequisite(IntegerPoint('2'))
+    for ind in range(num):
+        prereq[('1', f'a{ind}', 'x')] = False
+    # re-registering a message should not duplicate it
+    prereq[('1', 'a0', 'x')] = False
+    assert len(prereq) == num
+    assert ('1', f'a{num - 1}', 'x') in prereq
+    assert ('1', 'b', 'x') not in prereq
+    with pytest.raises(KeyError):
+        prereq[('1', 'b', 'x')]
+
+    prereq.satisfy_me(
+        [Tokens(f'1/a{ind}:x', relative=True) for ind in range(num - 1)]
+    )
+    assert not prereq.is_satisfied()
+    # states loaded from the database are preserved
+    prereq[('1', f'a{num - 1}', 'x')] = 'satisfied by something else'
+    assert prereq.is_satisfied()
+    assert dict(prereq.items())[('1', f'a{num - 1}', 'x')] == (
+        'satisfied by something else'
+    )
+
+
+def test_state_codes(monkeypatch):
+    """The number of satisfaction states held should be bounded."""
+    monkeypatch.setattr(prerequisite, '_STATES', list(prerequisite._STATES))
+    monkeypatch.setattr(
+        prerequisite, '_STATE_CODES', dict(prerequisite._STATE_CODES)
+    )
+    prereq = Prerequisite(IntegerPoint('2'))
+    for ind in range(prerequisite._MAX_STATES + 10):
+        prereq[('1', f'a{ind}', 'x')] = f'satisfied by {ind}'
+    assert len(prerequisite._STATES) == prerequisite._MAX_STATES
+    assert prereq[('1', 'a0', 'x')] == 'satisfied by 0'
+    # states beyond the limit are recorded as from the database
+    assert prereq[('1', f'a{prerequisite._MAX_STATES}', 'x')] == (
+        'satisfied from database'
+    )
+    assert prereq.is_satisfied()
@@ -175,3 +175,46 @@ def test_select_task_pool_for_restart_if_not_platforms(tmp_path):
         match='not defined.*\n.*foo.*\n.*bar'
     ):
         dao.select_task_pool_for_restart(callback)
+
+
+def test_persistent_connection(tmp_path: Path):
+    """Test persistent connections stay open and use WAL journaling."""
+    db_file = tmp_path / 'db'
+    with CylcWorkflowDAO(db_file, create_tables=True, persistent=True) as dao:
+        conn = dao.connect()
+        assert list(conn.execute("PRAGMA journal_mode")) == [('wal',)]
+        dao.add_insert_item(
+            CylcWorkflowDAO.TABLE_WORKFLOW_PARAMS, ['key', 'value']
+        )
+        dao.execute_queued_items()
+        # the connection should not have been closed
+        assert dao.conn is conn
+        # the changes should be visible to other connections
+        with CylcWorkflowDAO(db_file) as dao2:
+            assert list(dao2.select_workflow_params()) == [('key', 'value')]
+        # after a checkpoint the changes should be in the database file
+        dao.checkpoint()
+        assert os.path.getsize(tmp_path / 'db-wal') == 0
+
+
+def test_persistent_connection_file_removed(tmp_path: Path):
+    """Test persistent connections detect removal of the database file."""
+    db_file = tmp_path / 'db'
+    with CylcWorkflowDAO(db_file, create_tables=True, persistent=True) as dao:
+        dao.connect()
+        dao.check_db_file(force=True)
+        assert dao.conn is not None
+
+        # remove the database file
+        for path in tmp_path.iterdir():
+            path.unlink()
+        dao.check_db_file(force=True)
+        # the connection should be closed, so that it gets reopened
+        assert dao.conn is None
+
+        # the next transaction should fail (the tables no longer exist)
+        dao.add_insert_item(
+            CylcWorkflowDAO.TABLE_WORKFLOW_PARAMS, ['key', 'value']
+        )
+        with pytest.raises(sqlite3.OperationalError):
+            dao.execute_queued_items()
@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import os
 from tempfile import (
     NamedTemporaryFile, SpooledTemporaryFile, TemporaryFile,
     TemporaryDirectory
@@ -22,14 +24,22 @@ import unittest
 import pytest
 
 from pathlib import Path
+from time import sleep, time
 from types import SimpleNamespace
 
 from cylc.flow import LOG
 from cylc.flow.id import Tokens
 from cylc.flow.cycling.iso8601 import ISO8601Point
 from cylc.flow.task_events_mgr import TaskJobLogsRetrieveContext
-from cylc.flow.subprocctx import SubProcContext
-from cylc.flow.subprocpool import SubProcPool, _XTRIG_FUNC_CACHE, _XTRIG_MOD_CACHE, get_xtrig_func
+from cylc.flow.subprocctx import SubFuncContext, SubProcContext
+from cylc.flow.subprocpool import (
+    AsyncSubProcPool,
+    SubProcPool,
+    _XTRIG_FUNC_CACHE,
+    _XTRIG_MOD_CACHE,
+    get_proc_pool,
+    get_xtrig_func,
+)
 from cylc.flow.task_outputs import (
     TASK_OUTPUT_SUBMITTED,
     TASK_OUTPUT_SUBMIT_FAILED,
@@ -407,3 +417,360 @@ def test_rsync_255_fail(mock_ctx, expect, ctx_kwargs):
         }
     )
     assert output == expect
+
+
+@pytest.fixture
+def xtrig_worker_pool(mock_glbl_cfg, tmp_path):
+    """A SubProcPool which runs xtrigger functions in a worker pool.
+
+    Yields the pool and a workflow run dir with xtrigger functions in
+    lib/python/wait.py.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 2
+                process pool timeout = PT10S
+                xtrigger executor = worker pool
+        '''
+    )
+    python_dir = tmp_path / 'lib' / 'python'
+    python_dir.mkdir(parents=True)
+    (python_dir / 'wait.py').write_text(
+        'import os\n'
+        'from time import sleep\n'
+        'def wait(secs):\n'
+        '    print("waiting")\n'
+        '    sleep(secs)\n'
+        '    return True, {"pid": os.getpid()}\n'
+        'def broken():\n'
+        '    raise ValueError("oops")\n'
+    )
+    pool = SubProcPool()
+    yield pool, str(tmp_path)
+    pool.terminate()
+
+
+def _run_funcs(pool, ctxs, timeout=30):
+    """Run xtrigger function contexts through the pool to completion."""
+    done = []
+    for ctx in ctxs:
+        pool.put_command(ctx, callback=done.append)
+    start = time()
+    while pool.is_not_done():
+        assert time() - start < timeout
+        pool.process()
+        sleep(0.05)
+    return done
+
+
+def test_xtrigger_worker_pool(xtrig_worker_pool):
+    """It should run xtrigger functions in reused worker processes."""
+    pool, run_dir = xtrig_worker_pool
+    ctxs = []
+    for secs in (0, 0, 0):
+        ctx = SubFuncContext('wait', 'wait', [secs], {})
+        ctx.update_command(run_dir)
+        ctxs.append(ctx)
+    assert _run_funcs(pool, ctxs) == ctxs
+    pids = set()
+    for ctx in ctxs:
+        assert ctx.ret_code == 0
+        satisfied, results = json.loads(ctx.out)
+        assert satisfied
+        pids.add(results['pid'])
+        # function stdout goes to stderr
+        assert ctx.err == 'waiting\n'
+    # no more worker processes than the pool size
+    assert 0 < len(pids) <= 2
+    assert os.getpid() not in pids
+
+    ctx = SubFuncContext('wait', 'wait', [0], {})
+    ctx.update_command(run_dir)
+    _run_funcs(pool, [ctx])
+    # the workers are still running
+    assert json.loads(ctx.out)[1]['pid'] in pids
+
+
+def test_xtrigger_worker_pool_errors(xtrig_worker_pool):
+    """It should report function errors and time outs."""
+    pool, run_dir = xtrig_worker_pool
+    broken = SubFuncContext('wait', 'broken', [], {}, mod_name='wait')
+    broken.update_command(run_dir)
+    _run_funcs(pool, [broken])
+    assert broken.ret_code == 1
+    assert broken.out is None
+    assert 'ValueError: oops' in broken.err
+
+    pool.proc_pool_timeout = 1
+    slow = SubFuncContext('wait', 'wait', [60], {})
+    slow.update_command(run_dir)
+    _run_funcs(pool, [slow])
+    assert slow.ret_code == 1
+    assert slow.err.endswith('killed on timeout (1)')
+    assert pool.func_pool is None
+    assert pool.old_func_pools == []
+
+
+def test_xtrigger_worker_pool_timeout(xtrig_worker_pool):
+    """Only the function that timed out should fail.
+
+    Other functions running in the worker pool should be left to finish.
+    """
+    pool, run_dir = xtrig_worker_pool
+    done = []
+    pool.proc_pool_timeout = 1
+    slow = SubFuncContext('wait', 'wait', [60], {})
+    slow.update_command(run_dir)
+    pool.put_command(slow, callback=done.append)
+    pool.process()
+    old_func_pool = pool.func_pool
+    pool.proc_pool_timeout = 10
+    other = SubFuncContext('wait', 'wait', [3], {})
+    other.update_command(run_dir)
+    assert _run_funcs(pool, [other]) == [other]
+    assert done == [slow]
+    assert 'killed on timeout' in slow.err
+    assert other.ret_code == 0
+    assert json.loads(other.out)[0]
+    # the pool was replaced, and terminated when the other function was done
+    assert pool.func_pool is None
+    assert old_func_pool is not None
+    assert pool.old_func_pools == []
+
+
+def test_xtrigger_worker_pool_restart(xtrig_worker_pool):
+    """It should start new workers on restart, letting old calls finish."""
+    pool, run_dir = xtrig_worker_pool
+    first = SubFuncContext('wait', 'wait', [0], {})
+    first.update_command(run_dir)
+    _run_funcs(pool, [first])
+    old_pids = {json.loads(first.out)[1]['pid']}
+
+    done = []
+    slow = SubFuncContext('wait', 'wait', [1], {})
+    slow.update_command(run_dir)
+    pool.put_command(slow, callback=done.append)
+    pool.process()
+    old_func_pool = pool.func_pool
+    pool.restart_func_pool()
+    assert pool.func_pool is None
+    assert pool.old_func_pools == [old_func_pool]
+
+    fast = SubFuncContext('wait', 'wait', [0], {})
+    fast.update_command(run_dir)
+    assert _run_funcs(pool, [fast]) == [fast]
+    # the call in progress finished in the old pool
+    assert done == [slow]
+    assert slow.ret_code == 0
+    old_pids.add(json.loads(slow.out)[1]['pid'])
+    # the new call ran in a new worker
+    assert json.loads(fast.out)[1]['pid'] not in old_pids
+    assert pool.old_func_pools == []
+
+
+@pytest.fixture
+def async_pool(mock_glbl_cfg):
+    """An AsyncSubProcPool with a short process pool timeout."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 2
+                process pool timeout = PT2S
+                process pool implementation = asyncio
+        '''
+    )
+    pool = get_proc_pool()
+    assert isinstance(pool, AsyncSubProcPool)
+    yield pool
+    pool.terminate()
+
+
+async def _run_async_pool(pool, ctxs, timeout=10):
+    """Run command contexts through an async pool to completion."""
+    done = []
+    for ctx in ctxs:
+        pool.put_command(ctx, callback=done.append)
+    start = time()
+    while pool.is_not_done():
+        assert time() - start < timeout
+        pool.process()
+        await pool.sleep(1)
+    return done
+
+
+async def test_async_pool(async_pool):
+    """It should run commands and capture their output and exit status."""
+    ctxs = [
+        SubProcContext('out', ['echo', 'pirate', 'urrrr']),
+        SubProcContext('err', 'echo pirate errrr >&2; exit 3', shell=True),
+        SubProcContext('in', ['cat'], stdin_str='catches mice.\n'),
+    ]
+    assert await _run_async_pool(async_pool, ctxs) == ctxs
+    out, err, in_ = ctxs
+    assert (out.ret_code, out.out, out.err) == (0, 'pirate urrrr\n', None)
+    assert (err.ret_code, err.out, err.err) == (3, None, 'pirate errrr\n')
+    assert (in_.ret_code, in_.out) == (0, 'catches mice.\n')
+
+    # a missing command is reported as a failure
+    ctx = SubProcContext('nope', ['cylc-no-such-command'])
+    await _run_async_pool(async_pool, [ctx])
+    assert ctx.ret_code == 1
+    assert 'cylc-no-such-command' in ctx.err
+
+
+async def test_async_pool_closes_stdin(async_pool, monkeypatch):
+    """It should close STDIN files it opens, but not the caller's."""
+    temp_files = []
+
+    def _get_temporary_file():
+        temp_files.append(SpooledTemporaryFile())
+        return temp_files[-1]
+
+    monkeypatch.setattr(
+        AsyncSubProcPool, 'get_temporary_file', _get_temporary_file
+    )
+    handle = TemporaryFile()
+    handle.write(b'eat fish.\n')
+    handle.seek(0)
+    ctxs = [
+        SubProcContext('str', ['cat'], stdin_str='catches mice.\n'),
+        SubProcContext('handle', ['cat'], stdin_files=[handle]),
+    ]
+    await _run_async_pool(async_pool, ctxs)
+    assert [ctx.out for ctx in ctxs] == ['catches mice.\n', 'eat fish.\n']
+    assert len(temp_files) == 1
+    assert temp_files[0].closed
+    assert not handle.closed
+    handle.close()
+
+
+async def test_async_pool_wakes_on_exit(async_pool):
+    """It should end the main loop sleep as soon as a command exits."""
+    ctx = SubProcContext('quick', ['true'])
+    async_pool.put_command(ctx)
+    async_pool.process()
+    assert not async_pool.needs_polling()
+    start = time()
+    await async_pool.sleep(10)
+    assert time() - start < 5
+    async_pool.process()
+    assert ctx.ret_code == 0
+    assert not async_pool.is_not_done()
+
+
+async def test_async_pool_timeout(async_pool):
+    """It should kill commands that exceed the process pool timeout."""
+    ctx = SubProcContext('slow', ['sleep', '60'])
+    await _run_async_pool(async_pool, [ctx])
+    assert ctx.ret_code == -9
+    assert ctx.err.endswith('killed on timeout (PT2S)')
+
+
+def test_priority_classes(mock_glbl_cfg):
+    """It should run commands by priority class, subject to class limits."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 3
+                [[process pool]]
+                    [[[limits]]]
+                        event handler = 1
+        '''
+    )
+    pool = SubProcPool()
+    handlers = [
+        SubProcContext((('handler', 'failed'), i), ['sleep', '10'])
+        for i in range(3)
+    ]
+    submit = SubProcContext(SubProcPool.JOBS_SUBMIT, ['sleep', '10'])
+    for ctx in [*handlers, submit]:
+        pool.put_command(ctx)
+    assert pool.queuings[0][0] is submit
+    try:
+        pool.process()
+        # the job submission jumps the queue, the handlers are limited to 1
+        assert [item[1] for item in pool.runnings] == [submit, handlers[0]]
+        stats = pool.get_stats()
+        assert stats['job submission']['running'] == 1
+        assert stats['job submission']['launched'] == 1
+        assert stats['event handler']['queued'] == 2
+        assert stats['event handler']['running'] == 1
+        assert stats['event handler']['max wait'] >= 0
+    finally:
+        pool.terminate()
+    assert handlers[2].ret_code == SubProcPool.RET_CODE_WORKFLOW_STOPPING
+
+
+def test_priority_classes_starvation(mock_glbl_cfg):
+    """Commands should not wait forever behind higher priority classes."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 1
+        '''
+    )
+    pool = SubProcPool()
+    handler = SubProcContext((('handler', 'failed'), 0), ['true'])
+    pool.put_command(handler)
+    try:
+        # keep the job submission class saturated
+        for _ in range(3):
+            pool.put_command(SubProcContext(SubProcPool.JOBS_SUBMIT, ['true']))
+            pool.put_command(SubProcContext(SubProcPool.JOBS_SUBMIT, ['true']))
+            pool.process()
+            assert handler not in [item[1] for item in pool.runnings]
+            pool.runnings.clear()
+        # until the handler has waited too long
+        pool.queues['event handler'][0][-1] -= SubProcPool.MAX_QUEUE_WAIT
+        pool.put_command(SubProcContext(SubProcPool.JOBS_SUBMIT, ['true']))
+        pool.process()
+        assert [item[1] for item in pool.runnings] == [handler]
+    finally:
+        pool.terminate()
+
+
+def test_adapt_size(mock_glbl_cfg, monkeypatch):
+    """It should grow the pool while commands wait, unless the host is loaded.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+            [scheduler]
+                process pool size = 2
+                [[process pool]]
+                    maximum size = 3
+                    target queue wait = PT1S
+                    maximum load = 0.5
+        '''
+    )
+    load = [0.0]
+    monkeypatch.setattr(
+        'cylc.flow.subprocpool.os.getloadavg', lambda: (load[0], 0, 0)
+    )
+    monkeypatch.setattr('cylc.flow.subprocpool.os.cpu_count', lambda: 1)
+    pool = SubProcPool()
+
+    def adapt():
+        pool.adapt_time = 0
+        pool._adapt_size()
+        return pool.size
+
+    # commands waiting longer than the target: grow, up to the maximum
+    pool.put_command(SubProcContext('jobs-poll', ['true']))
+    pool.queues['job poll and kill'][0][-1] -= 10
+    assert adapt() == 3
+    assert adapt() == 3
+    # host loaded: shrink, down to the configured size
+    load[0] = 0.6
+    assert adapt() == 2
+    assert adapt() == 2
+    # host not loaded but queues empty: shrink
+    load[0] = 0.0
+    assert adapt() == 3
+    pool.queues['job poll and kill'].clear()
+    assert adapt() == 2
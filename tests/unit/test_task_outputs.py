@@ -19,6 +19,7 @@ from types import SimpleNamespace
 import pytest
 
 from cylc.flow.task_outputs import (
+    FORCED_COMPLETION_MSG,
     TASK_OUTPUTS,
     TASK_OUTPUT_EXPIRED,
     TASK_OUTPUT_FAILED,
@@ -101,7 +102,7 @@ def test_completion_explicit():
     proposal point 5:
     https://cylc.github.io/cylc-admin/proposal-optional-output-extension.html#proposal
     """
-    outputs = TaskOutputs(tdef(
+    outputs_tdef = tdef(
         # no required outputs
         [],
         # four optional outputs
@@ -113,7 +114,8 @@ def test_completion_explicit():
         ],
         # one pair must be satisfied for the outputs to be complete
         completion='(succeeded and x) or (failed and y)',
-    ))
+    )
+    outputs = TaskOutputs(outputs_tdef)
 
     # the outputs should be incomplete - it hasn't run yet
     assert outputs.is_complete() is False
@@ -131,7 +133,9 @@ def test_completion_explicit():
     assert outputs.is_complete() is True
 
     # satisfy the (succeeded and x) pair
-    outputs._completed['y'] = False
+    outputs = TaskOutputs(outputs_tdef)
+    outputs.set_message_complete(TASK_OUTPUT_SUCCEEDED)
+    outputs.set_message_complete(TASK_OUTPUT_FAILED)
     outputs.set_message_complete('x')
     assert outputs.is_complete() is True
 
@@ -294,3 +298,26 @@ def test_get_trigger_completion_variable_maps():
     t2c, c2t = get_trigger_completion_variable_maps(('a', 'b-b', 'c-c-c'))
     assert t2c == {'a': 'a', 'b-b': 'b_b', 'c-c-c': 'c_c_c'}
     assert c2t == {'a': 'a', 'b_b': 'b-b', 'c_c_c': 'c-c-c'}
+
+
+def test_shared_output_maps():
+    """Instances of a task should not share output state."""
+    _tdef = tdef({TASK_OUTPUT_SUCCEEDED, 'x'}, {'y'})
+    one = TaskOutputs(_tdef)
+    two = TaskOutputs(_tdef)
+
+    one.set_message_complete('x', forced=True)
+    one.set_message_complete(TASK_OUTPUT_SUCCEEDED)
+    assert one.get_completed_outputs() == {
+        'x': FORCED_COMPLETION_MSG,
+        TASK_OUTPUT_SUCCEEDED: TASK_OUTPUT_SUCCEEDED,
+    }
+    assert one.is_complete() is True
+    assert two.get_completed_outputs() == {}
+    assert two.is_message_complete('x') is False
+    assert two.is_message_complete('z') is None
+
+    # adding outputs should not affect other instances
+    one.add('z', 'z message')
+    assert one.is_message_complete('z message') is False
+    assert two.is_message_complete('z message') is None
@@ -100,7 +100,7 @@ def test_task_prereq_duplicates(set_cycling_type):
 
     tstate = TaskState(tdef, IntegerPoint("1"), TASK_STATUS_WAITING, False)
 
-    prereqs = [p._satisfied for p in tstate.prerequisites]
+    prereqs = [dict(p.items()) for p in tstate.prerequisites]
 
     assert prereqs == [{("1", "a", "succeeded"): False}]
 
@@ -155,7 +155,7 @@ def test_housekeeping_nothing_satisfied(xtrigger_mgr):
     xtrigger_mgr.add_xtriggers(XtriggerCollator())
     xtrigger_mgr.load_xtrigger_for_restart(row_idx=0, row=row)
     assert xtrigger_mgr.sat_xtrig
-    xtrigger_mgr.housekeep([])
+    xtrigger_mgr.housekeep()
     assert not xtrigger_mgr.sat_xtrig
 
 
@@ -190,12 +190,13 @@ def test_housekeeping_with_xtrigger_satisfied(xtrigger_mgr):
     itask = TaskProxy(Tokens('~user/workflow'), tdef, start_point)
     # pretend the function has been activated
 
-    xtrigger_mgr.active.append(xtrig.get_signature())
+    xtrigger_mgr.active.add(xtrig.get_signature())
 
     xtrigger_mgr.callback(xtrig)
     assert xtrigger_mgr.sat_xtrig
 
-    xtrigger_mgr.housekeep([itask])
+    xtrigger_mgr.add_task(itask)
+    xtrigger_mgr.housekeep()
     # here we still have the same number as before
     assert xtrigger_mgr.sat_xtrig
 
@@ -297,7 +298,7 @@ def test_callback_invalid_json(xtrigger_mgr):
         func_kwargs={}
     )
     get_name.out = "{no_quotes: \"mom!\"}"
-    xtrigger_mgr.active.append(get_name.get_signature())
+    xtrigger_mgr.active.add(get_name.get_signature())
     xtrigger_mgr.callback(get_name)
     # this means that the xtrigger was not satisfied
     # TODO: this means site admins are only aware of this if they
@@ -314,7 +315,7 @@ def test_callback(xtrigger_mgr):
         func_kwargs={}
     )
     get_name.out = "[\"True\", \"1\"]"
-    xtrigger_mgr.active.append(get_name.get_signature())
+    xtrigger_mgr.active.add(get_name.get_signature())
     xtrigger_mgr.callback(get_name)
     # this means that the xtrigger was satisfied
     assert xtrigger_mgr.sat_xtrig